@@ -16,6 +16,9 @@ from routes.api import api_bp
 from routes.auth import auth_bp
 from routes.dashboard import dashboard_bp
 from logging_config import logger
+from cli import register_commands
+from helpers.session_backend import configure_session_backend
+from helpers.upstream import upstream
 
 
 
@@ -32,8 +35,10 @@ def create_app():
     db.init_app(app)
     bcrypt.init_app(app)
     mail.init_app(app)
+    configure_session_backend(app)
     session.init_app(app)
     login_manager.init_app(app)
+    upstream.init_app(app)
 
     Migrate(app, db)
 
@@ -42,6 +47,8 @@ def create_app():
     app.register_blueprint(auth_bp)
     app.register_blueprint(dashboard_bp)
 
+    register_commands(app)
+
 
     @login_manager.user_loader
     def load_user(user_id):
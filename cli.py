@@ -0,0 +1,148 @@
+# Flask CLI commands: flask --app wsgi <command>
+
+import click
+
+from logging_config import logger
+
+
+def register_commands(app):
+    app.cli.add_command(warm_cache_command)
+    app.cli.add_command(bench_sessions_command)
+    app.cli.add_command(sync_worker_command)
+    app.cli.add_command(bench_upstream_command)
+    app.cli.add_command(import_report_command)
+    app.cli.add_command(bench_startup_command)
+    app.cli.add_command(load_test_command)
+
+
+@click.command('warm-cache')
+@click.option('--season', type=int, default=None, help='Kausi päättymisvuotena, esim. 2026. Oletus: nykyinen kausi.')
+def warm_cache_command(season):
+    """Preload tulospalvelu levels, stat groups and teams into the shared (sql) reference cache."""
+    from flask import current_app
+    from helpers.cache import reference_cache
+    from helpers.data_fetcher import current_season, warm_reference_cache
+
+    # Muistivälimuisti täyttyisi vain tähän CLI-prosessiin, eikä yksikään worker näkisi sitä
+    if current_app.config.get('REFERENCE_CACHE_BACKEND') != 'sql':
+        raise click.ClickException("warm-cache needs REFERENCE_CACHE_BACKEND=sql; the memory cache lives only in this process.")
+
+    purged = reference_cache.sql.purge_expired()
+    season = season or current_season()
+    counts = warm_reference_cache(season)
+    logger.info("Reference cache warmed for season %s: %s (purged %s expired)", season, counts, purged)
+    click.echo(
+        f"Season {season}: {counts['levels']} levels, {counts['statgroups']} stat groups, {counts['teams']} team lists cached"
+        f" ({purged} expired entries removed)."
+    )
+
+
+@click.command('bench-sessions')
+@click.option('--backend', 'backends', multiple=True, help='Mitattava backend (voi toistaa). Oletus: filesystem, memory ja sql.')
+@click.option('--requests', 'n_requests', type=int, default=200, show_default=True, help='Pyyntöjä per backend.')
+@click.option('--payload-bytes', type=int, default=512, show_default=True, help='Istunnon datan koko.')
+def bench_sessions_command(backends, n_requests, payload_bytes):
+    """Measure per-request session load/save cost of each session backend."""
+    from flask import current_app
+    from helpers.session_backend import benchmark_session_backend
+
+    for backend in backends or ('filesystem', 'memory', 'sql'):
+        try:
+            result = benchmark_session_backend(current_app, backend, n_requests, payload_bytes)
+        except Exception as e:
+            click.echo(f"{backend:<12} skipped: {e}")
+            continue
+        click.echo(f"{backend:<12} load {result['load_ms']:.3f} ms  save {result['save_ms']:.3f} ms  ({n_requests} requests)")
+
+
+@click.command('sync-worker')
+@click.option('--once', is_flag=True, help='Aja jonossa olevat työt ja lopeta.')
+def sync_worker_command(once):
+    """Run the background worker that precomputes schedules and comparisons."""
+    from flask import current_app
+    from helpers.sync_worker import run_worker
+
+    run_worker(current_app._get_current_object(), once=once)
+
+
+@click.command('bench-upstream')
+@click.option('--calls', type=int, default=200, show_default=True, help='Kutsuja per tapa.')
+@click.option('--no-tls', is_flag=True, help='Mittaa ilman TLS:ää (pelkkä TCP-kättely).')
+@click.option('--payload-bytes', type=int, default=2048, show_default=True, help='Vastauksen koko.')
+def bench_upstream_command(calls, no_tls, payload_bytes):
+    """Compare new-connection-per-call with the pooled upstream client against a local stand-in server."""
+    from helpers.upstream import benchmark_upstream
+
+    result = benchmark_upstream(calls=calls, tls=not no_tls, payload_bytes=payload_bytes)
+    for name in ('new_connection', 'pooled'):
+        click.echo(f"{name:<15} avg {result[name]['avg_ms']:.2f} ms  p95 {result[name]['p95_ms']:.2f} ms  ({calls} calls, {'https' if result['tls'] else 'http'})")
+    saved = result['new_connection']['avg_ms'] - result['pooled']['avg_ms']
+    click.echo(f"Saved per call: {saved:.2f} ms")
+
+
+@click.command('import-report')
+@click.option('--module', default='wsgi', show_default=True, help='Tuotava moduuli.')
+@click.option('--top', type=int, default=20, show_default=True, help='Näytettävien rivien määrä.')
+def import_report_command(module, top):
+    """Show where `import wsgi` spends its time (python -X importtime in a fresh interpreter)."""
+    from helpers.startup import import_time_report
+
+    report = import_time_report(module, top)
+    click.echo(f"import {module}: {report['total_ms']:.1f} ms")
+    click.echo("\nSlowest modules (cumulative):")
+    for entry in report['modules']:
+        click.echo(f"  {entry['cumulative_ms']:8.1f} ms  {entry['self_ms']:7.1f} ms self  {entry['module']}")
+    click.echo("\nSelf time per top-level package:")
+    for package, self_ms in report['packages']:
+        click.echo(f"  {self_ms:8.1f} ms  {package}")
+
+
+@click.command('bench-startup')
+@click.option('--module', default='wsgi', show_default=True, help='Tuotava moduuli.')
+@click.option('--runs', type=int, default=5, show_default=True, help='Mittauskertoja (uusi tulkki joka kerralla).')
+@click.option('--budget-ms', type=float, default=None, help='Sallittu mediaani. Oletus: STARTUP_IMPORT_BUDGET_MS.')
+def bench_startup_command(module, runs, budget_ms):
+    """Measure app import time against the startup budget; exits with status 1 when over budget."""
+    from flask import current_app
+    from helpers.startup import measure_startup
+
+    budget_ms = budget_ms or current_app.config.get('STARTUP_IMPORT_BUDGET_MS', 1000)
+    result = measure_startup(module, runs)
+    click.echo(
+        f"import {module}: median {result['median_ms']:.1f} ms  min {result['min_ms']:.1f}  max {result['max_ms']:.1f}"
+        f"  ({result['runs']} runs, budget {budget_ms:.0f} ms)"
+    )
+    failed = False
+    if result['heavy_loaded']:
+        click.echo(f"Heavy modules loaded at import: {', '.join(result['heavy_loaded'])}")
+        failed = True
+    if result['median_ms'] > budget_ms:
+        click.echo(f"Over budget by {result['median_ms'] - budget_ms:.1f} ms")
+        failed = True
+    if failed:
+        raise SystemExit(1)
+
+
+@click.command('load-test')
+@click.option('--worker-class', 'worker_classes', multiple=True, help='Mitattava gunicorn-workerityyppi (voi toistaa). Oletus: sync ja gthread.')
+@click.option('--users', type=int, default=50, show_default=True, help='Samanaikaisia otteluhakusivun käyttäjiä.')
+@click.option('--duration', type=int, default=20, show_default=True, help='Mittauksen kesto sekunteina.')
+@click.option('--workers', type=int, default=2, show_default=True, help='Gunicorn-workereita (WEB_CONCURRENCY).')
+@click.option('--threads', type=int, default=8, show_default=True, help='Säikeitä per gthread-worker.')
+@click.option('--teams', type=int, default=3, show_default=True, help='Joukkueita per käyttäjä.')
+@click.option('--upstream-latency-ms', type=int, default=250, show_default=True, help='Tulospalvelukorvikkeen vasteaika.')
+def load_test_command(worker_classes, users, duration, workers, threads, teams, upstream_latency_ms):
+    """Load-test gunicorn worker models with concurrent schedule-page users against a local tulospalvelu stand-in."""
+    from helpers.loadtest import run_load_test
+
+    results = run_load_test(
+        worker_classes or ('sync', 'gthread'), users=users, duration=duration, workers=workers,
+        threads=threads, teams=teams, latency_ms=upstream_latency_ms,
+    )
+    for result in results:
+        click.echo(
+            f"{result['worker_class']:<8} {result['workers']}x{result['threads']}  "
+            f"{result['throughput_rps']:6.1f} req/s  schedules {result['schedules_per_s']:5.1f}/s  "
+            f"p50 {result['schedules_p50_ms']:7.0f} ms  p95 {result['schedules_p95_ms']:7.0f} ms  "
+            f"errors {result['errors']}  ({result['users']} users, {result['duration']} s)"
+        )
@@ -22,6 +22,13 @@ class Config:
 
     SQLALCHEMY_DATABASE_URI = uri
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    if not uri.startswith("sqlite"):
+        # gthread-workerin jokainen säie voi tarvita oman yhteyden (GUNICORN_THREADS)
+        SQLALCHEMY_ENGINE_OPTIONS = {
+            'pool_size': int(os.getenv('DB_POOL_SIZE', 10)),
+            'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 5)),
+            'pool_pre_ping': True,  # Katkenneet yhteydet huomataan ennen käyttöä
+        }
 
     REMEMBER_COOKIE_DURATION = timedelta(days=3)
     REMEMBER_COOKIE_SECURE = os.getenv('COOKIE_SECURE')  # True for Heroku, False locally
@@ -34,7 +41,64 @@ class Config:
 
     # Initialize the Flask app
     SECRET_KEY = os.environ.get('SECRET_KEY', 'your_secret_key_here')  # Add secret key for sessions
-    SESSION_TYPE = 'filesystem'  # Vaihtoehdot: 'filesystem', 'redis', 'memcached', 'mongodb', jne.
+    SESSION_BACKEND = os.getenv('SESSION_BACKEND', 'filesystem')  # 'filesystem', 'memory' (LRU, yksi worker), 'sql' tai 'redis'
+    SESSION_MEMORY_MAXSIZE = int(os.getenv('SESSION_MEMORY_MAXSIZE', 1000))  # Istuntoja muistissa, kun SESSION_BACKEND='memory'
+    SESSION_REDIS_URL = os.getenv('SESSION_REDIS_URL', 'redis://localhost:6379/0')  # Mikä tahansa Redis-protokollaa puhuva palvelin
+    SESSION_CLEANUP_N_REQUESTS = int(os.getenv('SESSION_CLEANUP_N_REQUESTS', 0)) or None  # 'sql': siivous N pyynnön välein, muuten flask session_cleanup
     SESSION_PERMANENT = False  # Istunto ei ole pysyvä (se nollautuu selainistunnon päättyessä)
     SESSION_USE_SIGNER = True  # Lisää turvakerroksen session arvoihin
     SESSION_FILE_DIR = './flask_session'  # Määritä hakemisto, jossa session tiedot tallennetaan
+
+    # Tulospalvelu: joukkueiden otteluhaut tehdään rinnakkain
+    SCHEDULE_FETCH_WORKERS = int(os.getenv('SCHEDULE_FETCH_WORKERS', 8))  # Rinnakkaisten hakujen enimmäismäärä
+    SCHEDULE_FETCH_TIMEOUT = float(os.getenv('SCHEDULE_FETCH_TIMEOUT', 10))  # Sekuntia per joukkueen haku uusintoineen
+    SCHEDULE_FRESHNESS_SECONDS = int(os.getenv('SCHEDULE_FRESHNESS_SECONDS', 60))  # Näin tuore haku palvelee ilman uutta pyyntöä
+
+    # Tulospalvelu ja muut ulkoiset rajapinnat: yhteinen yhteyspooli per worker
+    UPSTREAM_CONNECT_TIMEOUT = float(os.getenv('UPSTREAM_CONNECT_TIMEOUT', 3.05))  # Sekuntia yhteyden muodostukseen
+    UPSTREAM_READ_TIMEOUT = float(os.getenv('UPSTREAM_READ_TIMEOUT', 10))  # Sekuntia vastauksen odotukseen
+    UPSTREAM_RETRIES = int(os.getenv('UPSTREAM_RETRIES', 2))  # Uusintayritykset idempotenteille kutsuille
+    UPSTREAM_RETRY_BACKOFF = float(os.getenv('UPSTREAM_RETRY_BACKOFF', 0.3))  # Ensimmäisen uusinnan odotus (s), tuplaantuu
+    UPSTREAM_POOL_MAXSIZE = int(os.getenv('UPSTREAM_POOL_MAXSIZE', 16))  # Avoimia yhteyksiä per host; gthread: noin GUNICORN_THREADS × joukkueita per haku
+
+    # Käynnistys: flask bench-startup epäonnistuu, jos `import wsgi` ylittää tämän (mediaani, ms)
+    STARTUP_IMPORT_BUDGET_MS = int(os.getenv('STARTUP_IMPORT_BUDGET_MS', 1200))
+
+    # Jopox: pelilistan sivut haetaan rinnakkain
+    JOPOX_SCRAPE_WORKERS = int(os.getenv('JOPOX_SCRAPE_WORKERS', 4))
+    JOPOX_PAGE_RETRIES = int(os.getenv('JOPOX_PAGE_RETRIES', 2))  # Uusintayritykset per sivu
+    JOPOX_PAGE_TIMEOUT = float(os.getenv('JOPOX_PAGE_TIMEOUT', 15))  # Sekuntia per sivu
+    JOPOX_CREATE_WORKERS = int(os.getenv('JOPOX_CREATE_WORKERS', 4))  # Yhtäaikaisia pelin lisäyksiä (POST) Jopoxiin
+    JOPOX_LEAGUE_CACHE_TTL = int(os.getenv('JOPOX_LEAGUE_CACHE_TTL', 3600))  # Käyttäjän Jopox-sarjojen lista välimuistissa (s)
+    JOPOX_DETAIL_CACHE_TTL = int(os.getenv('JOPOX_DETAIL_CACHE_TTL', 120))  # Pelin muokkauslomake välimuistissa (s)
+    JOPOX_PREFETCH_WORKERS = int(os.getenv('JOPOX_PREFETCH_WORKERS', 2))  # Taustalla esihaettavia lomakkeita kerrallaan
+    JOPOX_PREFETCH_MAX = int(os.getenv('JOPOX_PREFETCH_MAX', 20))  # Esihakuja per vertailu
+
+    # Jopox: kirjautuneet istunnot pidetään workerin muistissa käyttäjäkohtaisesti
+    JOPOX_SESSION_TTL = int(os.getenv('JOPOX_SESSION_TTL', 3600))  # Sekuntia; käytetään vain, jos access tokenissa ei ole exp-aikaa
+    JOPOX_SESSION_REFRESH_MARGIN = int(os.getenv('JOPOX_SESSION_REFRESH_MARGIN', 300))  # Uusitaan taustalla näin paljon ennen vanhenemista
+    JOPOX_SESSION_IDLE_TIMEOUT = int(os.getenv('JOPOX_SESSION_IDLE_TIMEOUT', 1800))  # Käyttämättömiä istuntoja ei uusita
+    JOPOX_SESSION_REFRESH_INTERVAL = int(os.getenv('JOPOX_SESSION_REFRESH_INTERVAL', 60))
+    JOPOX_SESSION_BACKGROUND_REFRESH = os.getenv('JOPOX_SESSION_BACKGROUND_REFRESH', 'False') == 'True'  # Päälle vasta, kun JOPOX_TOKEN_REFRESH_URL on todettu toimivaksi
+    JOPOX_SESSION_POOL_SIZE = int(os.getenv('JOPOX_SESSION_POOL_SIZE', 256))  # Käyttäjiä per worker
+    JOPOX_TOKEN_REFRESH_URL = os.getenv('JOPOX_TOKEN_REFRESH_URL', 'https://myapi.jopox.fi/api/v1/myjopoxaccount/refreshtoken')
+
+    # Vertailu: Jopox-ehdokkaat haetaan ensin tämän päivämääräikkunan sisältä
+    COMPARE_DATE_WINDOW_DAYS = int(os.getenv('COMPARE_DATE_WINDOW_DAYS', 7))
+    COMPARE_MODE = os.getenv('COMPARE_MODE', 'greedy')  # 'greedy' tai 'optimal' (globaali 1:1-parien valinta ikkunan sisällä, ikkunan ulkopuolelta kuten greedy)
+    COMPARE_CACHE_TTL = int(os.getenv('COMPARE_CACHE_TTL', 900))  # Sekuntia; samat syötteet palautetaan välimuistista
+    COMPARE_CACHE_MAXSIZE = int(os.getenv('COMPARE_CACHE_MAXSIZE', 256))  # Vertailuja per worker
+
+    # Taustasynkronointi (flask sync-worker): otteluohjelmat ja vertailut lasketaan valmiiksi
+    SYNC_STALE_SECONDS = int(os.getenv('SYNC_STALE_SECONDS', 900))  # Tätä vanhemmat tulokset synkronoidaan uudelleen
+    SYNC_POLL_INTERVAL = float(os.getenv('SYNC_POLL_INTERVAL', 5))  # Sekuntia tyhjän jonon tarkistusten välillä
+    SYNC_SCHEDULE_INTERVAL = int(os.getenv('SYNC_SCHEDULE_INTERVAL', 60))  # Kuinka usein vanhentuneet käyttäjät jonotetaan
+    SYNC_JOB_TIMEOUT = int(os.getenv('SYNC_JOB_TIMEOUT', 600))  # Tätä pidempään kesken olleet työt palautetaan jonoon
+    SYNC_MAX_ATTEMPTS = int(os.getenv('SYNC_MAX_ATTEMPTS', 3))
+    SYNC_RETRY_BACKOFF = int(os.getenv('SYNC_RETRY_BACKOFF', 60))  # Sekuntia ennen epäonnistuneen työn uusintaa, tuplaantuu
+    SYNC_JOB_RETENTION_DAYS = int(os.getenv('SYNC_JOB_RETENTION_DAYS', 14))  # Valmiit ja epäonnistuneet työt poistetaan tämän jälkeen
+
+    # Tulospalvelun tasot, sarjat ja joukkueet välimuistissa
+    REFERENCE_CACHE_BACKEND = os.getenv('REFERENCE_CACHE_BACKEND', 'memory')  # 'memory' tai 'sql' (jaettu workereiden kesken)
+    REFERENCE_CACHE_TTL = int(os.getenv('REFERENCE_CACHE_TTL', 6 * 3600))  # Sekuntia
+    REFERENCE_CACHE_MAXSIZE = int(os.getenv('REFERENCE_CACHE_MAXSIZE', 1024))  # Avaimia per worker
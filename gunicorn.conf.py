@@ -1,6 +1,43 @@
-accesslog = None       
-errorlog = "-"         
-loglevel = "info"      
+import os
+
+accesslog = None
+errorlog = "-"
+loglevel = "info"
 capture_output = True
 
-preload_app = True
\ No newline at end of file
+preload_app = True
+
+# Workerit: Jopox- ja tulospalvelukutsut odottavat verkkoa, joten yksi prosessi palvelee
+# useaa pyyntöä säikeillä. Sync-workerilla yksi Jopox-haku varaa koko prosessin.
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')  # 'gthread', 'sync' tai 'gevent'
+# Samanaikaisia pyyntöjä per worker (gthread); gunicorn vaihtaisi sync-workerin gthreadiksi, jos threads > 1
+threads = int(os.getenv('GUNICORN_THREADS', 8)) if worker_class == 'gthread' else 1
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 100))  # Samanaikaisia pyyntöjä per worker (gevent)
+
+# Jopox-kirjautuminen ja sivujen haku voivat kestää kymmeniä sekunteja; oletus 30 s tappoi workerin kesken
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 0))  # 0 = workeria ei kierrätetä
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 0))
+
+if worker_class == 'gevent':
+    # gevent paikkaa socketit vasta workerissa; esiladattu sovellus ehtisi tuoda paikkaamattomat moduulit
+    preload_app = False
+
+if os.getenv('GUNICORN_BIND'):
+    bind = os.getenv('GUNICORN_BIND').split(',')
+
+
+def post_fork(server, worker):
+    # Esiladatun sovelluksen tietokanta- ja HTTP-yhteyksiä ei jaeta prosessien kesken
+    if not server.cfg.preload_app:
+        return
+    from extensions import db
+    from helpers.upstream import upstream
+
+    app = server.app.wsgi()
+    with app.app_context():
+        db.engine.dispose(close=False)
+    upstream.close()
@@ -0,0 +1,156 @@
+import json
+import threading
+import time
+
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import sqlalchemy as sa
+from flask import current_app, has_app_context
+
+from extensions import db
+from logging_config import logger
+from models.cache_entry import CacheEntry
+
+
+class TTLCache:
+    """Thread-safe in-process LRU cache where every entry has a time-to-live."""
+
+    def __init__(self, maxsize=512, ttl=3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return entry[1] if entry else default
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLCache:
+    """Cache backend stored in the `cache_entry` table, shared by all workers.
+
+    Reads and writes use their own connection and transaction, so a cache
+    miss inside a request never commits or rolls back the request's session.
+    """
+
+    table = CacheEntry.__table__
+
+    def get(self, key):
+        with db.engine.connect() as conn:
+            row = conn.execute(
+                sa.select(self.table.c.value, self.table.c.expires_at).where(self.table.c.key == key)
+            ).first()
+        if row is None or row.expires_at < datetime.now():
+            return None
+        return json.loads(row.value)
+
+    def set(self, key, value, ttl):
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(self.table.delete().where(self.table.c.key == key))
+                conn.execute(self.table.insert().values(
+                    key=key,
+                    value=json.dumps(value),
+                    expires_at=datetime.now() + timedelta(seconds=ttl),
+                ))
+        except Exception as e:
+            # Toinen worker ehti kirjoittaa saman avaimen – ei haittaa
+            logger.warning("SQL cache write failed for %s: %s", key, e)
+
+    def purge_expired(self):
+        """Delete expired rows; they are skipped on read but otherwise never removed."""
+        with db.engine.begin() as conn:
+            return conn.execute(self.table.delete().where(self.table.c.expires_at < datetime.now())).rowcount
+
+
+class ReferenceCache:
+    """Two-level cache for tulospalvelu reference data.
+
+    Lookups hit the in-process LRU first and, when REFERENCE_CACHE_BACKEND is
+    'sql', fall back to the shared table before calling upstream.
+    """
+
+    def __init__(self):
+        self.memory = TTLCache()
+        self.sql = SQLCache()
+        self._configured = False
+
+    def _configure(self):
+        if self._configured or not has_app_context():
+            return
+        config = current_app.config
+        self.memory.maxsize = config.get('REFERENCE_CACHE_MAXSIZE', self.memory.maxsize)
+        self.memory.ttl = config.get('REFERENCE_CACHE_TTL', self.memory.ttl)
+        self._configured = True
+
+    def _use_sql(self):
+        return has_app_context() and current_app.config.get('REFERENCE_CACHE_BACKEND') == 'sql'
+
+    @staticmethod
+    def make_key(endpoint, season=None, level_id=None, district_id=None, stgid=None):
+        return ":".join(str(part) if part is not None else "" for part in (endpoint, season, level_id, district_id, stgid))
+
+    def get_or_fetch(self, key, fetch):
+        self._configure()
+
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+
+        if self._use_sql():
+            value = self.sql.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+                return value
+
+        value = fetch()
+        self.memory.set(key, value)
+        if self._use_sql():
+            self.sql.set(key, value, self.memory.ttl)
+        return value
+
+    def clear(self):
+        self.memory.clear()
+
+
+reference_cache = ReferenceCache()
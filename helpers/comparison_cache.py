@@ -0,0 +1,95 @@
+import hashlib
+import json
+
+from flask import current_app, has_app_context
+
+from helpers.cache import TTLCache
+from helpers.game_comparison import compare_games, played_cutoff
+from logging_config import logger
+
+
+class ComparisonCache:
+    """Memoized compare_games results keyed by a hash of the inputs.
+
+    The key covers both game lists, the date window, the mode and the
+    'already played' cutoff of compare_games rounded down to the TTL, because
+    the same input gives a different result once a game falls behind the
+    cutoff. Within one key the cutoff moves at most one TTL, the same
+    staleness the TTL already allows. Results are stored already serialized,
+    and /api/compare also looks up the hash of the raw request body first, so
+    a repeated request costs one hash and no parsing.
+    """
+
+    def __init__(self, maxsize=256, ttl=900):
+        self.memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._configured = False
+
+    def _configure(self):
+        if self._configured or not has_app_context():
+            return
+        config = current_app.config
+        self.memory.maxsize = config.get('COMPARE_CACHE_MAXSIZE', self.memory.maxsize)
+        self.memory.ttl = config.get('COMPARE_CACHE_TTL', self.memory.ttl)
+        self._configured = True
+
+    @staticmethod
+    def _digest(*parts):
+        digest = hashlib.blake2b(digest_size=20)
+        for part in parts:
+            digest.update(part if isinstance(part, bytes) else str(part).encode('utf-8'))
+            digest.update(b'\x00')
+        return digest.hexdigest()
+
+    def cutoff_bucket(self, cutoff=None):
+        cutoff = cutoff or played_cutoff()
+        return int(cutoff.timestamp() // max(self.memory.ttl, 1))
+
+    def make_key(self, jopox_games, tulospalvelu_games, date_window_days, mode, cutoff=None):
+        # Avainten järjestys ei vaikuta, listojen järjestys vaikuttaa (greedy-parit)
+        payload = json.dumps(
+            [jopox_games, tulospalvelu_games],
+            sort_keys=True,
+            separators=(',', ':'),
+            ensure_ascii=False,
+            default=str,
+        )
+        return self._digest('games', payload, date_window_days, mode, self.cutoff_bucket(cutoff))
+
+    def body_key(self, body, date_window_days, default_mode, cutoff=None):
+        """Key of a raw /api/compare request body; lets repeated requests skip JSON parsing."""
+        self._configure()
+        return self._digest('body', body, date_window_days, default_mode, self.cutoff_bucket(cutoff))
+
+    def get(self, key):
+        self._configure()
+        return self.memory.get(key)
+
+    def compare_json(self, jopox_games, tulospalvelu_games, date_window_days, mode, body_key=None):
+        """Return the comparison result as a JSON string, computing it only on a cache miss.
+
+        With `body_key` the result is also stored under the key of the raw
+        request body, so the next identical request is answered by get().
+        """
+        self._configure()
+        key = self.make_key(jopox_games, tulospalvelu_games, date_window_days, mode)
+
+        serialized = self.memory.get(key)
+        if serialized is None:
+            results = compare_games(jopox_games, tulospalvelu_games, date_window_days=date_window_days, mode=mode) or {}
+            serialized = current_app.json.dumps(results)
+            self.memory.set(key, serialized)
+        else:
+            logger.debug("comparison_cache_hit key=%s", key)
+
+        if body_key is not None:
+            self.memory.set(body_key, serialized)
+        return serialized
+
+    def stats(self):
+        return self.memory.stats()
+
+    def clear(self):
+        self.memory.clear()
+
+
+comparison_cache = ComparisonCache()
@@ -0,0 +1,122 @@
+import json
+
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from flask import current_app
+
+from extensions import db
+from helpers.game_comparison import compare_games
+from helpers.game_fetcher import fetch_one
+from helpers.jopox_games import fetch_jopox_games
+from helpers.user_schedule import (
+    games_for_comparison, make_fetcher, schedule_sort_key, store_games, team_games, user_teams,
+)
+from logging_config import logger
+from models.user import User
+
+
+def _jopox_games_in_context(app, user_id):
+    # Oma app context säikeelle, jotta tietokanta ja asetukset ovat käytössä
+    with app.app_context():
+        try:
+            return fetch_jopox_games(db.session.get(User, user_id))
+        finally:
+            db.session.remove()
+
+
+def dashboard_events(user_id):
+    """Yield the schedule page data as events while it is being produced.
+
+    The tulospalvelu fetches of all teams and the Jopox scrape run in
+    parallel; every team is emitted as soon as its games are in, and the
+    comparison runs server-side once both sides are complete. The comparison
+    is done once over all games (like /api/compare) and then emitted team by
+    team, so the one-to-one matching is the same as before.
+    """
+    app = current_app._get_current_object()
+    config = app.config
+    user = db.session.get(User, user_id)
+    has_jopox = bool(user and user.jopox_username and user.jopox_password)
+
+    teams = user_teams(user_id)
+    fetchers = [make_fetcher(team) for team in teams]
+    yield {
+        "type": "start",
+        "has_jopox": has_jopox,
+        "teams": [{"team_id": t["team_id"], "team_name": t["team_name"], "type": t["type"]} for t in teams],
+    }
+
+    games_by_team = {}
+    changed_team_ids = set()
+    jopox_games = None
+
+    workers = max(1, min(config.get('SCHEDULE_FETCH_WORKERS', 8), len(fetchers) or 1))
+    with ThreadPoolExecutor(max_workers=workers + 1) as executor:
+        jopox_future = executor.submit(_jopox_games_in_context, app, user_id) if has_jopox else None
+        futures = {executor.submit(fetch_one, fetcher): index for index, fetcher in enumerate(fetchers)}
+
+        for future in as_completed(futures):
+            team = teams[futures[future]]
+            fetcher = fetchers[futures[future]]
+            error = future.result()
+            try:
+                if error:
+                    raise RuntimeError(error)
+                games = team_games(team, fetcher)
+            except Exception as e:
+                logger.error(f"Error fetching games for {team['team_name']}: {str(e)}")
+                yield {"type": "team_error", "team_id": team["team_id"], "error": str(e)}
+                continue
+
+            if fetcher.changed:
+                changed_team_ids.add(team['team_id'])
+            games_by_team[futures[future]] = games
+            yield {"type": "team", "team_id": team["team_id"], "team_name": team["team_name"], "games": games}
+
+        if jopox_future is not None:
+            try:
+                jopox_games = jopox_future.result()
+                yield {"type": "jopox", "count": len(jopox_games)}
+            except Exception as e:
+                logger.exception("Error fetching Jopox games")
+                yield {"type": "jopox_error", "error": str(e)}
+
+    # Joukkueiden järjestys kuten /api/schedules:ssa, jotta duplikaattien karsinta on sama
+    managed_games = [game for index in sorted(games_by_team) for game in games_by_team[index]]
+    managed_games.sort(key=schedule_sort_key)
+    added_games, updated_games = store_games(managed_games, changed_team_ids, fetchers)
+
+    if jopox_games:
+        # Sama JSON-muoto kuin selain lähettäisi /api/compare:lle
+        games = games_for_comparison(json.loads(app.json.dumps(managed_games)))
+        try:
+            comparisons = compare_games(
+                jopox_games,
+                games,
+                date_window_days=config.get('COMPARE_DATE_WINDOW_DAYS', 7),
+                mode=config.get('COMPARE_MODE', 'greedy'),
+            ) or []
+        except Exception as e:
+            logger.exception("compare_games raised")
+            comparisons = []
+            yield {"type": "comparison_error", "error": str(e)}
+
+        by_team = defaultdict(list)
+        for result in comparisons:
+            by_team[result['game'].get('Team ID')].append(result)
+        for team in teams:
+            if by_team.get(team['team_id']):
+                yield {"type": "comparison", "team_id": team["team_id"], "results": by_team.pop(team['team_id'])}
+        for team_id, results in by_team.items():
+            yield {"type": "comparison", "team_id": team_id, "results": results}
+
+    yield {"type": "done", "count": len(managed_games), "added": len(added_games), "updated": len(updated_games)}
+
+
+def format_ndjson(event):
+    return current_app.json.dumps(event) + "\n"
+
+
+def format_sse(event):
+    return f"event: {event['type']}\ndata: {current_app.json.dumps(event)}\n\n"
@@ -1,44 +1,74 @@
 import requests
-from ics import Calendar
 import logging
 
-def get_levels(season):
-    url = "https://tulospalvelu.leijonat.fi/helpers/getLevels.php"
-    payload = {'season': season}
-    response = requests.post(url, data=payload)
+from datetime import datetime
+
+from helpers.cache import reference_cache
+from helpers.upstream import TULOSPALVELU_URL, upstream
+
+def _post_json(url, payload):
+    # Tulospalvelun helpers-rajapinnat vain lukevat, joten POSTin voi toistaa
+    response = upstream.post(url, data=payload, idempotent=True)
     response.raise_for_status()
     return response.json()
 
+def get_levels(season):
+    url = f"{TULOSPALVELU_URL}/helpers/getLevels.php"
+    payload = {'season': season}
+    key = reference_cache.make_key('levels', season)
+    return reference_cache.get_or_fetch(key, lambda: _post_json(url, payload))
+
 def get_stat_groups(season, level_id, district_id=0):
-    url = "https://tulospalvelu.leijonat.fi/serie/helpers/getStatGroups.php"
+    url = f"{TULOSPALVELU_URL}/serie/helpers/getStatGroups.php"
     payload = {
         'season': season,
         'levelid': level_id,
         'districtid': district_id
     }
-    response = requests.post(url, data=payload)
-    response.raise_for_status()
-    return response.json()
+    key = reference_cache.make_key('statgroups', season, level_id, district_id)
+    return reference_cache.get_or_fetch(key, lambda: _post_json(url, payload))
 
 def get_teams(season, stat_group_id):
-    url = "https://tulospalvelu.leijonat.fi/serie/helpers/getStatGroup.php"
+    url = f"{TULOSPALVELU_URL}/serie/helpers/getStatGroup.php"
     payload = {'season': season, 'stgid': stat_group_id}
-    response = requests.post(url, data=payload)
-    response.raise_for_status()
-    return response.json()
+    key = reference_cache.make_key('teams', season, stgid=stat_group_id)
+    return reference_cache.get_or_fetch(key, lambda: _post_json(url, payload))
+
+def current_season(today=None):
+    """Tulospalvelun kausi nimetään päättymisvuoden mukaan (2025-2026 -> 2026)."""
+    today = today or datetime.now()
+    return today.year + 1 if today.month >= 5 else today.year
+
+def warm_reference_cache(season):
+    """Preload levels, stat groups and teams of a season into the cache."""
+    counts = {'levels': 0, 'statgroups': 0, 'teams': 0}
+    for level in get_levels(season) or []:
+        counts['levels'] += 1
+        level_id = level.get('LevelID')
+        if level_id is None:
+            continue
+        for stat_group in get_stat_groups(season, level_id) or []:
+            counts['statgroups'] += 1
+            stat_group_id = stat_group.get('StatGroupID')
+            if stat_group_id is None:
+                continue
+            get_teams(season, stat_group_id)
+            counts['teams'] += 1
+    return counts
 
 def hae_kalenteri(calendar_url):
     descriptions = []
     
     # Step 2: Fetch the ICS file
     try:
-        response = requests.get(calendar_url)
+        response = upstream.get(calendar_url)
         response.raise_for_status()  # Raise an error for bad responses
         ics_content = response.text
     except requests.exceptions.RequestException as e:
         return []
 
-    # Step 3: Parse the ICS file
+    # Step 3: Parse the ICS file (ics ja arrow ladataan vasta tässä)
+    from ics import Calendar
     calendar = Calendar(ics_content)
 
     logging.debug(f"calendar fetched.")
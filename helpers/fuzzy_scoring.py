@@ -0,0 +1,110 @@
+"""Fuzzy string scoring backends.
+
+Scores are integers 0-100 and compatible with fuzzywuzzy's fuzz.ratio and
+fuzz.partial_ratio, so the existing thresholds (80 for locations, 90 for team
+names) keep their meaning. RapidFuzz is used when installed; otherwise a
+pure-Python difflib implementation of the same algorithms is used.
+"""
+from difflib import SequenceMatcher
+
+try:
+    from rapidfuzz import fuzz as rf_fuzz, process as rf_process
+    from rapidfuzz.distance import Indel, Levenshtein
+except ImportError:  # RapidFuzz is optional; PythonBackend covers the same API
+    rf_fuzz = rf_process = Indel = Levenshtein = None
+
+
+def _intr(value):
+    # Sama pyöristys kuin fuzzywuzzy.utils.intr
+    return int(round(value))
+
+
+def _partial_ratio(s1, s2, matching_blocks, similarity):
+    """fuzzywuzzy's partial_ratio: best window of the longer string around each matching block."""
+    if s1 == s2:
+        return 100
+    if not s1 or not s2:
+        return 0
+
+    shorter, longer = (s1, s2) if len(s1) <= len(s2) else (s2, s1)
+    best = 0.0
+    for short_start, long_start, _ in matching_blocks(shorter, longer):
+        start = max(long_start - short_start, 0)
+        r = similarity(shorter, longer[start:start + len(shorter)])
+        if r > .995:
+            return 100
+        best = max(best, r)
+    return _intr(100 * best)
+
+
+class RapidFuzzBackend:
+    name = 'rapidfuzz'
+
+    def ratio(self, s1, s2):
+        return _intr(rf_fuzz.ratio(s1, s2))
+
+    def partial_ratio(self, s1, s2):
+        return _partial_ratio(
+            s1, s2,
+            lambda a, b: Levenshtein.editops(a, b).as_matching_blocks(),
+            Indel.normalized_similarity,
+        )
+
+    def ratio_matrix(self, queries, choices):
+        import numpy as np
+
+        # Yksi C-tason kutsu koko matriisille
+        scores = rf_process.cdist(queries, choices, scorer=rf_fuzz.ratio, dtype=np.float64)
+        return np.rint(scores).astype(int)
+
+    def partial_ratio_matrix(self, queries, choices):
+        import numpy as np
+
+        return np.array([[self.partial_ratio(q, c) for c in choices] for q in queries], dtype=int).reshape(len(queries), len(choices))
+
+
+class PythonBackend:
+    name = 'python'
+
+    def ratio(self, s1, s2):
+        if s1 == s2:
+            return 100
+        if not s1 or not s2:
+            return 0
+        return _intr(100 * SequenceMatcher(None, s1, s2).ratio())
+
+    def partial_ratio(self, s1, s2):
+        return _partial_ratio(
+            s1, s2,
+            lambda a, b: SequenceMatcher(None, a, b).get_matching_blocks(),
+            lambda a, b: SequenceMatcher(None, a, b).ratio(),
+        )
+
+    def ratio_matrix(self, queries, choices):
+        import numpy as np
+
+        return np.array([[self.ratio(q, c) for c in choices] for q in queries], dtype=int).reshape(len(queries), len(choices))
+
+    def partial_ratio_matrix(self, queries, choices):
+        import numpy as np
+
+        return np.array([[self.partial_ratio(q, c) for c in choices] for q in queries], dtype=int).reshape(len(queries), len(choices))
+
+
+def get_backend():
+    return RapidFuzzBackend() if rf_fuzz is not None else PythonBackend()
+
+
+class ScoreTable:
+    """Scores for every distinct (query, choice) string pair, computed in one batch."""
+
+    def __init__(self, matrix_fn, queries, choices):
+        self.queries = {value: i for i, value in enumerate(dict.fromkeys(queries))}
+        self.choices = {value: i for i, value in enumerate(dict.fromkeys(choices))}
+        self.matrix = matrix_fn(list(self.queries), list(self.choices))
+
+    def __call__(self, query, choice):
+        return int(self.matrix[self.queries[query], self.choices[choice]])
+
+
+backend = get_backend()
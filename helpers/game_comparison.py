@@ -1,10 +1,29 @@
 import re
 
-from fuzzywuzzy import fuzz
+from collections import defaultdict
 from datetime import datetime, timedelta
+from functools import lru_cache
 
+from helpers.fuzzy_scoring import ScoreTable, backend as fuzzy_backend
 from logging_config import logger
 
+# Jopox-pelit tämän ikkunan sisällä pisteytetään aina; kauempana olevat vain,
+# jos niiden suurin mahdollinen pistemäärä voisi ylittää parhaan ehdokkaan.
+DEFAULT_DATE_WINDOW_DAYS = 7
+
+# Suurin pistemäärä, jonka sijainti, joukkueet ja pienpelimaininta voivat tuoda
+MAX_LOCATION_SCORE = 30
+MAX_TEAM_SCORE = 15 + 15 + 10
+MAX_SMALL_AREA_SCORE = 20
+
+WARNING_TEXT = (
+    "En ole varma löysinkö oikean ottelun."
+    "Tarkista Jopoxista, että päivämäärä, joukkueiden nimet ja alkamisaika vastaavat tulospalvelua. "
+    "Esimerkiksi joukkueiden nimien tai pelipaikan lyhentäminen voi aiheuttaa ongelmia. "
+    "Jos ottelun alkamisaikaa ei ole merkitty, käytä Jopoxissa oletusaikaa 07:00. "
+    "Löydän parhaiten ottelun jos Jopoxissa on merkitty alkamisajaksi todellinen ottelun alkamisaika."
+)
+
 def parse_sortable_date(date_string):
     """Parse SortableDate string into a date object."""
     try:
@@ -16,229 +35,469 @@ def parse_sortable_date(date_string):
         raise ValueError(f"Error parsing SortableDate: {date_string}") from e
 
 
-def compare_games(jopox_games, tulospalvelu_games):
-    """Compare games from Jopox and Tulospalvelu.fi datasets."""
-    # Initialize logging
-        
-    results = []
+def played_cutoff():
+    """Games starting before this (yesterday at this time) are already played and left out."""
+    return datetime.now() - timedelta(days=1)
 
-    managed_games = [managed_game for managed_game in tulospalvelu_games if managed_game['Type'] != 'follow']
-    logger.info('Comparing games from Tulospalvelu and Jopox')
-    logger.info("Total managed games: %d", len(managed_games))
-    logger.info("Total Jopox games: %d", len(jopox_games))
 
-    for t_game in managed_games:    
-        
-        # Parse date from Tulospalvelu game
+_NUMBER_RE = re.compile(r'\d+')
+
+
+def _first_number(text):
+    match = _NUMBER_RE.search(text)
+    return match.group() if match else None
+
+
+def _parse_time(value):
+    try:
+        return datetime.strptime(value, '%H:%M')
+    except ValueError:
+        return None
+
+
+class JopoxRecord:
+    """Jopox game normalized once for the matcher."""
+    __slots__ = ('position', 'game', 'datetime', 'day', 'date_str', 'time', 'time_value',
+                 'location', 'rink_number', 'home', 'away', 'has_info', 'info_small_area', 'teams_small_area')
+
+    def __init__(self, position, game, game_datetime):
+        self.position = position  # Index in the original Jopox list, used for tie-breaking
+        self.game = game
+        self.datetime = game_datetime
+        self.day = game_datetime.date()
+        self.date_str = game_datetime.strftime('%Y-%m-%d')
+        self.time = game['aika']
+        parsed_time = _parse_time(self.time)
+        self.time_value = parsed_time.time() if parsed_time else None
+        self.location = game['paikka'].lower()
+        self.rink_number = _first_number(self.location)
+        teams = game['joukkueet'].split(' - ')
+        self.home = teams[0].lower()
+        self.away = teams[1].lower()
+        info = game.get('Lisätiedot')
+        self.has_info = bool(info)
+        self.info_small_area = bool(info) and 'pienpeli' in info.lower()
+        self.teams_small_area = 'pienpeli' in game['joukkueet'].lower()
+
+
+class TulospalveluRecord:
+    """Tulospalvelu game normalized once for the matcher."""
+    __slots__ = ('game', 'datetime', 'day', 'date_str', 'time', 'time_ok', 'time_value', 'arrival_time',
+                 'location', 'rink_number', 'small_area_game', 'home', 'away')
+
+    def __init__(self, game, game_datetime):
+        self.game = game
+        self.datetime = game_datetime
+        self.day = game_datetime.date()
+        self.date_str = game_datetime.strftime('%Y-%m-%d')
+        self.time = "Not scheduled" if game['Time'] == "00:00" else game['Time']
+        parsed_time = _parse_time(self.time) if self.time != "Not scheduled" else None
+        self.time_ok = self.time == "Not scheduled" or parsed_time is not None
+        self.time_value = parsed_time.time() if parsed_time else None
+        self.arrival_time = (parsed_time - timedelta(hours=1)).time() if parsed_time else None
+        self.location = game['Location'].lower()
+        self.rink_number = _first_number(self.location)
+        self.small_area_game = game['Small Area Game'] == '1'
+        self.home = game['Home Team'].lower()
+        self.away = game['Away Team'].lower()
+
+
+def build_date_index(jopox_games, cutoff):
+    """Normalize upcoming Jopox games and bucket them by date.
+
+    Records keep their position in the original Jopox list so ties resolve
+    exactly as before.
+    """
+    index = defaultdict(list)
+    for position, j_game in enumerate(jopox_games):
         try:
-            t_game_datetime = parse_sortable_date(t_game['SortableDate'])
+            # Parse the sortable_date field from Jopox game
+            j_game_datetime = datetime.strptime(j_game['sortable_date'], '%Y-%m-%d %H:%M')
         except ValueError:
-            logger.error("Invalid SortableDate format for game: %s", t_game)
-            results.append({
-                'game': t_game,
-                'match_status': 'red',
-                'reason': f"Invalid date format: {t_game['SortableDate']}",
-                'best_match': None,
-            })
+            logger.error("Invalid sortable_date format: %s", j_game['sortable_date'])
             continue
 
-        # Extract t_Game details
-        date = t_game_datetime.strftime('%Y-%m-%d')
-
         # Skip games that have already been played before yesterday
-        if t_game_datetime < datetime.now() - timedelta(days=1):
+        if j_game_datetime < cutoff:
             continue
 
-        time = t_game['Time']
-        location = t_game['Location'].lower()
-        small_area_game = t_game['Small Area Game'] == '1'
-        home_team = t_game['Home Team'].lower() 
-        away_team = t_game['Away Team'].lower()
+        record = JopoxRecord(position, j_game, j_game_datetime)
+        if record.time_value is None:
+            logger.error("Invalid time format in Jopox game: %s", record.time)
+            continue
+        index[record.day].append(record)
+    return index
+
+
+class PairScorer:
+    """Fuzzy scores for every distinct location and team name pair.
+
+    Rinks and team names repeat across a season, so each distinct string pair
+    is scored once, in a single batch per field.
+    """
+
+    def __init__(self, t_records, j_records, backend=None):
+        backend = backend or fuzzy_backend
+        self.location = ScoreTable(
+            backend.partial_ratio_matrix,
+            [t.location for t in t_records],
+            [j.location for j in j_records],
+        )
+        self.team = ScoreTable(
+            backend.ratio_matrix,
+            [name for j in j_records for name in (j.home, j.away)],
+            [name for t in t_records for name in (t.home, t.away)],
+        )
+
+
+def score_time(t, j):
+    """Score the start time of a Jopox game. Returns (score, color_score, reason)."""
+    if t.time == "Not scheduled" and (j.time == "07:00" or j.time == "00:00"):
+        return 30, 1, "Ottelun alkamisaika ei ole määritetty Tulospalvelussa. Jopox-aika vastaa oletusta (07:00). "
+    elif t.time == "07:00" and j.time == "07:00":
+        return 30, 1, "Ottelun alkamisaika Tulospalvelussa on 07:00. Jopox-aika vastaa oletusta (07:00). "
+    elif t.time_value and t.time_value == j.time_value:  # Exact match
+        return 50, 0, ""
+    elif t.arrival_time and t.arrival_time == j.time_value:  # Arrival time
+        return 30, 1, "Jopoxiin merkitty alkamisaika on tuntia aikaisemmin kuin Tulospalvelussa. "
+    else:
+        return 0, 1, f"Ottelun oikea alkamisaika on klo: {t.time}, mutta Jopoxissa se on klo {j.time}. "
+
+
+def score_pair(t, j, scorer):
+    """Score one Tulospalvelu/Jopox record pair. Returns (score, color_score, reason)."""
+    score = 0
+    color_score = 0
+    reason = ""
+
+    # Date Matching
+    if t.day == j.day:
+        score += 30
+    else:
+        reason += f"Ottelun päivämäärä on {t.date_str}, mutta Jopoxissa se on {j.date_str}. "
+        color_score += 1
+
+    # Time Matching
+    time_score, time_color, time_reason = score_time(t, j)
+    score += time_score
+    color_score += time_color
+    reason += time_reason
+
+    # Location Matching
+    if scorer.location(t.location, j.location) > 80:
+        score += 30
+        if t.rink_number is not None and j.rink_number is not None and t.rink_number != j.rink_number:
+            score -= 15
+            color_score += 1
+            reason += f"Ottelu pelataan paikassa: {t.location}, mutta Jopoxiin on merkattu: {j.location}. "
+        # if t_location has no number and j_location has any number then score -15
+        elif t.rink_number is None and j.rink_number is not None:
+            score -= 15
+            color_score += 1
+            reason += f"Ottelu pelataan paikassa: {t.location}, mutta Jopoxiin on merkattu: {j.location}. "
+    else:
+        reason += f"Ottelu pelataan paikassa: {t.location}, mutta Jopoxiin on merkattu: {j.location}. "
+        color_score += 1
+
+    home_team_match_score = scorer.team(j.home, t.home)
+    if home_team_match_score > 90:
+        score += 15
+    else:
+        reason += f"Kotijoukkueen pitäisi olla {t.home}"
+        color_score += 1
+
+    away_team_match_score = scorer.team(j.away, t.away)
+    if away_team_match_score > 90:
+        score += 15
+    else:
+        reason += f"Vierasjoukkueen pitäisi olla {t.away}"
+        color_score += 1
+
+    team_score = home_team_match_score + away_team_match_score
+    if team_score >= 180:
+        score += 10
+
+    if j.has_info:
+        if t.small_area_game:
+            if not j.info_small_area and not j.teams_small_area:
+                reason += "Kyseessä on pienpeli, mutta siitä ei ole mainintaa Jopoxissa. "
+                color_score += 1
+            else:
+                score += 20
+        else:
+            if j.info_small_area or (j.teams_small_area and team_score >= 180):
+                reason += "Kyseessä ei ole pienpeli, vaikka Jopoxissa se on mainittu."
+                score -= 20
+            if j.info_small_area or (j.teams_small_area and team_score <= 180):
+                reason += "Kyseessä ei ole pienpeli, vaikka Jopoxissa se on mainittu."
+                score -= 10
+
+    return score, color_score, reason
+
+
+def score_upper_bound(t, j):
+    """Cheap upper bound of score_pair() for a Jopox game on a different date (no fuzzy matching)."""
+    bound = score_time(t, j)[0] + MAX_LOCATION_SCORE + MAX_TEAM_SCORE
+    if t.small_area_game and j.has_info:
+        bound += MAX_SMALL_AREA_SCORE
+    return bound
 
-        if time == "00:00":
-            time = "Not scheduled"
 
+@lru_cache(maxsize=None)
+def _scipy_linear_sum_assignment():
+    # SciPy is optional and slow to import; loaded on the first 'optimal' comparison
+    try:
+        from scipy.optimize import linear_sum_assignment
+    except ImportError:  # fall back to the NumPy implementation below
+        return None
+    return linear_sum_assignment
+
+
+def linear_sum_assignment_max(weights):
+    """Maximum-weight assignment for a weight matrix (Hungarian method).
+
+    Returns col_for_row: the column assigned to each row, or -1 when a
+    wide matrix leaves a row unassigned. Uses SciPy when it is installed
+    and a NumPy implementation otherwise.
+    """
+    import numpy as np
+
+    n_rows, n_cols = weights.shape
+    col_for_row = np.full(n_rows, -1, dtype=int)
+
+    linear_sum_assignment = _scipy_linear_sum_assignment()
+    if linear_sum_assignment is not None:
+        rows, cols = linear_sum_assignment(weights, maximize=True)
+        col_for_row[rows] = cols
+        return col_for_row
+
+    if n_rows > n_cols:
+        # Algoritmi vaatii rivejä <= sarakkeita: ratkaistaan transpoosi
+        row_for_col = linear_sum_assignment_max(weights.T)
+        col_for_row[row_for_col] = np.arange(n_cols)
+        return col_for_row
+
+    n, m = n_rows, n_cols
+    cost = weights.max(initial=0) - weights
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=int)  # p[j] = row (1-based) assigned to column j
+    way = np.zeros(m + 1, dtype=int)
+
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            free = ~used[1:]
+            current = cost[i0 - 1] - u[i0] - v[1:]
+            improve = free & (current < minv[1:])
+            minv[1:][improve] = current[improve]
+            way[1:][improve] = j0
+            candidates = np.where(free, minv[1:], np.inf)
+            j1 = int(candidates.argmin()) + 1
+            delta = candidates[j1 - 1]
+            u[p[used]] += delta
+            v[used] -= delta
+            minv[1:][free] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+
+    assigned = np.nonzero(p[1:])[0]
+    col_for_row[p[1:][assigned] - 1] = assigned
+    return col_for_row
+
+
+def _result(t_game, best, matched=None):
+    """Build one comparison result from the winning (position, j_game, score, color, reason) entry."""
+    if best and best[2] > 0:
+        position, best_match, best_score, color_score, best_reason = best
+        warning_reason = WARNING_TEXT if best_score < 105 else None
+
+        # Determine match status
+        if color_score == 0:
+            match_status = 'green'
+            best_reason = "Ottelu löytyy Jopoxista. Ei huomioita."
+        else:
+            match_status = 'yellow'
+        if matched is not None:
+            matched.add(position)
+    else:
         best_match = None
-        best_matches = []
-        best_score = 0
-        best_reason = ""
-        color_score = 0  # Track discrepancies for color scoring
         warning_reason = ""
+        match_status = 'red'
+        best_reason = "En löytänyt ottelua Jopoxista."
+
+    return {
+        'game': t_game,
+        'match_status': match_status,
+        'reason': best_reason.strip(),
+        'warning': warning_reason.strip() if warning_reason else None,
+        'best_match': best_match,
+    }
+
+
+def _invalid_date_result(t_game):
+    return {
+        'game': t_game,
+        'match_status': 'red',
+        'reason': f"Invalid date format: {t_game['SortableDate']}",
+        'best_match': None,
+    }
+
+
+def prepare_tulospalvelu_games(managed_games, cutoff):
+    """Yield (t_game, record) for upcoming games; record is None for an invalid SortableDate."""
+    for t_game in managed_games:
+        # Parse date from Tulospalvelu game
+        try:
+            t_game_datetime = parse_sortable_date(t_game['SortableDate'])
+        except ValueError:
+            logger.error("Invalid SortableDate format for game: %s", t_game)
+            yield t_game, None
+            continue
 
-        for j_game in jopox_games:
-            try:
-                # Parse the sortable_date field from Jopox game
-                j_game_datetime = datetime.strptime(j_game['sortable_date'], '%Y-%m-%d %H:%M')
-            except ValueError:
-                logger.error("Invalid sortable_date format: %s", j_game['sortable_date'])
-                continue
+        # Skip games that have already been played before yesterday
+        if t_game_datetime < cutoff:
+            continue
 
-            # Skip games that have already been played before yesterday
-            if j_game_datetime < datetime.now() - timedelta(days=1):
+        t = TulospalveluRecord(t_game, t_game_datetime)
+        if not t.time_ok:
+            logger.error("Invalid time format in Tulospalvelu game: %s", t.time)
+        yield t_game, t
+
+
+def compare_games_optimal(t_records, jopox_records, date_window_days, scorer):
+    """Match games with a global maximum-weight one-to-one assignment.
+
+    Scores are computed once for every pair within the date window; the
+    assignment maximises the total score instead of taking matches greedily.
+    Records the assignment leaves unmatched then take their best free Jopox
+    game outside the window, as in greedy mode. Both sides are put into a
+    canonical order first, so the result does not depend on the input order.
+    Returns the winning entry for each record.
+    """
+    if not t_records or not jopox_records:
+        return [None] * len(t_records)
+
+    import numpy as np
+
+    t_order = sorted(range(len(t_records)), key=lambda i: (t_records[i].datetime, str(t_records[i].game.get('Game ID'))))
+    j_sorted = sorted(jopox_records, key=lambda j: (j.datetime, str(j.game.get('uid')), j.position))
+
+    t_days = np.array([t_records[i].day.toordinal() for i in t_order])
+    j_days = np.array([j.day.toordinal() for j in j_sorted])
+    t_valid = np.array([t_records[i].time_ok for i in t_order])
+    window = (np.abs(t_days[:, None] - j_days[None, :]) <= date_window_days) & t_valid[:, None]
+
+    weights = np.zeros((len(t_order), len(j_sorted)))
+    entries = {}
+    for row, col in zip(*np.nonzero(window)):
+        j = j_sorted[col]
+        entry = (j.position, j.game) + score_pair(t_records[t_order[row]], j, scorer)
+        if entry[2] > 0:
+            weights[row, col] = entry[2]
+            entries[(row, col)] = entry
+
+    col_for_row = linear_sum_assignment_max(weights)
+
+    best = [None] * len(t_records)
+    used = set()
+    for row, record_index in enumerate(t_order):
+        best[record_index] = entries.get((row, int(col_for_row[row])))
+        if best[record_index] is not None:
+            used.add(int(col_for_row[row]))
+
+    # Ikkunan sisällä jääneillä vapailla peleillä on näille nolla pistettä, joten haetaan ikkunan ulkopuolelta
+    for row, record_index in enumerate(t_order):
+        t = t_records[record_index]
+        if best[record_index] is not None or not t.time_ok:
+            continue
+        winner = None
+        for col, j in enumerate(j_sorted):
+            if col in used or window[row, col]:
                 continue
-
-            
-            # Extract J_Game details
-            j_time = j_game['aika']
-            j_location = j_game['paikka'].lower()
-            j_team_home = j_game['joukkueet'].split(' - ')[0].lower()
-            j_team_away = j_game['joukkueet'].split(' - ')[1].lower()
-            
-            # Convert times
-            try:
-                t_game_time = datetime.strptime(time, '%H:%M') if time != "Not scheduled" else None
-                j_game_time = datetime.strptime(j_time, '%H:%M')
-            except ValueError:
-                logger.error("Invalid time format: Tulospalvelu %s vs Jopox %s", time, j_time)
+            if winner and score_upper_bound(t, j) <= winner[1][2]:
                 continue
-            
-
-            # Temporary scoring for this Jopox game
-            score = 0
-            color_score_temp = 0
-            reason = ""
+            entry = (j.position, j.game) + score_pair(t, j, scorer)
+            if entry[2] > 0 and (not winner or entry[2] > winner[1][2]):
+                winner = (col, entry)
+        if winner:
+            used.add(winner[0])
+            best[record_index] = winner[1]
+    return best
+
+
+def compare_games(jopox_games, tulospalvelu_games, date_window_days=DEFAULT_DATE_WINDOW_DAYS, mode='greedy'):
+    """Compare games from Jopox and Tulospalvelu.fi datasets.
+
+    In 'greedy' mode (default) every Tulospalvelu game takes its best-scoring
+    free Jopox game in turn. Jopox games are bucketed by date: candidates
+    within ±date_window_days are always scored, and games further away only
+    when their score upper bound could still beat the best nearby candidate,
+    so the result is the same as scoring every pair.
+
+    In 'optimal' mode the games within the date window are matched with a
+    global maximum-weight assignment; games left unmatched fall back to the
+    best free Jopox game outside the window, see compare_games_optimal().
+    """
+    cutoff = played_cutoff()
+    date_index = build_date_index(jopox_games, cutoff)
+    upcoming = sorted((j for bucket in date_index.values() for j in bucket), key=lambda j: j.position)
 
-            # Date Matching
-            if date == j_game_datetime.strftime('%Y-%m-%d'):
-                score += 30
-            else:
-                reason += f"Ottelun päivämäärä on {date}, mutta Jopoxissa se on {j_game_datetime.strftime('%Y-%m-%d')}. "
-                color_score_temp += 1
-
-            # Time Matching
-            if time == "Not scheduled" and (j_time == "07:00" or j_time == "00:00"):
-                score += 30 
-                reason += "Ottelun alkamisaika ei ole määritetty Tulospalvelussa. Jopox-aika vastaa oletusta (07:00). "
-                color_score_temp += 1
-
-            elif time == "07:00" and j_time == "07:00":
-                score += 30
-                reason += "Ottelun alkamisaika Tulospalvelussa on 07:00. Jopox-aika vastaa oletusta (07:00). "
-                color_score_temp += 1                
-            elif t_game_time and t_game_time.time() == j_game_time.time():  # Exact match
-                score += 50
-            elif t_game_time and (t_game_time - timedelta(hours=1)).time() == j_game_time.time():  # Arrival time
-                score += 30
-                reason += "Jopoxiin merkitty alkamisaika on tuntia aikaisemmin kuin Tulospalvelussa. "
-                color_score_temp += 1
-            else:
-                reason += f"Ottelun oikea alkamisaika on klo: {time}, mutta Jopoxissa se on klo {j_time}. "
-                color_score_temp += 1
-
-            # Location Matching
-            location_match_score = fuzz.partial_ratio(location, j_location)
-            if location_match_score > 80:
-                score += 30
-                
-                # find number from string location
-                t_location_number = re.findall(r'\d+', location)                
-                j_location_number = re.findall(r'\d+', j_location)
-
-                if t_location_number and j_location_number and t_location_number[0] != j_location_number[0]:
-                    score -= 15
-                    color_score_temp += 1
-                    reason += f"Ottelu pelataan paikassa: {location}, mutta Jopoxiin on merkattu: {j_location}. "
-                # if t_location has no number and j_location has any number then score -20
-                elif not t_location_number and j_location_number:
-                    score -= 15
-                    color_score_temp += 1                    
-                    reason += f"Ottelu pelataan paikassa: {location}, mutta Jopoxiin on merkattu: {j_location}. "
-                
-            else:
-                reason += f"Ottelu pelataan paikassa: {location}, mutta Jopoxiin on merkattu: {j_location}. "
-                color_score_temp += 1
+    managed_games = [managed_game for managed_game in tulospalvelu_games if managed_game['Type'] != 'follow']
+    logger.info('Comparing games from Tulospalvelu and Jopox (mode=%s)', mode)
+    logger.info("Total managed games: %d", len(managed_games))
+    logger.info("Total Jopox games: %d", len(jopox_games))
 
+    prepared = list(prepare_tulospalvelu_games(managed_games, cutoff))
+    t_records = [t for _, t in prepared if t is not None]
+    scorer = PairScorer(t_records, upcoming)
 
-            home_team_match_score = fuzz.ratio(j_team_home, home_team)
-            if home_team_match_score > 90:
-                score += 15
-            else:
-                reason += f"Kotijoukkueen pitäisi olla {home_team}"
-                color_score_temp += 1
+    if mode == 'optimal':
+        winners = iter(compare_games_optimal(t_records, upcoming, date_window_days, scorer))
+        return [
+            _result(t_game, next(winners)) if t is not None else _invalid_date_result(t_game)
+            for t_game, t in prepared
+        ]
 
-            away_team_match_score = fuzz.ratio(j_team_away, away_team)
-            if away_team_match_score > 90:
-                score += 15
+    results = []
+    matched = set()  # Positions of Jopox games already assigned to a Tulospalvelu game
 
-            else:
-                reason += f"Vierasjoukkueen pitäisi olla {away_team}"
-                color_score_temp += 1
-
-            team_score = home_team_match_score + away_team_match_score 
-            if team_score >= 180:
-                score += 10
-
-            if 'Lisätiedot' in j_game and j_game['Lisätiedot']:
-
-                if small_area_game:
-                    if 'pienpeli' not in j_game['Lisätiedot'].lower() and 'pienpeli' not in j_game['joukkueet'].lower():
-                        reason += "Kyseessä on pienpeli, mutta siitä ei ole mainintaa Jopoxissa. "
-                        color_score_temp += 1
-                    elif 'pienpeli' in j_game['Lisätiedot'].lower() or 'pienpeli' in j_game['joukkueet'].lower():
-                        score += 20
-
-                if not small_area_game:
-                    if 'Lisätiedot' in j_game and j_game['Lisätiedot']:
-                        if 'pienpeli' in j_game['Lisätiedot'].lower() or 'pienpeli' in j_game['joukkueet'].lower() and team_score >= 180:
-                            reason+="Kyseessä ei ole pienpeli, vaikka Jopoxissa se on mainittu."
-                            score -=20
-                        if 'pienpeli' in j_game['Lisätiedot'].lower() or 'pienpeli' in j_game['joukkueet'].lower() and team_score <= 180:
-                            reason+="Kyseessä ei ole pienpeli, vaikka Jopoxissa se on mainittu."
-                            score -=10
-
-            # Update the best match
-            if score > best_score:
-                best_score = score
-                best_match = j_game
-                best_reason = reason
-                color_score = color_score_temp
-
-            
-                if best_match is None or best_score < 105 :
-                    warning_reason = (
-                        "En ole varma löysinkö oikean ottelun."
-                        "Tarkista Jopoxista, että päivämäärä, joukkueiden nimet ja alkamisaika vastaavat tulospalvelua. "
-                        "Esimerkiksi joukkueiden nimien tai pelipaikan lyhentäminen voi aiheuttaa ongelmia. "
-                        "Jos ottelun alkamisaikaa ei ole merkitty, käytä Jopoxissa oletusaikaa 07:00. "
-                        "Löydän parhaiten ottelun jos Jopoxissa on merkitty alkamisajaksi todellinen ottelun alkamisaika."
-
-                    )
-
-                elif best_match and best_score > 1:
-                    warning_reason = None
-
-                best_matches.append({'match': best_match, 'score': best_score, 'reason': reason, 'color_score': color_score, 'warning': warning_reason})
-                
-
-        #pick the best match from best_matches and append it to results with color_score, reason and warning_reason
-                
-        if best_matches:
-            best_match = max(best_matches, key=lambda x: x['score'])['match']
-            best_score = max(best_matches, key=lambda x: x['score'])['score']
-            best_reason = max(best_matches, key=lambda x: x['score'])['reason']
-            color_score = max(best_matches, key=lambda x: x['score'])['color_score']
-            warning_reason = max(best_matches, key=lambda x: x['score'])['warning']
-
-            # Determine match status
-            if color_score == 0 and best_match:
-                match_status = 'green'
-                best_reason = "Ottelu löytyy Jopoxista. Ei huomioita."
-                jopox_games.remove(best_match)
-                
-            elif color_score > 0 and best_match:
-                match_status = 'yellow'
-                jopox_games.remove(best_match)
-        else:
-            match_status = 'red'
-            best_reason = "En löytänyt ottelua Jopoxista."
+    for t_game, t in prepared:
+        if t is None:
+            results.append(_invalid_date_result(t_game))
+            continue
 
+        # 1) Score nearby candidates
+        scored = []  # (position, j_game, score, color_score, reason)
+        if t.time_ok:
+            for offset in range(-date_window_days, date_window_days + 1):
+                for j in date_index.get(t.day + timedelta(days=offset), ()):
+                    if j.position not in matched:
+                        scored.append((j.position, j.game) + score_pair(t, j, scorer))
+
+        # 2) Score distant candidates only if they could still win
+        best = max(scored, key=lambda entry: (entry[2], -entry[0]), default=None)
+        for j in (upcoming if t.time_ok else ()):
+            if j.position in matched or abs((j.day - t.day).days) <= date_window_days:
+                continue
+            bound = score_upper_bound(t, j)
+            if best and (bound < best[2] or (bound == best[2] and j.position > best[0])):
+                continue
+            scored.append((j.position, j.game) + score_pair(t, j, scorer))
+            if not best or scored[-1][2] > best[2] or (scored[-1][2] == best[2] and j.position < best[0]):
+                best = scored[-1]
 
-        results.append({
-            'game': t_game,
-            'match_status': match_status,
-            'reason': best_reason.strip(),
-            'warning': warning_reason.strip() if warning_reason else None,
-            'best_match': best_match,
-        })
+        # Only positive scores count as a match; ties go to the earliest Jopox game
+        results.append(_result(t_game, best, matched))
 
     return results
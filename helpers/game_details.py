@@ -0,0 +1,98 @@
+import threading
+
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from flask import current_app, has_app_context
+
+from helpers.cache import TTLCache
+from logging_config import logger
+
+
+class GameDetailCache:
+    """Parsed Jopox Game.aspx pages per (user, uid) with a short TTL.
+
+    An entry holds the details shown in the edit dialog and the form state
+    (VIEWSTATE, EVENTVALIDATION, season, subsite) that modify_game posts
+    back, so opening the dialog and saving it share one page load.
+    Prefetches run in a small shared thread pool; a request for a uid that
+    is still being prefetched waits for that load instead of starting
+    another.
+    """
+
+    def __init__(self, maxsize=1024, ttl=120, workers=2):
+        self.memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.workers = workers
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        self._configured = False
+
+    def _configure(self):
+        if self._configured or not has_app_context():
+            return
+        config = current_app.config
+        self.memory.ttl = config.get('JOPOX_DETAIL_CACHE_TTL', self.memory.ttl)
+        self.workers = config.get('JOPOX_PREFETCH_WORKERS', self.workers)
+        self._configured = True
+
+    def get(self, user_id, uid, wait=None):
+        """Cached entry, or the result of an in-flight prefetch within `wait` seconds; None otherwise."""
+        self._configure()
+        key = (user_id, str(uid))
+        entry = self.memory.get(key)
+        if entry is not None:
+            return entry
+
+        with self._lock:
+            future = self._inflight.get(key)
+        if future is None or not wait:
+            return None
+        try:
+            return future.result(timeout=wait)
+        except TimeoutError:
+            return None
+
+    def store(self, user_id, uid, entry):
+        self._configure()
+        self.memory.set((user_id, str(uid)), entry)
+        return entry
+
+    def pop(self, user_id, uid):
+        return self.memory.pop((user_id, str(uid)))
+
+    def prefetch(self, user_id, uids, load):
+        """Start `load(uid)` in the background for uids not cached or already loading."""
+        self._configure()
+        submitted = 0
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='jopox-prefetch')
+            for uid in dict.fromkeys(str(uid) for uid in uids if uid):
+                key = (user_id, uid)
+                if key in self._inflight or self.memory.get(key) is not None:
+                    continue
+                future = self._executor.submit(self._run, key, load, uid)
+                self._inflight[key] = future
+                submitted += 1
+        return submitted
+
+    def _run(self, key, load, uid):
+        try:
+            entry = load(uid)
+            if entry is not None:
+                self.memory.set(key, entry)
+            return entry
+        except Exception:
+            logger.exception("jopox_detail_prefetch_failed user_id=%s uid=%s", *key)
+            return None
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            inflight = len(self._inflight)
+        return {**self.memory.stats(), "inflight": inflight}
+
+
+game_details = GameDetailCache()
@@ -1,8 +1,65 @@
+import hashlib
+import time
 import requests
-import pandas as pd
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from helpers.cache import TTLCache
+from helpers.upstream import TULOSPALVELU_URL, upstream
+from logging_config import logger
+
+# Viimeisin vastaus per (team_id, stat_group_id, season): hash, hakuaika ja pelit
+_fingerprints = TTLCache(maxsize=2048, ttl=24 * 3600)
+
+class GameRecord:
+    """One tulospalvelu game parsed once; replaces the per-team DataFrame."""
+    __slots__ = ('team_id', 'game_id', 'date', 'raw_date', 'time', 'home_team', 'away_team', 'home_goals',
+                 'away_goals', 'location', 'level_name', 'stat_group_name', 'small_area_game')
+
+    def __init__(self, team_id, game):
+        self.team_id = team_id
+        self.game_id = game.get('GameID', 'N/A')
+        self.raw_date = game.get('GameDate', 'N/A')
+        self.date = parse_game_date(self.raw_date)  # None, jos päivämäärä puuttuu tai on virheellinen
+        self.time = game.get('GameTime', 'N/A')
+        self.home_team = game.get('HomeTeamAbbrv', 'N/A')
+        self.away_team = game.get('AwayTeamAbbrv', 'N/A')
+        self.home_goals = game.get('HomeGoals', 'N/A')
+        self.away_goals = game.get('AwayGoals', 'N/A')
+        self.location = game.get('RinkName', 'N/A')
+        self.level_name = game.get('LevelName', 'N/A')
+        self.stat_group_name = game.get('StatGroupName', 'N/A')
+        self.small_area_game = game.get('SmallAreaGame', 'N/A')
+
+    def as_dict(self):
+        """Columns of the former display_games() DataFrame, Date as a datetime (or None)."""
+        return {
+            'Team ID': self.team_id,
+            'Game ID': self.game_id,
+            'Date': self.date,
+            'Time': self.time,
+            'Home Team': self.home_team,
+            'Away Team': self.away_team,
+            'Home Goals': self.home_goals,
+            'Away Goals': self.away_goals,
+            'Location': self.location,
+            'Level Name': self.level_name,
+            'Stat Group Name': self.stat_group_name,
+            'Small Area Game': self.small_area_game,
+        }
+
+
+def parse_game_date(value):
+    # Sama kuin pd.to_datetime(format='%d.%m.%Y', errors='coerce')
+    try:
+        return datetime.strptime(value, '%d.%m.%Y')
+    except (TypeError, ValueError):
+        return None
+
 
 class GameFetcher:
-    def __init__(self, dwl, season, stat_group_id, team_id, distr_id, GameDates, dog):
+    def __init__(self, dwl, season, stat_group_id, team_id, distr_id, GameDates, dog, timeout=None, max_age=0):
         self.dwl = dwl
         self.season = season
         self.stat_group_id = stat_group_id
@@ -10,10 +67,18 @@ class GameFetcher:
         self.distr_id = distr_id
         self.GameDates = GameDates
         self.dog = dog
+        self.timeout = timeout
+        self.max_age = max_age  # Seconds a stored response is served without refetching
         self.games = []
+        self.fingerprint = None
+        self.changed = True  # False when the payload hash matches the previous fetch
+
+    @property
+    def cache_key(self):
+        return (str(self.team_id), str(self.stat_group_id), str(self.season))
 
     def fetch_games(self):
-        url = "https://tulospalvelu.leijonat.fi/helpers/getGames.php"
+        url = f"{TULOSPALVELU_URL}/helpers/getGames.php"
         payload = {
             'dwl': self.dwl,
             'season': self.season,
@@ -24,44 +89,67 @@ class GameFetcher:
             'dog': self.dog            
         }
 
+        previous = _fingerprints.get(self.cache_key)
+        if previous and time.monotonic() - previous['fetched_at'] < self.max_age:
+            self.games = previous['games']
+            self.fingerprint = previous['hash']
+            self.changed = False
+            return None
+
         try:
-            response = requests.post(url, data=payload)
+            # Kokonaisaika uusintoineen, jotta SCHEDULE_FETCH_TIMEOUT on todellinen yläraja
+            response = upstream.post(url, data=payload, deadline=self.timeout, idempotent=True)
             response.raise_for_status()
             self.games = response.json()  # Assuming the response is a list of games directly
-
-            return None  # No error
         except requests.RequestException as e:
             return f"Error fetching games: {str(e)}"
 
+        self.fingerprint = hashlib.sha1(response.content).hexdigest()
+        self.changed = not previous or previous['hash'] != self.fingerprint
+        _fingerprints.set(self.cache_key, {
+            'hash': self.fingerprint,
+            'fetched_at': time.monotonic(),
+            'games': self.games,
+        })
+        return None  # No error
+
+    def invalidate(self):
+        """Forget the stored fingerprint so the next fetch is treated as changed."""
+        _fingerprints.pop(self.cache_key)
+
+    def records(self):
+        """Fetched games as GameRecord objects, in the order tulospalvelu returned them."""
+        return [
+            GameRecord(self.team_id, game)
+            for level_data in self.games or []
+            for game in level_data.get('Games', []) or []
+        ]
+
     def display_games(self):
-        if not self.games:
-            return pd.DataFrame()  # Return an empty DataFrame if no games are found
-    
-        games_info = []
-        
-        for level_data in self.games:
-            matches = level_data.get('Games', [])
-            if not matches:
-                continue
-                
-            for game in matches:
-                game_info = {
-                    'Team ID': self.team_id,
-                    'Game ID': game.get('GameID', 'N/A'),
-                    'Date': game.get('GameDate', 'N/A'),
-                    'Time': game.get('GameTime', 'N/A'),
-                    'Home Team': game.get('HomeTeamAbbrv', 'N/A'),
-                    'Away Team': game.get('AwayTeamAbbrv', 'N/A'),
-                    'Home Goals': game.get('HomeGoals', 'N/A'),
-                    'Away Goals': game.get('AwayGoals', 'N/A'),
-                    'Location': game.get('RinkName', 'N/A'),
-                    'Level Name': game.get('LevelName', 'N/A'),
-                    'Stat Group Name': game.get('StatGroupName', 'N/A'),
-                    'Small Area Game': game.get('SmallAreaGame', 'N/A')
-                }
-                games_info.append(game_info)
-
-        games_df = pd.DataFrame(games_info)
-        games_df['Date'] = pd.to_datetime(games_df['Date'], format='%d.%m.%Y', errors='coerce', dayfirst=True)
-        
-        return games_df
+        """The games as a pandas DataFrame (optional export; pandas is imported only here)."""
+        import pandas as pd
+
+        return pd.DataFrame([record.as_dict() for record in self.records()])
+
+
+def fetch_one(fetcher):
+    try:
+        return fetcher.fetch_games()
+    except Exception as e:
+        return f"Error fetching games: {str(e)}"
+
+
+def fetch_all(fetchers, max_workers=8):
+    """Run fetch_games() for every fetcher concurrently.
+
+    Returns a list of errors (None on success) in the same order as `fetchers`,
+    so callers can merge results exactly like in the sequential loop.
+    """
+    if not fetchers:
+        return []
+
+    workers = max(1, min(max_workers, len(fetchers)))
+    logger.debug("Fetching games for %d teams with %d workers", len(fetchers), workers)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(fetch_one, fetchers))
@@ -0,0 +1,44 @@
+from helpers.data_fetcher import hae_kalenteri
+from helpers.jopox_scraper import JopoxScraper
+from logging_config import logger
+from security import cipher_suite
+
+
+class JopoxLoginError(Exception):
+    """Jopox admin access could not be opened with the stored credentials."""
+
+
+def load_descriptions(user):
+    """Kalenterikuvausten haku – epäonnistuessa jatketaan tyhjällä"""
+    if not user.jopox_calendar_url:
+        return []
+    try:
+        return hae_kalenteri(user.jopox_calendar_url) or []
+    except Exception:
+        logger.warning("Calendar fetch failed, continuing without descriptions", exc_info=True)
+        return []
+
+
+def attach_descriptions(jopox_games, descriptions):
+    """Yhdistää kalenterin Lisätiedot peleihin uid:n perusteella"""
+    # indeksointi turvallisesti .get:illä ettei KeyError kaada
+    desc_by_uid = { (d or {}).get('Uid'): d for d in descriptions if isinstance(d, dict) and (d or {}).get('Uid') }
+    for g in jopox_games:
+        uid = (g or {}).get('uid')
+        if uid and uid in desc_by_uid:
+            g['Lisätiedot'] = desc_by_uid[uid].get('Lisätiedot')
+    return jopox_games
+
+
+def make_scraper(user):
+    decrypted_password = cipher_suite.decrypt(user.jopox_password).decode('utf-8')
+    return JopoxScraper(user.id, user.jopox_username, decrypted_password)
+
+
+def fetch_jopox_games(user):
+    """Scrape the user's Jopox game list with calendar descriptions attached."""
+    descriptions = load_descriptions(user)
+    scraper = make_scraper(user)
+    if not scraper.access_admin():
+        raise JopoxLoginError("Jopox‑kirjautuminen epäonnistui")
+    return attach_descriptions(scraper.scrape_jopox_games(), descriptions)
@@ -0,0 +1,80 @@
+import html
+import re
+
+from functools import lru_cache
+from importlib.util import find_spec
+
+# Nopeampi jäsennin, jos asennettu; bs4 ja lxml ladataan vasta ensimmäisessä jäsennyksessä
+PARSER = 'lxml' if find_spec('lxml') is not None else 'html.parser'
+
+HIDDEN_FIELDS = ('__VIEWSTATE', '__EVENTVALIDATION', '__VIEWSTATEGENERATOR')
+GAME_ROW_PREFIX = 'MainContentPlaceHolder_GamesList1_GamesListView_GameRow_'
+
+_INPUT_TAG_RE = re.compile(r'<input\b[^>]*>', re.IGNORECASE)
+_ATTR_RE = re.compile(r'([\w:.-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))')
+
+
+def _is_games_list_tag(name, attrs):
+    # Pelirivit ja sivutuslinkit, muu sivu jätetään jäsentämättä
+    if name == 'tr':
+        return (attrs.get('id') or '').startswith(GAME_ROW_PREFIX)
+    if name == 'a':
+        classes = attrs.get('class') or ''
+        if isinstance(classes, str):
+            classes = classes.split()
+        return 'page' in classes
+    return False
+
+
+@lru_cache(maxsize=None)
+def games_list_strainer():
+    from bs4 import SoupStrainer
+
+    return SoupStrainer(_is_games_list_tag)
+
+
+def parse_html(text, parse_only=None):
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(text, PARSER, parse_only=parse_only)
+
+
+class JopoxPage:
+    """A Jopox HTML response parsed at most once and shared by every extractor."""
+
+    def __init__(self, response):
+        self.response = response
+        self.text = response.text
+        self.url = response.url
+        self.status_code = response.status_code
+        self._soup = None
+        self._hidden_fields = None
+
+    @classmethod
+    def of(cls, response):
+        return response if isinstance(response, cls) else cls(response)
+
+    @property
+    def soup(self):
+        if self._soup is None:
+            self._soup = parse_html(self.text)
+        return self._soup
+
+    def hidden_fields(self):
+        """Return the ASP.NET hidden form fields without building the DOM when possible."""
+        if self._hidden_fields is None:
+            fields = {}
+            for tag in _INPUT_TAG_RE.findall(self.text):
+                attrs = {m.group(1).lower(): next(v for v in m.groups()[1:] if v is not None) for m in _ATTR_RE.finditer(tag)}
+                name = attrs.get('name')
+                if name in HIDDEN_FIELDS and name not in fields and 'value' in attrs:
+                    fields[name] = html.unescape(attrs['value'])
+
+            # Varalla täysi jäsennys, jos kenttää ei löytynyt säännöllisellä lausekkeella
+            for name in HIDDEN_FIELDS:
+                if name not in fields:
+                    tag = self.soup.find("input", {"name": name})
+                    if tag is not None and tag.has_attr('value'):
+                        fields[name] = tag['value']
+            self._hidden_fields = fields
+        return self._hidden_fields
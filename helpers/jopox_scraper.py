@@ -1,18 +1,39 @@
 import os
+import random
 import requests
 import logging
 import re
-import json
+import time
 
-from bs4 import BeautifulSoup
+from helpers.jopox_page import JopoxPage, games_list_strainer, parse_html
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from flask_login import current_user
-from flask import session
+from functools import partial
+from flask import session, current_app, has_request_context
 from urllib.parse import urljoin
 
 
 from models.user import db, User
+from helpers.jopox_sessions import STATE_FIELDS, get_session_pool, token_expiry
+from helpers.game_details import game_details
+from helpers.league_catalog import league_catalog, normalize_league_name
+from helpers.scraper_state import SESSION_HANDLE, scraper_state
 from logging_config import logger
+
+TOKEN_REFRESH_URL = "https://myapi.jopox.fi/api/v1/myjopoxaccount/refreshtoken"
+
+LOGIN_HEADERS = {
+    "accept": "application/json",
+    "content-type": "application/json",
+    "origin": "https://login.jopox.fi",
+    "referer": "https://login.jopox.fi/",
+    "user-agent": "Mozilla/5.0"
+    }
+
+LEGACY_SESSION_KEYS = (
+    "user_id", "jopox_cookies", "jopox_validation", "jopox_last_login", "tokens", "refresh_token",
+    "jopox_lockerroom_response", "admin_page_url", "auth_header", "base_url", "jopox_metadata_id",
+)
     
 class JopoxScraper:
     def __init__(self, user_id, username, password):
@@ -22,85 +43,100 @@ class JopoxScraper:
         self.admin_page_url = None
         self.auth_header = None
         self.base_url = None
-        self.session = requests.Session()
+        self.pool = get_session_pool()
+        self.pooled = self.pool.acquire(user_id)
+        self.session = self.pooled.session
         self.username = username
         self.password = password
         self.cookies = None
         self.myJopoxAccountId = None
         self.token = None
         self.refresh_token = None
+        self.token_expires_at = None
+        self.lockerroom_metadata_id = None
         self.last_login_time = None
         self.event_validation_data = None
         self.lockerroom_response = None
-        self.load_session_from_flask()
-
-    def save_session_to_flask(self):
-        """Tallentaa käyttäjän tiedot sekä istunnon evästeet ja validointitiedot Flask-sessioniin"""
-        session["user_id"] = current_user.id
-        session["jopox_cookies"] = json.dumps(self.session.cookies.get_dict())
-        session["jopox_validation"] = json.dumps(self.event_validation_data)
-        session["jopox_last_login"] = self.last_login_time.isoformat() if self.last_login_time else None
-        session["tokens"] = json.dumps(self.token) if self.token else None
-        session["refresh_token"] = json.dumps(self.refresh_token) if self.refresh_token else None
-        session["jopox_lockerroom_response"] = json.dumps(self.lockerroom_response.json()) if self.lockerroom_response else None
-        session["admin_page_url"] = self.admin_page_url if self.admin_page_url else None
-        session["auth_header"] = json.dumps(self.auth_header) if self.auth_header else None
-        session["base_url"] = self.base_url if self.base_url else None
-
-    def load_session_from_flask(self):
-        """Lataa aiemmin tallennetun istunnon evästeet ja validointitiedot Flask-sessionista"""
-        if session.get("user_id") != self.user.id:
-            self.clear_session()
-        if "jopox_cookies" in session:
-            self.session.cookies.update(json.loads(session["jopox_cookies"]))
-        if "jopox_validation" in session:
-            self.event_validation_data = json.loads(session["jopox_validation"])
-        if "jopox_last_login" in session:
-            self.last_login_time = datetime.fromisoformat(session["jopox_last_login"])
-        if "tokens" in session:
-            self.token = json.loads(session["tokens"])
-        if "refresh_token" in session:
-            self.refresh_token = json.loads(session["refresh_token"])
-        if "jopox_lockerroom_response" in session:
-            self.lockerroom_response = json.loads(session["jopox_lockerroom_response"])
-        if "admin_page_url" in session:
-            self.admin_page_url = session["admin_page_url"]
-        if "auth_header" in session:
-            self.auth_header = json.loads(session["auth_header"])
-        if "base_url" in session:
-            self.base_url = session["base_url"]
+        self.state_digests = {}
+        self.created_leagues = []
+        self.form_page = None  # Viimeisin ladattu pelilomake; create_league päivittää sen
+        self.indexed_page = None  # Lomake, josta välimuistin sarjalista viimeksi jäsennettiin
+        if self.pooled.is_authenticated:
+            self.load_session_from_pool()
+        else:
+            self.load_state()
+
+    def load_session_from_pool(self):
+        """Käyttää tämän workerin poolissa olevaa kirjautumista, jolloin login-ketju ohitetaan"""
+        with self.pooled.lock:
+            self.session = self.pooled.session
+            for field in STATE_FIELDS:
+                setattr(self, field, getattr(self.pooled, field))
+        logger.debug("jopox_session_pool_hit user_id=%s", self.user.id)
+
+    def state_values(self):
+        """Kentät, jotka tallennetaan scraper-tilaan (auth_header johdetaan tokenista)"""
+        return {
+            "cookies": self.session.cookies.get_dict(),
+            "validation": self.event_validation_data,
+            "last_login": self.last_login_time.isoformat() if self.last_login_time else None,
+            "token": self.token,
+            "refresh_token": self.refresh_token,
+            "admin_page_url": self.admin_page_url,
+            "base_url": self.base_url,
+            "metadata_id": self.lockerroom_metadata_id,
+        }
+
+    def save_state(self):
+        """Tallentaa muuttuneet kentät scraper-tilaan; Flask-sessioon jää vain kahva"""
+        self.state_digests = scraper_state.save(self.user.id, self.state_values(), self.state_digests)
+        if has_request_context() and session.get(SESSION_HANDLE) != self.user.id:
+            session[SESSION_HANDLE] = self.user.id
+
+    def load_state(self):
+        """Lataa aiemmin tallennetut evästeet, tokenit ja validointitiedot scraper-tilasta"""
+        if has_request_context() and session.get(SESSION_HANDLE) != self.user.id:
+            return
+
+        values, self.state_digests = scraper_state.load(self.user.id)
+        if values.get("cookies"):
+            self.session.cookies.update(values["cookies"])
+        self.event_validation_data = values.get("validation")
+        if values.get("last_login"):
+            self.last_login_time = datetime.fromisoformat(values["last_login"])
+        if values.get("token"):
+            self.set_tokens(values["token"], values.get("refresh_token"))
+        self.admin_page_url = values.get("admin_page_url")
+        self.base_url = values.get("base_url")
+        self.lockerroom_metadata_id = values.get("metadata_id")
 
 
     def get_event_validation(self, response):
-        soup = BeautifulSoup(response.text, 'html.parser')
-        viewstate = soup.find("input", {"name": "__VIEWSTATE"})["value"]
-        eventvalidation = soup.find("input", {"name": "__EVENTVALIDATION"})["value"]
-        viewstategenerator = soup.find("input", {"name": "__VIEWSTATEGENERATOR"})["value"]
+        fields = JopoxPage.of(response).hidden_fields()
+        viewstate = fields["__VIEWSTATE"]
+        eventvalidation = fields["__EVENTVALIDATION"]
+        viewstategenerator = fields["__VIEWSTATEGENERATOR"]
         return {
         '__VIEWSTATE': viewstate,
         '__EVENTVALIDATION': eventvalidation,
         '__VIEWSTATEGENERATOR': viewstategenerator
         }
     
-    def clear_session(self):
-        session.pop("user_id", None)
-        session.pop("jopox_cookies", None)
-        session.pop("jopox_validation", None)
-        session.pop("jopox_last_login", None)
-        session.pop("tokens", None)
-        session.pop("refresh_token", None)
-        session.pop("jopox_lockerroom_response", None)
-        session.pop("admin_page_url", None)
-        session.pop("auth_header", None)
-        session.pop("base_url", None)
+    def clear_state(self):
+        if not has_request_context():
+            return
+        session.pop(SESSION_HANDLE, None)
+        # Vanhat, suoraan Flask-sessioon tallennetut kentät pois
+        for key in LEGACY_SESSION_KEYS:
+            session.pop(key, None)
         
 
     def login(self):
         
         logger.info("login() started...")
-        self.clear_session()
-        #clear all ccokies from the session
-        self.session.cookies.clear()
+        self.clear_state()
+        # Uusi istunto ilman evästeitä; poolin vanhaa istuntoa käyttävät pyynnöt eivät häiriinny
+        self.session = requests.Session()
 
         
         url = self.login_url
@@ -110,28 +146,13 @@ class JopoxScraper:
             "password": self.password
             }
 
-        headers = {
-            "accept": "application/json",
-            "content-type": "application/json",
-            "origin": "https://login.jopox.fi",
-            "referer": "https://login.jopox.fi/",
-            "user-agent": "Mozilla/5.0"
-            }
-        
-        response = requests.post(url, json=login_payload, headers=headers)
+        response = requests.post(url, json=login_payload, headers=LOGIN_HEADERS)
     
         if response.status_code == 200:
-            self.token = response.json().get("tokens", {}).get("accessToken")
-            self.refresh_token = response.json().get("tokens", {}).get("refreshToken")
+            tokens = response.json().get("tokens", {})
+            self.set_tokens(tokens.get("accessToken"), tokens.get("refreshToken"))
            
             logger.info("✅ Kirjautuminen onnistui.")
-            
-            self.auth_header = {
-                "Authorization": f"Bearer {self.token}",
-                "origin": "https://login.jopox.fi",
-                "referer": "https://login.jopox.fi/",
-                "user-agent": "Mozilla/5.0"
-            }
 
         person_url = "https://myapi.jopox.fi/api/v1/myjopoxaccount/GetMyJopoxPersonDetails"
         person_response = requests.get(person_url, headers=self.auth_header)
@@ -146,79 +167,182 @@ class JopoxScraper:
 
         if self.lockerroom_response.status_code == 200:
             #get metadataId from lockerroom_response
-            lockerroom_metadata_id = self.lockerroom_response.json().get("lockerRooms")[0].get("metadataId")
+            self.lockerroom_metadata_id = self.lockerroom_response.json().get("lockerRooms")[0].get("metadataId")
             
 
         else:
-            logger.error("Pukuhuonetietojen haku epäonnistui:", self.lockerroom_response.status_code)
+            logger.error("Pukuhuonetietojen haku epäonnistui: %s", self.lockerroom_response.status_code)
 
-        admin_onetimer = f"https://myapi.jopox.fi/api/v1/adminlogin/{lockerroom_metadata_id}/onetimer?source=selfservice"
+        return self.admin_login()
+
+    def admin_login(self):
+        """Avaa hallinnan istunnon voimassa olevalla access tokenilla (onetimer + admin-sivu)"""
+        admin_onetimer = f"https://myapi.jopox.fi/api/v1/adminlogin/{self.lockerroom_metadata_id}/onetimer?source=selfservice"
         admin_response = self.session.get(admin_onetimer, headers=self.auth_header)
-        soup = BeautifulSoup(admin_response.text, "html.parser")
 
-        if admin_response.status_code == 200:
-            logger.debug(f"Admin response ok")
-        else:
-            logger.error("Admin-tietojen haku epäonnistui:", admin_response.status_code)
+        if admin_response.status_code != 200:
+            # Vanhentunut tai peruttu token: kutsuja kirjautuu kokonaan uudelleen
+            logger.error("Admin-tietojen haku epäonnistui: %s", admin_response.status_code)
+            return False
+        logger.debug("Admin response ok")
 
-        self.admin_page_url = admin_response.json().get("url")
+        try:
+            admin_page_url = admin_response.json().get("url")
+        except (ValueError, AttributeError):
+            admin_page_url = None
+        if not admin_page_url:
+            logger.error("Admin-vastauksessa ei ole hallinnan osoitetta")
+            return False
+
+        self.admin_page_url = admin_page_url
         admin_page_response = self.session.get(self.admin_page_url, headers=self.auth_header)
         
-        soup = BeautifulSoup(admin_page_response.text, "html.parser")
+        admin_page = JopoxPage(admin_page_response)
         if "https://hallinta3.jopox.fi/Admin/Hockeypox2020/Login.aspx" == admin_page_response.url:
-            logger.debug("❌ Admin-sivun tietojen haku epäonnistui:", admin_page_response.status_code)
+            logger.debug("❌ Admin-sivun tietojen haku epäonnistui: %s", admin_page_response.status_code)
             return False
     
         elif "Default.aspx" in admin_page_response.url:
             logger.info("Default.aspx found login(): Login successful!")
             self.last_login_time = datetime.now()
-            self.base_url = self.get_jopox_base_url(soup)
-            self.event_validation_data = self.get_event_validation(admin_page_response)
-            self.save_session_to_flask()
+            self.base_url = self.get_jopox_base_url(admin_page.soup)
+            self.event_validation_data = self.get_event_validation(admin_page)
+            self.save_state()
+            self.pooled = self.pool.store(self.user.id, self)
             return True
         
         # fallback jos ei kumpikaan
         logger.warning(f"⚠️ Login päättyi odottamattomaan URL:iin: {admin_page_response.url}")
         return True
 
-        
-       
+    def set_tokens(self, token, refresh_token):
+        self.token = token
+        self.refresh_token = refresh_token
+        self.token_expires_at = token_expiry(token)
+        self.auth_header = {
+            "Authorization": f"Bearer {self.token}",
+            "origin": "https://login.jopox.fi",
+            "referer": "https://login.jopox.fi/",
+            "user-agent": "Mozilla/5.0"
+        }
 
-       
+    def refresh_access_token(self):
+        """Vaihtaa refresh tokenin uuteen access tokeniin yhdellä kutsulla"""
+        if not self.refresh_token:
+            return False
+
+        url = current_app.config.get('JOPOX_TOKEN_REFRESH_URL', TOKEN_REFRESH_URL)
+        try:
+            response = requests.post(
+                url,
+                json={"refreshToken": self.refresh_token},
+                headers=LOGIN_HEADERS,
+                timeout=current_app.config.get('JOPOX_PAGE_TIMEOUT', 15),
+            )
+        except requests.exceptions.RequestException as e:
+            return self.refresh_failed("error=%s", e)
+
+        if response.status_code != 200:
+            return self.refresh_failed("status=%s", response.status_code)
+
+        try:
+            tokens = response.json().get("tokens", {})
+        except (ValueError, AttributeError):
+            tokens = {}
+        if not tokens.get("accessToken"):
+            return self.refresh_failed("reason=missing_access_token")
+
+        self.set_tokens(tokens["accessToken"], tokens.get("refreshToken") or self.refresh_token)
+        self.save_state()
+        self.pooled = self.pool.store(self.user.id, self)
+        self.pooled.refresh_failed = False
+        logger.info("token_refresh_ok expires_in=%ss", int(self.pooled.expires_in(self.pool.ttl)))
+        return True
+
+    def refresh_failed(self, detail, *args):
+        # Sama käyttäjä lokitetaan varoituksena kerran, kunnes uusinta taas onnistuu
+        log = logger.debug if self.pooled.refresh_failed else logger.warning
+        self.pooled.refresh_failed = True
+        log("token_refresh_failed user_id=%s " + detail, self.user.id, *args)
+        return False
+
+    def reauthenticate(self):
+        """Uusii kirjautumisen refresh tokenilla; koko login-ketju vain jos se ei onnistu"""
+        if self.base_url and self.refresh_access_token():
+            return True
+        return self.login()
 
         
     def is_session_valid(self):
         logger.debug("is_session_valid_start")
-        
-        
-        if "jopox_last_login" not in session:
+
+        if self.pooled.is_authenticated:
+            expires_in = self.pooled.expires_in(self.pool.ttl)
+            ok = expires_in > 0
+            logger.debug("is_session_valid result=%s expires_in=%ss source=pool", ok, int(expires_in))
+            return ok
+
+        if self.last_login_time is None:
             logger.warning("is_session_valid result=false reason=missing_last_login")
             return False
         
-        if "base_url" not in session:
+        if self.base_url is None:
             logger.warning("is_session_valid result=false reason=missing_base_url")
             return False
 
+        if self.token_expires_at is not None:
+            expires_in = self.token_expires_at - time.time()
+            ok = expires_in > 0
+            logger.debug("is_session_valid result=%s expires_in=%ss", ok, int(expires_in))
+            return ok
 
-        last_login_time = datetime.fromisoformat(session["jopox_last_login"])
-        session_duration = datetime.now() - last_login_time
+        session_duration = datetime.now() - self.last_login_time
         ok = session_duration < timedelta(hours=1)
         logger.debug("is_session_valid result=%s age=%ss", ok, int(session_duration.total_seconds()))
         return ok
 
+    def is_login_redirect(self, response):
+        return "Login.aspx" in response.url
+
+    def login_once(self):
+        """Kirjautuu, ellei saman käyttäjän rinnakkainen pyyntö ehtinyt jo kirjautua"""
+        with self.pooled.lock:
+            if self.pooled.is_authenticated and self.pooled.expires_in(self.pool.ttl) > 0:
+                self.load_session_from_pool()
+                return True
+            return self.reauthenticate()
+
     def ensure_logged_in(self):
         if not self.is_session_valid():
             logger.info("login_required reason=invalid_session")
-            return self.login()
+            return self.login_once()
 
         logger.debug("ensure_logged_in_ok")
         return True
     
+    def renew_admin_session(self):
+        """Uusi hallinnan istunto, kun Jopox ohjasi kirjautumissivulle; koko login vain jos onetimer ei riitä"""
+        with self.pooled.lock:
+            self.session = requests.Session()
+            try:
+                renewed = bool(self.lockerroom_metadata_id) and self.admin_login()
+            except requests.exceptions.RequestException as e:
+                logger.warning("admin_relogin_failed error=%s", e)
+                renewed = False
+            if not renewed:
+                self.pool.invalidate(self.user.id)
+                try:
+                    return bool(self.login())
+                except requests.exceptions.RequestException as e:
+                    logger.warning("login_failed error=%s", e)
+                    return False
+            return True
+
     def access_admin(self):
         logger.info("admin_access_start")
         if not self.is_session_valid():
             logger.warning("admin_access_relogin reason=invalid_session")
-            if not self.login():
+            if not self.login_once():
                 logger.error("admin_access_failed reason=login_failed")
                 return False
 
@@ -226,7 +350,15 @@ class JopoxScraper:
 
         response = self.session.get(admin_page_url)
 
-        if "https://hallinta3.jopox.fi/Admin/Hockeypox2020/Login.aspx" == response.url:
+        if self.is_login_redirect(response):
+            # Hallinnan istunto on päättynyt: uusi onetimer riittää, jos token on vielä voimassa
+            logger.warning("admin_access_relogin reason=redirect_to_login")
+            if not self.renew_admin_session():
+                logger.error("admin_access_failed reason=login_failed")
+                return False
+            response = self.session.get(urljoin(self.base_url, "/FrontPage/Default.aspx"))
+
+        if self.is_login_redirect(response):
             logger.error("admin_access_failed reason=redirect_to_login")
             return False
 
@@ -348,14 +480,13 @@ class JopoxScraper:
                 logger.debug(f"Lockerroom URL response: {lockerroom_url_response.status_code}")
                 
                 response = self.session.get(lockerroom_url_response.url)
-                soup = BeautifulSoup(response.text, 'html.parser')
                 
                 base_url = lockerroom_url_response.url.split('/home')[0]
                 logger.debug(f"Base URL: {base_url}")
                 calendarpage_url = f"{base_url}/calendar/club/{subsiteId}?web=1"
                 logger.debug(f"Calendar page URL: {calendarpage_url}")
                 response = self.session.get(calendarpage_url)
-                soup = BeautifulSoup(response.text, 'html.parser')
+                soup = parse_html(response.text)
                 icalUrlContainer = soup.find('div', {'id': 'icalUrlContainer'})
                 calendar_url = icalUrlContainer.text.strip()
                 logger.info(f"calendar_url: {calendar_url}")
@@ -379,24 +510,13 @@ class JopoxScraper:
         #muodosta mod_game_url yhdistämällä self.base_url ja Games/Game.aspx?gId=uid
         mod_game_url = urljoin(self.base_url, f"Games/Game.aspx?gId={uid}")
 
-        
-        # Load the form page
-        response = self.session.get(mod_game_url, headers={
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
-            "Referer": mod_game_url,
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
-        })
-
-        if response.status_code != 200:
-            logger.error("Failed to load form page!")
-            return
-
-        logger.info('modify_game(): fetching event validation data...')
-
-        # Parse HTML and extract necessary values
-        event_validation_data = self.get_event_validation(response)            
-        season = self.get_season_id(response)
-        subsite = self.get_subsite_id(response)
+        # Muokkausdialogia avattaessa ladattu lomake käytetään, jos se on vielä tuore
+        entry = game_details.pop(self.user.id, uid)
+        form_state = entry.get("form_state") if entry else None
+        if form_state is None:
+            form_state = self.load_modify_form(uid)
+            if form_state is None:
+                return
 
         logger.debug(f'game_data: {game_data}')
 
@@ -406,16 +526,9 @@ class JopoxScraper:
         logger.debug(f'game_group_payload: {game_group_payload}')
 
 
-        # Build payload
+        # Build payload (lomakkeen tila lisätään form_state_payload():ssa)
         payload = {
-            "__EVENTTARGET": "",
-            "__EVENTARGUMENT": "",
-            "__LASTFOCUS": "",
-            "__VIEWSTATE": event_validation_data['__VIEWSTATE'],
-            "__VIEWSTATEGENERATOR": event_validation_data['__VIEWSTATEGENERATOR'],
-            "__EVENTVALIDATION": event_validation_data['__EVENTVALIDATION'],            "UsernameTextBox": self.username,
-            "ctl00$MenuContentPlaceHolder$MainMenu$SiteSelector1$DropDownListSeasons": season,
-            "ctl00$MenuContentPlaceHolder$MainMenu$SiteSelector1$DropDownListSubSites": subsite,
+            "UsernameTextBox": self.username,
             #"ctl00$MainContentPlaceHolder$GameTabs$TabsDropDownList": "javascript:void(0)", #TÄMÄ RIVI AIHEUTTI VIRHEEN
             "ctl00$MainContentPlaceHolder$GamesBasicForm$LeagueDropdownList": game_data.get("LeagueDropdownList", ""),
             "ctl00$MainContentPlaceHolder$GamesBasicForm$EventDropDownList": game_data.get("EventDropDownList", ""),
@@ -450,9 +563,23 @@ class JopoxScraper:
             "Referer": f"{mod_game_url}",
         }
 
-        response = self.session.post(mod_game_url, data=payload, headers=headers)
+        response = self.session.post(mod_game_url, data=self.form_state_payload(form_state, payload), headers=headers)
+
+        # Kirjautumissivulle ohjattua POSTia ei käsitelty: uusi istunto ja lomake, yksi uusi yritys.
+        # 5xx-vastausta ei lähetetä uudelleen, koska muutos on voinut jo tallentua.
+        if self.is_login_redirect(response):
+            logger.warning("modify_game: redirected to login, renewing admin session")
+            if not self.renew_admin_session():
+                return
+            form_state = self.load_modify_form(uid)
+            if form_state is None:
+                return
+            response = self.session.post(mod_game_url, data=self.form_state_payload(form_state, payload), headers=headers)
+        if response.status_code >= 500:
+            logger.error("modify_game: HTTP %s from Jopox", response.status_code)
+            return f"HTTP {response.status_code}"
 
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = JopoxPage(response).soup
 
         error_message = soup.find('textarea', {'id': 'ErrorTextBox'})
 
@@ -463,6 +590,40 @@ class JopoxScraper:
             logger.info("Game added successfully or no error message received.")
             return "Game added successfully!"
         
+    def load_modify_form(self, uid):
+        """GET Games/Game.aspx?gId=uid and return its form state for modify_game."""
+        mod_game_url = urljoin(self.base_url, f"Games/Game.aspx?gId={uid}")
+
+        # Load the form page
+        response = self.session.get(mod_game_url, headers={
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
+            "Referer": mod_game_url,
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
+        })
+
+        if response.status_code != 200:
+            logger.error("Failed to load form page!")
+            return None
+
+        logger.info('modify_game(): fetching event validation data...')
+
+        # Parse HTML once and extract necessary values
+        return self.game_form_state(JopoxPage(response))
+
+    def form_state_payload(self, form_state, payload):
+        event_validation_data = form_state["validation"]
+        return {
+            "__EVENTTARGET": "",
+            "__EVENTARGUMENT": "",
+            "__LASTFOCUS": "",
+            "__VIEWSTATE": event_validation_data['__VIEWSTATE'],
+            "__VIEWSTATEGENERATOR": event_validation_data['__VIEWSTATEGENERATOR'],
+            "__EVENTVALIDATION": event_validation_data['__EVENTVALIDATION'],
+            **payload,
+            "ctl00$MenuContentPlaceHolder$MainMenu$SiteSelector1$DropDownListSeasons": form_state["season"],
+            "ctl00$MenuContentPlaceHolder$MainMenu$SiteSelector1$DropDownListSubSites": form_state["subsite"],
+        }
+
     def ggroup_payload(self, game_groups):
         logger.debug("ggroup_payload() started...")
         payload = {}
@@ -475,7 +636,7 @@ class JopoxScraper:
 
     def get_season_id(self, response):
         try:
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = JopoxPage.of(response).soup
             season_dropdown = soup.find('select', {'id': 'MenuContentPlaceHolder_MainMenu_SiteSelector1_DropDownListSeasons'})
             season_id = season_dropdown.find('option', selected=True)['value']
             logger.debug(f"Season ID: {season_id}")
@@ -485,7 +646,7 @@ class JopoxScraper:
     
     def get_subsite_id(self, response):
         try:
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = JopoxPage.of(response).soup
             subsite_dropdown = soup.find('select', {'id': 'MenuContentPlaceHolder_MainMenu_SiteSelector1_DropDownListSubSites'})
             subsite_id = subsite_dropdown.find('option', selected=True)['value']
             logger.debug(f"Subsite ID: {subsite_id}")
@@ -498,7 +659,7 @@ class JopoxScraper:
         logger.debug("Getting league ID's")
         #logger.debug(f"response: {response.text}")
         try:
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = JopoxPage.of(response).soup
             league_dropdown = soup.find('select', {'id': 'LeagueDropdownList'})
             league_selected = {}
             league_options = []
@@ -526,54 +687,71 @@ class JopoxScraper:
         except Exception as e:
             logger.error(f"Error getting league ID's: {e}")
 
-    def define_league(self, items):
-        logger.debug("define_league() started...") 
-        if self.login():
-            add_game_url = urljoin(self.base_url, "Games/Game.aspx")
+    def league_index(self, form_page=None, refresh=False):
+        """LeagueIndex of the user's Jopox site, cached per user.
 
-            headers={
-                "Authorization": f"Bearer {self.token}",
-                "origin": "https://login.jopox.fi",
-                "referer": "https://login.jopox.fi/",
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
-            }
+        With refresh=True the cache is skipped and `form_page` (or a freshly
+        loaded game form) is parsed and stored.
+        """
+        if not refresh:
+            index = league_catalog.get(self.user.id)
+            if index is not None:
+                return index
+
+        page = form_page or self.load_game_form()
+        if page is None:
+            return None
+        self.form_page = self.indexed_page = page
+        leagues = self.get_league_id(page) or {}
+        return league_catalog.store(self.user.id, leagues.get("league_options", []))
+
+    def resolve_league(self, level, form_page=None):
+        """League id for a tulospalvelu level; creates the league in Jopox if none matches.
+
+        The cached index is only a hint: on a miss the current form is parsed
+        before a new league is created, so a league added since the cache was
+        filled is not created twice.
+        """
+        form_page = form_page or self.form_page
+        index = league_catalog.get(self.user.id)
+        league_id = index.match(level) if index is not None else None
+        if league_id:
+            logger.debug(f"returning Best league ID: {league_id}")
+            return league_id
+
+        # Välimuistin ohi: sarja voi löytyä nykyisestä lomakkeesta, jota ei ole vielä jäsennetty
+        if index is None or form_page is None or form_page is not self.indexed_page:
+            index = self.league_index(form_page, refresh=True)
+            if index is None:
+                return None
+            league_id = index.match(level)
+            if league_id:
+                logger.debug(f"league ID found from current form: {league_id}")
+                return league_id
 
-            # Load the form page
-            response = self.session.get(add_game_url, headers={
-                "User-Agent": "Mozilla/5.0",
-                "Referer": self.admin_page_url,
-            })
-            #logger.debug("Fetching game form page response text: %s", response.text)
+        #if no good enough match is found, start function to create new league
+        logger.debug("No good enough match found, starting to create new league")
+        return self.create_league(level)
 
-            if response.status_code != 200:
-                logger.error("Failed to load form page!")
-                return
+    def define_league(self, items, form_page=None):
+        logger.debug("define_league() started...") 
+        # Sama kirjautuminen ja lomake kuin pelien lisäyksessä; uusi lataus vain, jos sitä ei annettu
+        if form_page is None and not self.ensure_logged_in():
+            return
+
+        if form_page is not None:
+            self.form_page = form_page
 
-            leagues = self.get_league_id(response)
-
-            for item in items:
-                game = item.get("game")
-                level = game.get("Level Name")
-
-            #compare level to league_options and return the league_id with best match. Match is based on the league_options text that has most in common with level.
-                best_match = 0
-                best_league_id = ''
-                for league in leagues.get("league_options", []):
-                    match = len(os.path.commonprefix([league.get('text'), level]))
-                    if match > best_match:
-                        best_match = match
-                        best_league_id = league.get('value')
-                               
-
-            #if no good enough match is found, start function to create new league
-                if best_match < 5:
-                    logger.debug("No good enough match found, starting to create new league")
-                    created_league = self.create_league(level)
-                    game["LeagueDropdownList"] = created_league
-                else:
-                    logger.debug(f"returning Best league ID: {best_league_id}")
-                    game["LeagueDropdownList"] = best_league_id
-            return items
+        # Sama taso ratkaistaan vain kerran per erä, jolloin sarjaa ei luoda kahdesti
+        resolved = {}
+        for item in items:
+            game = item.get("game")
+            level = game.get("Level Name")
+            key = normalize_league_name(level)
+            if key not in resolved:
+                resolved[key] = self.resolve_league(level)
+            game["LeagueDropdownList"] = resolved[key]
+        return items
 
 
     def create_league(self, level):
@@ -597,8 +775,12 @@ class JopoxScraper:
             response_data = response.json()
             if response_data.get("d") == True:
                 logger.info("League created successfully!")
-
-                return self.define_league(level)
+                # Uusi sarja näkyy vasta uudelleen ladatussa lomakkeessa; se jää self.form_pageen
+                league_catalog.invalidate(self.user.id)
+                self.created_leagues.append(level)
+                self.form_page = None
+                index = self.league_index(refresh=True)
+                return index.match(level) if index is not None else None
             else:
                 logger.error("Failed to create league, server responded: %s", response_data)
                 return None
@@ -606,63 +788,51 @@ class JopoxScraper:
             logger.exception("Error decoding create_league response JSON: %s", e)
             return None
         
-    def add_game(self, games_to_add):
-        logger.debug("add_game() started...")
-        #muodosta add_game_url yhdistämällä self.base_url ja Games/Game.aspx
+    def load_game_form(self, timeout=None):
+        """GET the empty Games/Game.aspx form; the page carries leagues, season and validation state."""
         add_game_url = urljoin(self.base_url, "Games/Game.aspx")
+        response = self.session.get(add_game_url, headers={
+            "User-Agent": "Mozilla/5.0",
+            "Referer": self.admin_page_url,
+        }, timeout=timeout)
 
-        results = []
-
-        for item in games_to_add:
-            
-            if isinstance(item, dict) and "game" in item:
-                game = item["game"]
-                game_data = item.get("game_data", {})
-            else:
-                game = item
-                game_data = item.get("game_data", {})
-                
-            try:
-                response = self.session.get(add_game_url)
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Error fetching add_game_url: {e}")
-                return
+        if response.status_code != 200 or self.is_login_redirect(response):
+            logger.error("Failed to load form page! status=%s", response.status_code)
+            return None
+        return JopoxPage(response)
 
-            if response.status_code != 200:
-                logger.error("Failed to load form page!")
-                return
+    def game_form_state(self, page):
+        """Hidden fields and selectors of the empty form, shared by every game of a batch."""
+        return {
+            "validation": self.get_event_validation(page),
+            "season": self.get_season_id(page),
+            "subsite": self.get_subsite_id(page),
+        }
 
-        # Parse HTML and extract necessary values
-            event_validation_data = self.get_event_validation(response)
-            season = self.get_season_id(response)
-            subsite = self.get_subsite_id(response)
-
-            team_name = game.get('Team Name')            
-            HomeTeamTextBox = self.homeTeamTextBox(response, team_name)
-
-            # Build payload
-            payload = {
-                "__EVENTTARGET": "",
-                "__EVENTARGUMENT": "",
-                "__LASTFOCUS": "",
-                "__VIEWSTATE": event_validation_data['__VIEWSTATE'],
-                "__VIEWSTATEGENERATOR": event_validation_data['__VIEWSTATEGENERATOR'],
-                "__EVENTVALIDATION": event_validation_data['__EVENTVALIDATION'],            
-                "UsernameTextBox": self.username,
-                "ctl00$MenuContentPlaceHolder$MainMenu$SiteSelector1$DropDownListSeasons": season,
-                "ctl00$MenuContentPlaceHolder$MainMenu$SiteSelector1$DropDownListSubSites": subsite,
-                #"ctl00$MainContentPlaceHolder$GameTabs$TabsDropDownList": "javascript:void(0)", #TÄMÄ RIVI AIHEUTTI VIRHEEN
-                "ctl00$MainContentPlaceHolder$GamesBasicForm$LeagueDropdownList": game_data.get("LeagueDropdownList", ""),
-                "ctl00$MainContentPlaceHolder$GamesBasicForm$EventDropDownList": game_data.get("EventDropDownList", ""),
-                "ctl00$MainContentPlaceHolder$GamesBasicForm$HomeTeamTextBox": HomeTeamTextBox,
-                "ctl00$MainContentPlaceHolder$GamesBasicForm$GuestTeamTextBox": game_data.get("GuestTeamTextBox", ""),
-                "ctl00$MainContentPlaceHolder$GamesBasicForm$AwayCheckbox": game_data.get("AwayCheckbox", ""),
-                "ctl00$MainContentPlaceHolder$GamesBasicForm$GameLocationTextBox": game_data.get("GameLocationTextBox", ""),
-                "ctl00$MainContentPlaceHolder$GamesBasicForm$GameDateTextBox": game_data.get("GameDateTextBox", ""),
-                "ctl00$MainContentPlaceHolder$GamesBasicForm$GameStartTimeTextBox": game_data.get("GameStartTimeTextBox", ""),
-                "ctl00$MainContentPlaceHolder$GamesBasicForm$GameDurationTextBox": game_data.get("GameDurationTextBox", "120"),
-                "ctl00$MainContentPlaceHolder$GamesBasicForm$GameMaxParticipatesTextBox": game_data.get("GameMaxParticipatesTextBox", "0"),
-                "ctl00$MainContentPlaceHolder$GamesBasicForm$GamePublicInfoTextBox": f"""
+    def game_payload(self, game, game_data, form_state, home_team):
+        event_validation_data = form_state["validation"]
+        return {
+            "__EVENTTARGET": "",
+            "__EVENTARGUMENT": "",
+            "__LASTFOCUS": "",
+            "__VIEWSTATE": event_validation_data['__VIEWSTATE'],
+            "__VIEWSTATEGENERATOR": event_validation_data['__VIEWSTATEGENERATOR'],
+            "__EVENTVALIDATION": event_validation_data['__EVENTVALIDATION'],
+            "UsernameTextBox": self.username,
+            "ctl00$MenuContentPlaceHolder$MainMenu$SiteSelector1$DropDownListSeasons": form_state["season"],
+            "ctl00$MenuContentPlaceHolder$MainMenu$SiteSelector1$DropDownListSubSites": form_state["subsite"],
+            #"ctl00$MainContentPlaceHolder$GameTabs$TabsDropDownList": "javascript:void(0)", #TÄMÄ RIVI AIHEUTTI VIRHEEN
+            "ctl00$MainContentPlaceHolder$GamesBasicForm$LeagueDropdownList": game_data.get("LeagueDropdownList", ""),
+            "ctl00$MainContentPlaceHolder$GamesBasicForm$EventDropDownList": game_data.get("EventDropDownList", ""),
+            "ctl00$MainContentPlaceHolder$GamesBasicForm$HomeTeamTextBox": home_team,
+            "ctl00$MainContentPlaceHolder$GamesBasicForm$GuestTeamTextBox": game_data.get("GuestTeamTextBox", ""),
+            "ctl00$MainContentPlaceHolder$GamesBasicForm$AwayCheckbox": game_data.get("AwayCheckbox", ""),
+            "ctl00$MainContentPlaceHolder$GamesBasicForm$GameLocationTextBox": game_data.get("GameLocationTextBox", ""),
+            "ctl00$MainContentPlaceHolder$GamesBasicForm$GameDateTextBox": game_data.get("GameDateTextBox", ""),
+            "ctl00$MainContentPlaceHolder$GamesBasicForm$GameStartTimeTextBox": game_data.get("GameStartTimeTextBox", ""),
+            "ctl00$MainContentPlaceHolder$GamesBasicForm$GameDurationTextBox": game_data.get("GameDurationTextBox", "120"),
+            "ctl00$MainContentPlaceHolder$GamesBasicForm$GameMaxParticipatesTextBox": game_data.get("GameMaxParticipatesTextBox", "0"),
+            "ctl00$MainContentPlaceHolder$GamesBasicForm$GamePublicInfoTextBox": f"""
                 {game.get('Home Team')} - {game.get('Away Team')}<br>
                 {'Pienpeli' if game.get('Small Area Game') == '1' else 'Ison kentän peli'}<br>
                 <br>
@@ -674,8 +844,8 @@ class JopoxScraper:
                 Joukkue:
                 <br>
                 """,#Tähän kenttään logiikka, jolla määritetään tarvitaanko toimitsijoita ja niin, että huomioi pienpelit,
-                "ctl00$MainContentPlaceHolder$GamesBasicForm$FeedGameDropdown": "0",
-                "ctl00$MainContentPlaceHolder$GamesBasicForm$GameInfoTextBox": f"""
+            "ctl00$MainContentPlaceHolder$GamesBasicForm$FeedGameDropdown": "0",
+            "ctl00$MainContentPlaceHolder$GamesBasicForm$GameInfoTextBox": f"""
                 Ottelu {game.get('GameDateTextBox')} klo {game.get('GameStartTimeTextBox')}<br>
                 {game.get('HomeTeamTextBox')} - {game.get('GuestTeamTextBox')}<br>
                 {game.get('GameLocationTextBox')}<br>
@@ -687,38 +857,127 @@ class JopoxScraper:
                 Joukkue:
                 <br>
                 """,#Tähän kenttään logiikka, jolla määritetään tarvitaanko toimitsijoita ja niin, että huomioi pienpelit
-                "ctl00$MainContentPlaceHolder$GamesBasicForm$GameNotificationTextBox": "",
-                "ctl00$MainContentPlaceHolder$GamesBasicForm$SaveGameButton": "Tallenna"
-            }
+            "ctl00$MainContentPlaceHolder$GamesBasicForm$GameNotificationTextBox": "",
+            "ctl00$MainContentPlaceHolder$GamesBasicForm$SaveGameButton": "Tallenna"
+        }
 
-            logger.info("Submitting game data payload")
+    def post_game(self, game, payload, session=None, timeout=None):
+        """POST one game; returns (result item, logged_out) where logged_out means Jopox redirected to login.
 
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
-                "Content-Type": "application/x-www-form-urlencoded",
-                "Referer": f"{add_game_url}",
-            }
+        Only a login redirect is safe to resubmit: the game was not saved. A
+        5xx may come after the game was already stored, so it is reported as
+        an error like any other failure.
+        """
+        session = session or self.session
+        add_game_url = urljoin(self.base_url, "Games/Game.aspx")
+        headers = {
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
+            "Content-Type": "application/x-www-form-urlencoded",
+            "Referer": f"{add_game_url}",
+        }
 
-            response = self.session.post(add_game_url, data=payload, headers=headers)
+        try:
+            response = session.post(add_game_url, data=payload, headers=headers, timeout=timeout)
+        except requests.exceptions.RequestException as e:
+            logger.error("Error posting game %s: %s", game.get('Game ID'), e)
+            return { 'status': 'error', 'game_id': game.get('Game ID'), 'error': str(e) }, False
+
+        if self.is_login_redirect(response):
+            return { 'status': 'error', 'game_id': game.get('Game ID'), 'error': 'login_required' }, True
+        if response.status_code >= 500:
+            logger.error("Error posting game %s: HTTP %s", game.get('Game ID'), response.status_code)
+            return { 'status': 'error', 'game_id': game.get('Game ID'), 'error': f"HTTP {response.status_code}" }, False
+
+        soup = JopoxPage(response).soup
+        error_message = soup.find('textarea', {'id': 'ErrorTextBox'})
 
+        if error_message:
+            logger.error("Error message from server: %s", error_message.text)
+            return { 'status': 'error', 'game_id': game.get('Game ID'), 'error': error_message.text }, False
 
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            error_message = soup.find('textarea', {'id': 'ErrorTextBox'})
-            
-                        
-            if error_message:
-                logger.error("Error message from server: %s", error_message.text)
-                results.append({ 'status': 'error', 'game_id': game.get('Game ID'), 'error': error_message.text })
+        logger.info("Game added successfully or no error message received.")
+        return { 'status': 'ok', 'game_id': game.get('Game ID'), 'message': "Game added successfully!" }, False
+
+    def add_game(self, games_to_add, form_page=None):
+        """Create the games in Jopox, several POSTs in flight at a time.
+
+        The empty form is fetched once and its season and subsite selectors
+        shared by every game. Games whose POST was redirected to login are
+        submitted again once, one at a time, after the admin session has been
+        renewed; other failures are not resubmitted so a game is never created
+        twice. Results keep the order of `games_to_add`.
+        """
+        logger.debug("add_game() started...")
+        config = current_app.config
+        workers = config.get('JOPOX_CREATE_WORKERS', 4)
+        timeout = config.get('JOPOX_PAGE_TIMEOUT', 15)
+
+        items = []
+        for item in games_to_add:
+            if isinstance(item, dict) and "game" in item:
+                items.append((item["game"], item.get("game_data", {})))
             else:
-                logger.info("Game added successfully or no error message received.")
-                results.append({ 'status': 'ok', 'game_id': game.get('Game ID'), 'message': "Game added successfully!" })
+                items.append((item, item.get("game_data", {})))
+        if not items:
+            return []
 
+        try:
+            page = form_page or self.load_game_form(timeout=timeout)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Error fetching add_game_url: {e}")
+            page = None
+        if page is None:
+            return [{ 'status': 'error', 'game_id': game.get('Game ID'), 'error': 'form_load_failed' } for game, _ in items]
+
+        # Parse HTML once and extract necessary values
+        form_state = self.game_form_state(page)
+        payloads = [
+            self.game_payload(game, game_data, form_state, self.homeTeamTextBox(page, game.get('Team Name')))
+            for game, game_data in items
+        ]
+
+        results = [None] * len(items)
+        logged_out = []
+        started = time.monotonic()
+
+        def post(index):
+            # Oma Session per säie, samat kirjautumisevästeet
+            with requests.Session() as post_session:
+                post_session.cookies = self.session.cookies.copy()
+                return self.post_game(items[index][0], payloads[index], session=post_session, timeout=timeout)
+
+        logger.info("Submitting %d games with %d workers", len(items), max(1, min(workers, len(items))))
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(items)))) as executor:
+            futures = {executor.submit(post, index): index for index in range(len(items))}
+            for done, future in enumerate(as_completed(futures), start=1):
+                index = futures[future]
+                results[index], redirected = future.result()
+                if redirected:
+                    logged_out.append(index)
+                logger.info(
+                    "jopox_create_progress %d/%d game_id=%s status=%s",
+                    done, len(items), items[index][0].get('Game ID'), results[index]['status'],
+                )
+
+        # Kirjautumissivulle ohjatut lähetetään uudelleen yksi kerrallaan uudella istunnolla ja lomakkeella
+        if logged_out and not self.renew_admin_session():
+            logger.error("jopox_create_retry skipped reason=login_failed games=%d", len(logged_out))
+            logged_out = []
+        for index in sorted(logged_out):
+            game, game_data = items[index]
+            page = self.load_game_form(timeout=timeout)
+            if page is None:
+                continue
+            payload = self.game_payload(game, game_data, self.game_form_state(page), self.homeTeamTextBox(page, game.get('Team Name')))
+            results[index], _ = self.post_game(game, payload, timeout=timeout)
+            logger.info("jopox_create_retry game_id=%s status=%s", game.get('Game ID'), results[index]['status'])
+
+        logger.info("jopox_create_done games=%d took=%.1fs", len(items), time.monotonic() - started)
         return results
-        
+
     def homeTeamTextBox(self, response, team_name):
         try:
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = JopoxPage.of(response).soup
             SiteNameLabel_tag = soup.find('span', {'id': 'MainContentPlaceHolder_GamesBasicForm_SitenameLabel'})
             SiteNameLabel = SiteNameLabel_tag.text.strip() if SiteNameLabel_tag else ''
             logger.info("SiteNameLabel: %s", SiteNameLabel)
@@ -742,15 +1001,50 @@ class JopoxScraper:
     def scrape_jopox_games(self):
         logger.debug("scrape_jopox_games() started...")
 
+        config = current_app.config
+        retries = config.get('JOPOX_PAGE_RETRIES', 2)
+        timeout = config.get('JOPOX_PAGE_TIMEOUT', 15)
+
         all_j_games_url = urljoin(self.base_url, "Games/Games.aspx")
         # Haetaan ensimmäinen sivu
-        soup = self.fetch_page(all_j_games_url)
+        soup = self.fetch_page(all_j_games_url, retries=retries, timeout=timeout)
 
         last_page = self.get_last_page_number(soup)
 
-        jopox_games = []  # Kerätään peli-info listaan
+        jopox_games = self.parse_games_page(soup)  # Kerätään peli-info listaan
+
+        # Haetaan loput sivut rinnakkain, tulokset sivujärjestyksessä
+        page_urls = [
+            f"https://hallinta3.jopox.fi//Admin/HockeyPox2020/Games/Games.aspx?Page={page}"
+            for page in range(2, last_page + 1)
+        ]
+        if page_urls:
+            workers = max(1, min(config.get('JOPOX_SCRAPE_WORKERS', 4), len(page_urls)))
+            logger.debug(f"Fetching {len(page_urls)} more pages with {workers} workers")
+            scrape_page = partial(self.scrape_page, retries=retries, timeout=timeout)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for page_games in executor.map(scrape_page, page_urls):
+                    jopox_games.extend(page_games)
+
+        logger.debug(f"Found {len(jopox_games)} games with Jopox scraper")
+
+
+        return jopox_games  # Palautetaan kerätyt pelitiedot
 
-        # Haetaan pelit ensimmäiseltä sivulta
+    def scrape_page(self, url, retries=2, timeout=15):
+        """Fetch and parse one games list page in a worker thread; a failed page yields no games."""
+        # Oma Session per säie, samat kirjautumisevästeet
+        with requests.Session() as page_session:
+            page_session.cookies = self.session.cookies.copy()
+            try:
+                soup = self.fetch_page(url, session=page_session, retries=retries, timeout=timeout)
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Giving up on Jopox page {url}: {e}")
+                return []
+        return self.parse_games_page(soup)
+
+    def parse_games_page(self, soup):
+        games = []
         rows = soup.find_all('tr', id=lambda x: x and x.startswith('MainContentPlaceHolder_GamesList1_GamesListView_GameRow_'))
         for row in rows:
             game_data = {}
@@ -773,51 +1067,33 @@ class JopoxScraper:
             game_data['joukkueet'] = joukkueet_td.find('a').text.strip()
             game_data['uid'] = joukkueet_td.find('a')['href'].split('=')[1]
 
+            games.append(game_data)
+        return games
 
-            jopox_games.append(game_data)
-
-        # Käydään läpi kaikki jäljellä olevat sivut
-        for page in range(2, last_page + 1):
-            page_url = f"https://hallinta3.jopox.fi//Admin/HockeyPox2020/Games/Games.aspx?Page={page}"
-            soup = self.fetch_page(page_url)
-
-            rows = soup.find_all('tr', id=lambda x: x and x.startswith('MainContentPlaceHolder_GamesList1_GamesListView_GameRow_'))
-            for row in rows:
-                game_data = {}
-                # Pvm (päivämäärä ja aika)
-                pvm_td = row.find_all('td')[1]
-                pvm_full = pvm_td.text.strip()
-                game_data['pvm'] = pvm_full.split(' ')[0]  # Päivämäärä
-                game_data['aika'] = pvm_full.split(' ')[1]  # Kellonaika
-
-                # Yhdistetään päivämäärä ja kellonaika sortable_date-kenttään (muoto YYYY-MM-DD HH:MM)
-                sortable_date_str = f"{game_data['pvm']} {game_data['aika']}"
-                game_data['sortable_date'] = datetime.strptime(sortable_date_str, '%d.%m.%Y %H:%M').strftime('%Y-%m-%d %H:%M')
-
-                # Paikka
-                paikka_td = row.find_all('td')[2]
-                game_data['paikka'] = paikka_td.text.strip()
-
-                # Joukkueet
-                joukkueet_td = row.find_all('td')[3]
-                game_data['joukkueet'] = joukkueet_td.find('a').text.strip()
-                game_data['uid'] = joukkueet_td.find('a')['href'].split('=')[1]
-                
-                jopox_games.append(game_data)
-            
-        logger.debug(f"Found {len(jopox_games)} games with Jopox scraper")
+    def fetch_page(self, url, session=None, retries=0, timeout=None):
+        """GET a page with retries and exponential backoff, returning the parsed soup."""
+        session = session or self.session
 
+        for attempt in range(retries + 1):
+            try:
+                # Lähetetään GET-pyyntö
+                response = session.get(url, timeout=timeout, headers={
+                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
+                    "Referer": url,
+                    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
+                })
+                if response.status_code < 500:
+                    return parse_html(response.text, parse_only=games_list_strainer())
+                error = requests.exceptions.HTTPError(f"{response.status_code} from {url}", response=response)
+            except requests.exceptions.RequestException as e:
+                error = e
 
-        return jopox_games  # Palautetaan kerätyt pelitiedot
+            if attempt < retries:
+                delay = 0.5 * (2 ** attempt) + random.uniform(0, 0.25)
+                logger.warning(f"Jopox page fetch failed ({error}), retrying in {delay:.2f}s")
+                time.sleep(delay)
 
-    def fetch_page(self, url):
-        # Lähetetään GET-pyyntö
-        response = self.session.get(url, headers={
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
-            "Referer": url,
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
-        })
-        return BeautifulSoup(response.text, 'html.parser')
+        raise error
 
     def get_last_page_number(self, soup):
         # Etsitään viimeinen sivu
@@ -830,22 +1106,58 @@ class JopoxScraper:
     def j_game_details(self, j_game_id):
         logger.debug(f"j_game_details() started...")
         logger.debug(f"j_game_id: {j_game_id}")
+        # Esihaettu tai juuri esihaussa oleva sivu kelpaa, muuten haetaan nyt
+        timeout = current_app.config.get('JOPOX_PAGE_TIMEOUT', 15)
+        entry = game_details.get(self.user.id, j_game_id, wait=timeout)
+        if entry is None:
+            entry = self.load_game_details(j_game_id)
+            if entry is None:
+                return None
+            game_details.store(self.user.id, j_game_id, entry)
+        else:
+            logger.debug("j_game_details cache hit uid=%s", j_game_id)
+        return entry["details"]
+
+    def load_game_details(self, j_game_id, session=None, timeout=None):
+        """GET Games/Game.aspx?gId=... and parse both the dialog details and the form state."""
+        session = session or self.session
+        #muodosta j_game_url yhdistämällä self.base_url ja Games/Game.aspx?gId=j_game_id
+        j_game_url = urljoin(self.base_url, f"Games/Game.aspx?gId={j_game_id}")
+
+        response = session.get(j_game_url, timeout=timeout)
+
+        if "ErrorPage.aspx" in response.url or self.is_login_redirect(response):
+            logger.error("Error while fetching game details!")
+            return None
+
+        page = JopoxPage(response)
+        details = self.parse_game_details(page)
         try:
-            #muodosta j_game_url yhdistämällä self.base_url ja Games/Game.aspx?gId=j_game_id
-            j_game_url = urljoin(self.base_url, f"Games/Game.aspx?gId={j_game_id}")
-        
-            response = self.session.get(j_game_url)
-        
+            form_state = self.game_form_state(page)
+        except KeyError:
+            form_state = None
+        return {"details": details, "form_state": form_state}
 
-            if "ErrorPage.aspx" in response.url:
-                logger.error("Error while fetching game details!")
-                return None 
-        
-            leagues = self.get_league_id(response)
+    def prefetch_game_details(self, uids):
+        """Load the Game.aspx pages of `uids` in the background so the edit dialog opens from cache."""
+        cookies = self.session.cookies.copy()
+        timeout = current_app.config.get('JOPOX_PAGE_TIMEOUT', 15)
+
+        def load(uid):
+            # Oma Session per säie, samat kirjautumisevästeet
+            with requests.Session() as detail_session:
+                detail_session.cookies = cookies.copy()
+                return self.load_game_details(uid, session=detail_session, timeout=timeout)
+
+        return game_details.prefetch(self.user.id, uids, load)
+
+    def parse_game_details(self, page):
+        try:
+            leagues = self.get_league_id(page)
             league_selected = leagues.get("league_selected")
             league_options = leagues.get("league_options")
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = page.soup
 
             event_dropdown = soup.find('select', {'id': 'EventDropDownList'})
             event_selected = {}
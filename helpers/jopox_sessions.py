@@ -0,0 +1,225 @@
+import base64
+import json
+import threading
+import time
+
+from collections import OrderedDict
+
+import requests
+from flask import current_app
+
+from logging_config import logger
+
+# Kirjautumisen yhteydessä talteen otettavat kentät
+STATE_FIELDS = (
+    'token',
+    'refresh_token',
+    'auth_header',
+    'admin_page_url',
+    'base_url',
+    'event_validation_data',
+    'last_login_time',
+    'token_expires_at',
+    'lockerroom_metadata_id',
+    'state_digests',
+)
+
+
+def token_expiry(token):
+    """Return the `exp` claim of a JWT as epoch seconds, or None if it cannot be read."""
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        exp = json.loads(base64.urlsafe_b64decode(payload)).get('exp')
+        return float(exp) if exp is not None else None
+    except (AttributeError, IndexError, TypeError, ValueError):
+        return None
+
+
+class PooledJopoxSession:
+    """Authenticated Jopox state of one user, shared by the requests of this worker."""
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.session = requests.Session()
+        self.token = None
+        self.refresh_token = None
+        self.auth_header = None
+        self.admin_page_url = None
+        self.base_url = None
+        self.event_validation_data = None
+        self.last_login_time = None
+        self.token_expires_at = None  # JWT:n exp (epoch)
+        self.lockerroom_metadata_id = None
+        self.state_digests = {}  # Scraper-tilaan viimeksi kirjoitetut kentät
+        self.logged_in_at = None  # time.monotonic() kirjautumishetkellä
+        self.last_used = time.monotonic()
+        self.refresh_failed = False  # Uusinnan epäonnistuminen lokitetaan kerran, kunnes se taas onnistuu
+        self.lock = threading.RLock()  # Vain yksi kirjautuminen kerrallaan per käyttäjä
+
+    @property
+    def is_authenticated(self):
+        return self.logged_in_at is not None and self.base_url is not None
+
+    def age(self):
+        return time.monotonic() - self.logged_in_at if self.logged_in_at is not None else None
+
+    def expires_in(self, ttl=3600):
+        """Seconds until the access token expires; falls back to `ttl` after login if the token has no exp."""
+        if self.token_expires_at is not None:
+            return self.token_expires_at - time.time()
+        if self.logged_in_at is None:
+            return 0
+        return ttl - self.age()
+
+
+class JopoxSessionPool:
+    """Per-user pool of authenticated Jopox sessions held in this process.
+
+    Every gunicorn worker keeps its own pool. The Flask session only carries
+    a handle; cookies and tokens are in `jopox_scraper_state`, so another
+    worker can pick up a login without redoing it.
+    """
+
+    def __init__(self, ttl=3600, refresh_margin=300, idle_timeout=1800, maxsize=256):
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self.idle_timeout = idle_timeout
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._refresher = None
+
+    def configure(self, config):
+        self.ttl = config.get('JOPOX_SESSION_TTL', self.ttl)
+        self.refresh_margin = config.get('JOPOX_SESSION_REFRESH_MARGIN', self.refresh_margin)
+        self.idle_timeout = config.get('JOPOX_SESSION_IDLE_TIMEOUT', self.idle_timeout)
+        self.maxsize = config.get('JOPOX_SESSION_POOL_SIZE', self.maxsize)
+
+    def acquire(self, user_id):
+        """Return the pooled state of the user, creating an empty one on first use."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                entry = PooledJopoxSession(user_id)
+                self._entries[user_id] = entry
+            # Vanhentunut kirjautuminen jätetään pooliin, jotta sen refresh tokenia voi käyttää
+            if entry.is_authenticated and entry.expires_in(self.ttl) > 0:
+                self.hits += 1
+            else:
+                self.misses += 1
+            entry.last_used = time.monotonic()
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            return entry
+
+    def store(self, user_id, scraper):
+        """Save a fresh login of `scraper` into the pool."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                entry = PooledJopoxSession(user_id)
+                self._entries[user_id] = entry
+
+        with entry.lock:
+            entry.session = scraper.session
+            for field in STATE_FIELDS:
+                setattr(entry, field, getattr(scraper, field))
+            entry.logged_in_at = time.monotonic()
+        return entry
+
+    def invalidate(self, user_id):
+        with self._lock:
+            entry = self._entries.pop(user_id, None)
+        if entry is not None:
+            logger.info("jopox_session_invalidated user_id=%s", user_id)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "authenticated": sum(1 for e in self._entries.values() if e.is_authenticated),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def due_for_refresh(self):
+        """User ids whose access token nears expiry but who have used it recently."""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                user_id for user_id, entry in self._entries.items()
+                if entry.is_authenticated
+                and entry.expires_in(self.ttl) <= self.refresh_margin
+                and now - entry.last_used < self.idle_timeout
+            ]
+
+    def start_refresher(self, app, interval=60):
+        """Start the background thread that renews sessions before they expire (once per worker)."""
+        with self._lock:
+            if self._refresher is not None and self._refresher.is_alive():
+                return
+            self._refresher = threading.Thread(
+                target=self._refresh_loop, args=(app, interval), name='jopox-session-refresher', daemon=True
+            )
+            self._refresher.start()
+
+    def _refresh_loop(self, app, interval):
+        while True:
+            time.sleep(interval)
+            for user_id in self.due_for_refresh():
+                try:
+                    with app.app_context():
+                        self._refresh(user_id)
+                except Exception:
+                    entry = self._entries.get(user_id)
+                    if entry is not None and entry.refresh_failed:
+                        logger.debug("jopox_session_refresh_failed user_id=%s (repeated)", user_id, exc_info=True)
+                    else:
+                        logger.exception("jopox_session_refresh_failed user_id=%s", user_id)
+                    if entry is not None:
+                        entry.refresh_failed = True
+
+    def _refresh(self, user_id):
+        # Tuodaan tässä, koska jopox_scraper tuo tämän moduulin
+        from extensions import db
+        from models.user import User
+        from security import cipher_suite
+        from helpers.jopox_scraper import JopoxScraper
+
+        user = db.session.get(User, user_id)
+        if not user or not user.jopox_username or not user.jopox_password:
+            self.invalidate(user_id)
+            return
+
+        password = cipher_suite.decrypt(user.jopox_password).decode('utf-8')
+        entry = self._entries.get(user_id)
+        last_used = entry.last_used if entry is not None else time.monotonic()
+
+        scraper = JopoxScraper(user.id, user.jopox_username, password)
+        if scraper.reauthenticate():
+            # Taustapäivitys ei lasketa käytöksi, muuten istunto ei koskaan vanhenisi
+            scraper.pooled.last_used = last_used
+            logger.info("jopox_session_refreshed user_id=%s", user_id)
+        else:
+            self.invalidate(user_id)
+
+
+session_pool = JopoxSessionPool()
+
+
+def get_session_pool():
+    """Return the process-wide pool, configured from the app and with its refresher running."""
+    app = current_app._get_current_object()
+    if session_pool._refresher is None:
+        session_pool.configure(app.config)
+        if app.config.get('JOPOX_SESSION_BACKGROUND_REFRESH', False):
+            session_pool.start_refresher(app, app.config.get('JOPOX_SESSION_REFRESH_INTERVAL', 60))
+    return session_pool
@@ -0,0 +1,101 @@
+import os
+import re
+
+from flask import current_app, has_app_context
+
+from helpers.cache import TTLCache
+from helpers.fuzzy_scoring import backend as fuzzy_backend
+
+# Näin monta alkumerkkiä on oltava yhteisiä, jotta sarja kelpaa (kuten ennenkin)
+MIN_PREFIX = 5
+# Sanajärjestyksestä riippumaton vertailu, kun alkuosa ei täsmää
+MIN_TOKEN_RATIO = 90
+
+
+def normalize_league_name(text):
+    return re.sub(r'\s+', ' ', (text or '')).strip().casefold()
+
+
+def _sorted_tokens(text):
+    return ' '.join(sorted(text.split()))
+
+
+class LeagueIndex:
+    """League options of one Jopox site, indexed for matching tulospalvelu level names.
+
+    Matching order: exact name (case and whitespace ignored), then the
+    longest common prefix of at least MIN_PREFIX characters with ties broken
+    by fuzzy ratio, then a word-order independent ratio of MIN_TOKEN_RATIO.
+    """
+
+    def __init__(self, options):
+        self.options = [
+            (option.get('value'), normalize_league_name(option.get('text')))
+            for option in options or []
+            if option.get('value')
+        ]
+        self.by_name = {}
+        for value, name in self.options:
+            self.by_name.setdefault(name, value)
+        self.tokens = [(value, _sorted_tokens(name)) for value, name in self.options]
+
+    def __len__(self):
+        return len(self.options)
+
+    def match(self, level):
+        """Return the league id for `level`, or None if no league is close enough."""
+        name = normalize_league_name(level)
+        if not name:
+            return None
+        if name in self.by_name:
+            return self.by_name[name]
+
+        best = None
+        for value, option_name in self.options:
+            prefix = len(os.path.commonprefix([option_name, name]))
+            if prefix < MIN_PREFIX:
+                continue
+            key = (prefix, fuzzy_backend.ratio(option_name, name))
+            if best is None or key > best[0]:
+                best = (key, value)
+        if best is not None:
+            return best[1]
+
+        tokens = _sorted_tokens(name)
+        scored = [(fuzzy_backend.ratio(option_tokens, tokens), value) for value, option_tokens in self.tokens]
+        score, value = max(scored, key=lambda entry: entry[0], default=(0, None))
+        return value if score >= MIN_TOKEN_RATIO else None
+
+
+class LeagueCatalogCache:
+    """Per-user LeagueIndex, so a batch (and the next one) does not reparse the league dropdown."""
+
+    def __init__(self, maxsize=256, ttl=3600):
+        self.memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._configured = False
+
+    def _configure(self):
+        if self._configured or not has_app_context():
+            return
+        config = current_app.config
+        self.memory.ttl = config.get('JOPOX_LEAGUE_CACHE_TTL', self.memory.ttl)
+        self._configured = True
+
+    def get(self, user_id):
+        self._configure()
+        return self.memory.get(user_id)
+
+    def store(self, user_id, options):
+        self._configure()
+        index = LeagueIndex(options)
+        self.memory.set(user_id, index)
+        return index
+
+    def invalidate(self, user_id):
+        self.memory.pop(user_id)
+
+    def stats(self):
+        return self.memory.stats()
+
+
+league_catalog = LeagueCatalogCache()
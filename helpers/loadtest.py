@@ -0,0 +1,246 @@
+import json
+import os
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import requests
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOADTEST_PASSWORD = 'loadtest-password'
+_CSRF_TOKEN = re.compile(r'name="csrf_token"[^>]*value="([^"]+)"')
+
+
+def stand_in_games(team_id, games=20):
+    """getGames.php-shaped payload of one team; the same input always gives the same bytes."""
+    start = datetime(2026, 1, 3)
+    return [{
+        'LevelName': 'U12',
+        'Games': [{
+            'GameID': f"{team_id}{i:03d}",
+            'GameDate': (start + timedelta(days=7 * i)).strftime('%d.%m.%Y'),
+            'GameTime': '12:00',
+            'HomeTeamAbbrv': f"Joukkue {team_id}" if i % 2 else 'Vieras',
+            'AwayTeamAbbrv': 'Vieras' if i % 2 else f"Joukkue {team_id}",
+            'HomeGoals': '',
+            'AwayGoals': '',
+            'RinkName': 'Halli',
+            'LevelName': 'U12',
+            'StatGroupName': 'Lohko 1',
+            'SmallAreaGame': '0',
+        } for i in range(games)],
+    }]
+
+
+def start_stand_in(latency_ms=250):
+    """Local tulospalvelu stand-in answering getGames.php after `latency_ms`; returns the server."""
+    latency = latency_ms / 1000
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            form = parse_qs(self.rfile.read(int(self.headers.get('Content-Length') or 0)).decode())
+            if not self.path.endswith('/getGames.php'):
+                self.send_error(404)
+                return
+            time.sleep(latency)  # Oikean palvelun vasteaika
+            body = json.dumps(stand_in_games(form.get('teamid', ['0'])[0])).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    server.request_queue_size = 256
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def seed_database(users=50, teams=3):
+    """Create the schema and `users` login users managing `teams` teams each (run with DATABASE_URL set)."""
+    from app import create_app
+    from extensions import bcrypt, db
+    from models.team import Team
+    from models.user import User
+    from models.userteam import UserTeam
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        # Yksi hash kaikille, bcrypt on tarkoituksella hidas
+        password_hash = bcrypt.generate_password_hash(LOADTEST_PASSWORD).decode('utf-8')
+        team_rows = [
+            Team(team_id=str(1000 + i), team_name=f"Joukkue {1000 + i}", season='2026', statgroup=str(500 + i), stat_group=str(500 + i))
+            for i in range(teams)
+        ]
+        db.session.add_all(team_rows)
+        for n in range(users):
+            user = User(username=f"loadtest{n}", email=f"loadtest{n}@example.invalid", password_hash=password_hash)
+            db.session.add(user)
+            db.session.flush()
+            db.session.add_all(UserTeam(user_id=user.id, team_id=team.id, relationship_type='manage') for team in team_rows)
+        db.session.commit()
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(base_url, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            return False
+        try:
+            if requests.get(f"{base_url}/auth/login", timeout=2).status_code == 200:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(0.25)
+    return False
+
+
+def _log_in(base_url, n):
+    client = requests.Session()
+    page = client.get(f"{base_url}/auth/login", timeout=30)
+    token = _CSRF_TOKEN.search(page.text)
+    response = client.post(f"{base_url}/auth/login", data={
+        'csrf_token': token.group(1) if token else '',
+        'username': f"loadtest{n}",
+        'password': LOADTEST_PASSWORD,
+    }, timeout=60)
+    if not response.url.rstrip('/').endswith('/schedule'):
+        raise RuntimeError(f"Login of loadtest{n} failed (ended at {response.url})")
+    return client
+
+
+def _schedule_page_user(base_url, client, deadline, results, lock):
+    """One schedule-page visitor: load the page, then its games (/api/schedules), again and again."""
+    while time.monotonic() < deadline:
+        for path in ('/schedule', '/api/schedules'):
+            started = time.perf_counter()
+            try:
+                response = client.get(f"{base_url}{path}", timeout=120, allow_redirects=False)
+                ok = response.status_code == 200  # Uudelleenohjaus kirjautumiseen on virhe
+            except requests.RequestException:
+                ok = False
+            took_ms = (time.perf_counter() - started) * 1000
+            with lock:
+                results.append((path, ok, took_ms, time.monotonic() <= deadline))
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def run_load_test(worker_classes=('sync', 'gthread'), users=50, duration=20, workers=2, threads=8,
+                  teams=3, latency_ms=250):
+    """Run gunicorn with each worker class against a local tulospalvelu stand-in.
+
+    `users` concurrent schedule-page visitors log in and keep loading
+    /schedule and /api/schedules for `duration` seconds. Every schedule
+    request fetches `teams` teams from the stand-in, which answers after
+    `latency_ms`. Returns one result dict per worker class.
+    """
+    temp_dir = tempfile.mkdtemp(prefix='loadtest_')
+    stand_in = start_stand_in(latency_ms)
+    env = dict(os.environ)
+    env.update({
+        'PYTHONPATH': os.pathsep.join(filter(None, (ROOT_DIR, env.get('PYTHONPATH')))),
+        'DATABASE_URL': f"sqlite:///{os.path.join(temp_dir, 'loadtest.db')}",
+        'SESSION_BACKEND': 'sql',  # Kirjautuminen näkyy kaikille workereille
+        'TULOSPALVELU_URL': f"http://127.0.0.1:{stand_in.server_address[1]}",
+        'SCHEDULE_FRESHNESS_SECONDS': '0',  # Jokainen pyyntö hakee korvikkeelta
+        'LOG_LEVEL': os.getenv('LOADTEST_LOG_LEVEL', 'WARNING'),
+        'WEB_CONCURRENCY': str(workers),
+        'GUNICORN_THREADS': str(threads),
+    })
+    results = []
+    try:
+        subprocess.run(
+            [sys.executable, '-c', f"from helpers.loadtest import seed_database; seed_database({users}, {teams})"],
+            env=env, cwd=temp_dir, check=True, capture_output=True,
+        )
+        for worker_class in worker_classes:
+            results.append(_run_one(worker_class, env, temp_dir, users, duration, workers, threads))
+    finally:
+        stand_in.shutdown()
+        stand_in.server_close()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    return results
+
+
+def _run_one(worker_class, env, temp_dir, users, duration, workers, threads):
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    log_path = os.path.join(temp_dir, f"gunicorn_{worker_class}.log")
+    with open(log_path, 'w') as log:
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', 'wsgi:app', '--config', os.path.join(ROOT_DIR, 'gunicorn.conf.py')],
+            env={**env, 'GUNICORN_WORKER_CLASS': worker_class, 'GUNICORN_BIND': f"127.0.0.1:{port}"},
+            cwd=temp_dir, stdout=log, stderr=subprocess.STDOUT,
+        )
+    try:
+        if not _wait_ready(base_url, process):
+            with open(log_path) as log:
+                raise RuntimeError(f"gunicorn ({worker_class}) did not start:\n{log.read()[-2000:]}")
+
+        with ThreadPoolExecutor(max_workers=min(users, 16)) as executor:
+            clients = list(executor.map(lambda n: _log_in(base_url, n), range(users)))
+
+        samples = []
+        lock = threading.Lock()
+        deadline = time.monotonic() + duration
+        user_threads = [
+            threading.Thread(target=_schedule_page_user, args=(base_url, client, deadline, samples, lock), daemon=True)
+            for client in clients
+        ]
+        for thread in user_threads:
+            thread.start()
+        for thread in user_threads:
+            thread.join()
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+    # Vain kesto-ajan sisällä valmistuneet pyynnöt lasketaan läpäisyyn
+    in_window = [sample for sample in samples if sample[3]]
+    schedule_ms = [took for path, ok, took, _ in in_window if path == '/api/schedules' and ok]
+    return {
+        'worker_class': worker_class,
+        'workers': workers,
+        'threads': threads if worker_class == 'gthread' else 1,
+        'users': users,
+        'duration': duration,
+        'requests': len(in_window),
+        'errors': sum(1 for _, ok, _, _ in samples if not ok),
+        'throughput_rps': len(in_window) / duration,
+        'schedules_per_s': len(schedule_ms) / duration,
+        'schedules_p50_ms': _percentile(schedule_ms, 0.5),
+        'schedules_p95_ms': _percentile(schedule_ms, 0.95),
+    }
@@ -0,0 +1,126 @@
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from extensions import db
+from logging_config import logger
+from models.tgames import TGamesdb
+
+BATCH_SIZE = 500
+CONFLICT_COLUMNS = ['game_id', 'team_id']  # ux_tgames_game_id_team_id
+
+# Kentät, joiden muutokset raportoidaan ja päivitetään olemassa oleviin peleihin
+TRACKED_FIELDS = (
+    ('date', 'Date'),
+    ('time', 'Time'),
+    ('location', 'Location'),
+)
+
+
+def _chunks(items, size=BATCH_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _row_from_game(game):
+    return {
+        'game_id': game['Game ID'],
+        'team_id': game['Team ID'],
+        'date': game['Date'],
+        'time': game['Time'],
+        'home_team': game['Home Team'],
+        'away_team': game['Away Team'],
+        'home_goals': game['Home Goals'],
+        'away_goals': game['Away Goals'],
+        'location': game['Location'],
+        'level_name': game['Level Name'],
+        'stat_group_name': game['Stat Group Name'],
+        'small_area_game': game['Small Area Game'],
+        'team_name': game['Team Name'],
+        'type': game['Type'],
+        'sortable_date': game['SortableDate'],
+    }
+
+
+def _insert(rows):
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        stmt = pg_insert(TGamesdb).values(rows).on_conflict_do_nothing(index_elements=CONFLICT_COLUMNS)
+    elif dialect == 'sqlite':
+        stmt = sqlite_insert(TGamesdb).values(rows).on_conflict_do_nothing(index_elements=CONFLICT_COLUMNS)
+    else:
+        db.session.execute(TGamesdb.__table__.insert(), rows)
+        return
+    db.session.execute(stmt)
+
+
+def _load_existing(game_ids):
+    """Load stored games for the given game ids, keyed by game_id."""
+    existing = {}
+    for chunk in _chunks(game_ids):
+        rows = db.session.execute(
+            db.select(TGamesdb.id, TGamesdb.game_id, TGamesdb.date, TGamesdb.time, TGamesdb.location)
+            .where(TGamesdb.game_id.in_(chunk))
+        ).all()
+        for row in rows:
+            # Sama valinta kuin aiemmassa .first()-haussa: ensimmäinen rivi voittaa
+            existing.setdefault(row.game_id, {'id': row.id, 'date': row.date, 'time': row.time, 'location': row.location})
+    return existing
+
+
+def sync_games(games):
+    """Insert new games and update changed ones in batches.
+
+    Returns (added_games, updated_games) in the same format /api/schedules has
+    always reported. The caller is responsible for committing.
+    """
+    if not games:
+        return [], []
+
+    game_ids = list(dict.fromkeys(game['Game ID'] for game in games))
+    existing = _load_existing(game_ids)
+    logger.debug("sync_games: %d games, %d already stored", len(game_ids), len(existing))
+
+    added_games = []
+    updated_games = []
+    inserts = []
+    updates = {}
+
+    for game in games:
+        stored = existing.get(game['Game ID'])
+
+        if stored is None:
+            inserts.append(_row_from_game(game))
+            added_games.append({'game date': game['Date'], 'game id': game['Game ID']})
+            # Saman pelin myöhemmät esiintymät verrataan juuri lisättyyn riviin
+            existing[game['Game ID']] = {'id': None, **{field: game[key] for field, key in TRACKED_FIELDS}}
+            continue
+
+        changes = {}
+        for field, key in TRACKED_FIELDS:
+            if stored[field] != game[key]:
+                changes[field] = {'old': stored[field], 'new': game[key]}
+                stored[field] = game[key]
+
+        if changes:
+            updated_games.append({'game_id': game['Game ID'], 'changes': changes})
+            if stored['id'] is not None:
+                updates[stored['id']] = {'id': stored['id'], **{field: stored[field] for field, _ in TRACKED_FIELDS}}
+            else:
+                # Peli lisätään tässä samassa erässä – päivitetään lisättävä rivi
+                for row in inserts:
+                    if row['game_id'] == game['Game ID']:
+                        row.update({field: stored[field] for field, _ in TRACKED_FIELDS})
+                        break
+        else:
+            updated_games.append({'game_id': game['Game ID'], 'changes': 'No changes'})
+
+    for chunk in _chunks(inserts):
+        _insert(chunk)
+
+    update_rows = list(updates.values())
+    for chunk in _chunks(update_rows):
+        db.session.execute(update(TGamesdb), chunk)
+
+    logger.debug("sync_games: %d inserted, %d updated", len(inserts), len(update_rows))
+    return added_games, updated_games
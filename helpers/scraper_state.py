@@ -0,0 +1,82 @@
+import hashlib
+import json
+import zlib
+
+from extensions import db
+from logging_config import logger
+from models.jopox_state import JopoxScraperState
+from security import cipher_suite
+
+# Flask-sessioniin tallennetaan vain tämä kahva (käyttäjän id)
+SESSION_HANDLE = "jopox_state"
+
+
+def _encode(value):
+    return json.dumps(value, separators=(',', ':'), sort_keys=True).encode('utf-8')
+
+
+def _digest(raw):
+    return hashlib.sha1(raw).hexdigest()
+
+
+class ScraperStateStore:
+    """Jopox scraper state stored per user and field in `jopox_scraper_state`.
+
+    Values are compact JSON, zlib-compressed and encrypted with the same
+    Fernet key as the Jopox passwords. `save` only writes the fields whose
+    content differs from the digests the caller loaded, in a transaction of
+    its own so the caller's db.session is left untouched.
+    """
+
+    def load(self, user_id):
+        """Return `(values, digests)` for the user."""
+        values, digests = {}, {}
+        for row in JopoxScraperState.query.filter_by(user_id=user_id):
+            try:
+                raw = zlib.decompress(cipher_suite.decrypt(row.value))
+            except Exception:
+                logger.warning("scraper_state_unreadable user_id=%s field=%s", user_id, row.field)
+                continue
+            values[row.field] = json.loads(raw)
+            digests[row.field] = _digest(raw)
+        return values, digests
+
+    def save(self, user_id, values, digests=None):
+        """Write changed fields and return the updated digests."""
+        digests = dict(digests or {})
+        changed = {}
+        for field, value in values.items():
+            raw = _encode(value)
+            digest = _digest(raw)
+            if digests.get(field) != digest:
+                changed[field] = (raw, digest)
+
+        if not changed:
+            return digests
+
+        # Oma yhteys ja transaktio: pyynnön db.sessionia ei commitoida eikä perua kesken
+        table = JopoxScraperState.__table__
+        try:
+            with db.engine.begin() as conn:
+                for field, (raw, digest) in changed.items():
+                    conn.execute(table.delete().where(table.c.user_id == user_id, table.c.field == field))
+                    conn.execute(table.insert().values(
+                        user_id=user_id,
+                        field=field,
+                        value=cipher_suite.encrypt(zlib.compress(raw)),
+                    ))
+        except Exception as e:
+            logger.warning("scraper_state_write_failed user_id=%s error=%s", user_id, e)
+            return digests
+
+        logger.debug("scraper_state_saved user_id=%s fields=%s", user_id, sorted(changed))
+        digests.update((field, digest) for field, (raw, digest) in changed.items())
+        return digests
+
+    def clear(self, user_id):
+        table = JopoxScraperState.__table__
+        with db.engine.begin() as conn:
+            conn.execute(table.delete().where(table.c.user_id == user_id))
+
+
+scraper_state = ScraperStateStore()
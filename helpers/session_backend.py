@@ -0,0 +1,148 @@
+import pickle
+import shutil
+import tempfile
+import time
+
+from cachelib import BaseCache
+from flask import Flask
+
+from extensions import db
+from helpers.cache import TTLCache
+from logging_config import logger
+
+SESSION_BACKENDS = ('filesystem', 'memory', 'sql', 'redis')
+
+
+class LRUSessionCache(BaseCache):
+    """cachelib-compatible in-process LRU for Flask-Session (single worker / development)."""
+
+    def __init__(self, maxsize=1000, default_timeout=3600):
+        super().__init__(default_timeout)
+        self._cache = TTLCache(maxsize=maxsize, ttl=default_timeout)
+
+    def get(self, key):
+        value = self._cache.get(key)
+        return pickle.loads(value) if value is not None else None
+
+    def set(self, key, value, timeout=None):
+        timeout = self._normalize_timeout(timeout) or 365 * 24 * 3600  # 0 = ei vanhene
+        self._cache.set(key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), ttl=timeout)
+        return True
+
+    def add(self, key, value, timeout=None):
+        if self.has(key):
+            return False
+        return self.set(key, value, timeout)
+
+    def delete(self, key):
+        return self._cache.pop(key) is not None
+
+    def has(self, key):
+        return self._cache.get(key) is not None
+
+    def clear(self):
+        self._cache.clear()
+        return True
+
+
+def configure_session_backend(app, backend=None):
+    """Translate SESSION_BACKEND into the Flask-Session settings before `session.init_app`."""
+    config = app.config
+    backend = backend or config.get('SESSION_BACKEND', 'filesystem')
+    lifetime = int(app.permanent_session_lifetime.total_seconds())
+
+    if backend == 'filesystem':
+        config['SESSION_TYPE'] = 'filesystem'
+
+    elif backend == 'memory':
+        config['SESSION_TYPE'] = 'cachelib'
+        config['SESSION_CACHELIB'] = LRUSessionCache(
+            maxsize=config.get('SESSION_MEMORY_MAXSIZE', 1000), default_timeout=lifetime
+        )
+        logger.info("Session backend 'memory' is per process; use 'sql' or 'redis' with several workers")
+
+    elif backend == 'sql':
+        # Flask-Session luo taulun itse; vanhentuneet poistetaan joko N:n pyynnön välein
+        # (SESSION_CLEANUP_N_REQUESTS) tai yhdellä DELETE:llä: flask session_cleanup
+        config['SESSION_TYPE'] = 'sqlalchemy'
+        config['SESSION_SQLALCHEMY'] = db
+
+    elif backend == 'redis':
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("SESSION_BACKEND=redis vaatii redis-paketin: pip install redis") from e
+        # Toimii kaikilla Redis-protokollaa puhuvilla palvelimilla (Redis, Valkey, KeyDB)
+        config['SESSION_TYPE'] = 'redis'
+        config['SESSION_REDIS'] = redis.from_url(config.get('SESSION_REDIS_URL', 'redis://localhost:6379/0'))
+
+    else:
+        raise ValueError(f"Tuntematon SESSION_BACKEND '{backend}', vaihtoehdot: {', '.join(SESSION_BACKENDS)}")
+
+    return backend
+
+
+def benchmark_session_backend(app, backend, requests=200, payload_bytes=512):
+    """Time Flask-Session load and save per request for `backend`.
+
+    Builds a throwaway app with the same config so the real app keeps its own
+    session interface. Returns per-request averages in milliseconds.
+    """
+    from flask_session import Session
+
+    bench_app = Flask(__name__)
+    bench_app.config.update(app.config)
+    bench_app.config['SESSION_PERMANENT'] = True
+    for key in ('SESSION_CACHELIB', 'SESSION_SQLALCHEMY', 'SESSION_REDIS'):
+        bench_app.config.pop(key, None)
+    # Omat tallennuspaikat, jotta oikeat istunnot eivät sekoitu mittaukseen
+    file_dir = tempfile.mkdtemp(prefix='session_bench_')
+    bench_app.config['SESSION_FILE_DIR'] = file_dir
+    bench_app.config['SESSION_SQLALCHEMY_TABLE'] = 'sessions_benchmark'
+    bench_app.config['SESSION_KEY_PREFIX'] = 'session_bench:'
+    if backend == 'sql':
+        db.init_app(bench_app)
+    configure_session_backend(bench_app, backend)
+    Session(bench_app)
+    interface = bench_app.session_interface
+
+    payload = {
+        '_user_id': '1',
+        '_fresh': True,
+        'jopox_state': 1,
+        'data': 'x' * max(payload_bytes, 0),
+    }
+
+    with bench_app.app_context():
+        with bench_app.test_request_context() as ctx:
+            session = interface.open_session(bench_app, ctx.request)
+            session.update(payload)
+            response = bench_app.response_class()
+            interface.save_session(bench_app, session, response)
+            cookie = response.headers.getlist('Set-Cookie')[0].split(';')[0]
+
+        load_total = save_total = 0.0
+        for i in range(requests):
+            with bench_app.test_request_context(environ_base={'HTTP_COOKIE': cookie}) as ctx:
+                started = time.perf_counter()
+                session = interface.open_session(bench_app, ctx.request)
+                loaded = time.perf_counter()
+                session['n'] = i
+                interface.save_session(bench_app, session, bench_app.response_class())
+                saved = time.perf_counter()
+            load_total += loaded - started
+            save_total += saved - loaded
+
+        if backend == 'sql':
+            interface.sql_session_model.__table__.drop(bind=db.engine)
+    shutil.rmtree(file_dir, ignore_errors=True)
+
+    if session.get('_user_id') != '1':
+        raise RuntimeError(f"Session backend '{backend}' did not return the stored session")
+
+    return {
+        'backend': backend,
+        'requests': requests,
+        'load_ms': load_total / requests * 1000,
+        'save_ms': save_total / requests * 1000,
+    }
@@ -0,0 +1,90 @@
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+from collections import defaultdict
+
+# python -X importtime: "import time: self [us] | cumulative | imported package"
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$')
+
+# Raskaat riippuvuudet, joiden ei pidä latautua sovelluksen käynnistyessä
+HEAVY_MODULES = ('pandas', 'numpy', 'scipy', 'bs4', 'lxml', 'ics', 'arrow', 'cryptography')
+
+
+def _run_python(code, args=(), env=None):
+    run_env = dict(os.environ)
+    run_env.update(env or {})
+    # Sovelluksen juuri polkuun, jotta `import wsgi` toimii mistä tahansa hakemistosta
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    run_env['PYTHONPATH'] = os.pathsep.join(filter(None, (root, run_env.get('PYTHONPATH'))))
+    return subprocess.run(
+        [sys.executable, *args, '-c', code], env=run_env, capture_output=True, text=True, check=False
+    )
+
+
+def import_time_report(module='wsgi', top=20):
+    """Import `module` in a fresh interpreter under `-X importtime` and summarize the result.
+
+    Returns a dict with `total_ms`, the `top` slowest modules by cumulative
+    time and the self time summed per top-level package.
+    """
+    result = _run_python(f'import {module}', args=('-X', 'importtime'))
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr.strip()[-2000:]}")
+
+    modules = []
+    packages = defaultdict(float)
+    total_ms = 0.0
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        modules.append({
+            "module": name,
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+            "depth": (len(indent) - 1) // 2,
+        })
+        packages[name.split('.')[0]] += int(self_us) / 1000
+        if name == module:
+            total_ms = int(cumulative_us) / 1000
+
+    return {
+        "module": module,
+        "total_ms": total_ms,
+        "modules": sorted(modules, key=lambda m: m["cumulative_ms"], reverse=True)[:top],
+        "packages": sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top],
+    }
+
+
+def measure_startup(module='wsgi', runs=5):
+    """Median wall time of `import module` over `runs` fresh interpreters, plus heavy modules it loaded."""
+    code = (
+        "import sys, time\n"
+        "started = time.perf_counter()\n"
+        f"import {module}\n"
+        "elapsed = time.perf_counter() - started\n"
+        f"loaded = [m for m in {HEAVY_MODULES!r} if m in sys.modules]\n"
+        "print(elapsed, ','.join(loaded))\n"
+    )
+    timings = []
+    loaded = []
+    for _ in range(max(runs, 1)):
+        result = _run_python(code)
+        if result.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{result.stderr.strip()[-2000:]}")
+        elapsed, _, heavy = result.stdout.strip().splitlines()[-1].partition(' ')
+        timings.append(float(elapsed) * 1000)
+        loaded = [name for name in heavy.split(',') if name]
+
+    return {
+        "module": module,
+        "runs": len(timings),
+        "median_ms": statistics.median(timings),
+        "min_ms": min(timings),
+        "max_ms": max(timings),
+        "heavy_loaded": loaded,
+    }
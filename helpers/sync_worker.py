@@ -0,0 +1,256 @@
+import json
+import os
+import socket
+import time
+
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from extensions import db
+from helpers.cache import reference_cache
+from helpers.game_comparison import compare_games
+from helpers.jopox_games import fetch_jopox_games
+from helpers.user_schedule import collect_user_schedule, games_for_comparison
+from logging_config import logger
+from models.sync import SyncJob, UserSyncState
+from models.user import User
+from models.userteam import UserTeam
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+PENDING_STATUSES = (JOB_QUEUED, JOB_RUNNING)
+
+# Käsin pyydetty päivitys ohittaa ajastetut
+PRIORITIES = {'manual': 0, 'schedule': 10}
+
+
+def pending_job(user_id):
+    return (
+        SyncJob.query
+        .filter(SyncJob.user_id == user_id, SyncJob.status.in_(PENDING_STATUSES))
+        .order_by(SyncJob.created_at)
+        .first()
+    )
+
+
+def enqueue_sync(user_id, reason='schedule'):
+    """Queue a sync for the user unless one is already queued or running."""
+    job = pending_job(user_id)
+    if job is not None:
+        # Käsin pyydetty päivitys nostaa jonossa olevan työn kärkeen ja ohittaa uusinnan odotuksen
+        if job.status == JOB_QUEUED and reason == 'manual' and (job.priority > PRIORITIES[reason] or job.not_before):
+            job.priority = PRIORITIES[reason]
+            job.reason = reason
+            job.not_before = None
+            db.session.commit()
+        return job
+
+    job = SyncJob(user_id=user_id, reason=reason, priority=PRIORITIES.get(reason, 10), status=JOB_QUEUED)
+    db.session.add(job)
+    db.session.commit()
+    logger.info("sync_job_queued id=%s user_id=%s reason=%s", job.id, user_id, reason)
+    return job
+
+
+def enqueue_stale_users(stale_after):
+    """Queue a sync for every user with teams whose results are older than `stale_after` seconds."""
+    cutoff = datetime.now() - timedelta(seconds=stale_after)
+    user_ids = {user_id for (user_id,) in db.session.query(UserTeam.user_id).distinct()}
+    synced = dict(db.session.query(UserSyncState.user_id, UserSyncState.synced_at))
+    pending = {
+        user_id for (user_id,) in
+        db.session.query(SyncJob.user_id).filter(SyncJob.status.in_(PENDING_STATUSES)).distinct()
+    }
+
+    queued = 0
+    for user_id in sorted(user_ids - pending):
+        synced_at = synced.get(user_id)
+        if synced_at is None or synced_at < cutoff:
+            enqueue_sync(user_id, 'schedule')
+            queued += 1
+    return queued
+
+
+def requeue_stuck_jobs(timeout, max_attempts):
+    """Jobs left running by a crashed worker go back to the queue (or fail after max attempts)."""
+    cutoff = datetime.now() - timedelta(seconds=timeout)
+    stuck = SyncJob.query.filter(SyncJob.status == JOB_RUNNING, SyncJob.started_at < cutoff).all()
+    for job in stuck:
+        job.status = JOB_QUEUED if job.attempts < max_attempts else JOB_FAILED
+        job.error = f"Worker {job.locked_by} did not finish within {timeout}s"
+        job.locked_by = None
+        logger.warning("sync_job_stuck id=%s user_id=%s status=%s", job.id, job.user_id, job.status)
+    if stuck:
+        db.session.commit()
+    return len(stuck)
+
+
+def purge_finished_jobs(retention_days):
+    """Delete done and failed jobs older than `retention_days`; returns the number of rows removed."""
+    cutoff = datetime.now() - timedelta(days=retention_days)
+    purged = (
+        SyncJob.query
+        .filter(
+            SyncJob.status.in_((JOB_DONE, JOB_FAILED)),
+            db.func.coalesce(SyncJob.finished_at, SyncJob.created_at) < cutoff,
+        )
+        .delete(synchronize_session=False)
+    )
+    db.session.commit()
+    if purged:
+        logger.info("sync_jobs_purged count=%s", purged)
+    return purged
+
+
+def claim_next_job(worker_id):
+    """Atomically take the next queued job whose retry delay has passed; safe with several worker processes."""
+    for _ in range(5):
+        now = datetime.now()
+        job_id = (
+            db.session.query(SyncJob.id)
+            .filter(SyncJob.status == JOB_QUEUED)
+            .filter(db.or_(SyncJob.not_before.is_(None), SyncJob.not_before <= now))
+            .order_by(SyncJob.priority, SyncJob.created_at)
+            .limit(1)
+            .scalar()
+        )
+        if job_id is None:
+            return None
+
+        # Päivitys onnistuu vain yhdelle workerille, muut yrittävät seuraavaa
+        claimed = (
+            SyncJob.query
+            .filter(SyncJob.id == job_id, SyncJob.status == JOB_QUEUED)
+            .update({
+                SyncJob.status: JOB_RUNNING,
+                SyncJob.locked_by: worker_id,
+                SyncJob.started_at: now,
+                SyncJob.attempts: SyncJob.attempts + 1,
+            }, synchronize_session=False)
+        )
+        db.session.commit()
+        if claimed:
+            return db.session.get(SyncJob, job_id)
+    return None
+
+
+def sync_user(user_id):
+    """Fetch the user's schedule and Jopox games, compare them and store the result."""
+    config = current_app.config
+    user = db.session.get(User, user_id)
+    if user is None:
+        raise LookupError(f"User {user_id} not found")
+
+    schedule = collect_user_schedule(user_id)
+    # Sama JSON-muoto kuin /api/schedules palauttaa (SortableDate merkkijonona)
+    managed_games = json.loads(current_app.json.dumps(schedule["managed_games"]))
+
+    comparisons = []
+    error = None
+    if user.jopox_username and user.jopox_password:
+        games_to_compare = games_for_comparison(managed_games)
+        try:
+            jopox_games = fetch_jopox_games(user)
+            if jopox_games:
+                comparisons = compare_games(
+                    jopox_games,
+                    games_to_compare,
+                    date_window_days=config.get('COMPARE_DATE_WINDOW_DAYS', 7),
+                    mode=config.get('COMPARE_MODE', 'greedy'),
+                ) or []
+        except Exception as e:
+            logger.exception("sync_user_jopox_failed user_id=%s", user_id)
+            error = str(e)
+
+    state = db.session.get(UserSyncState, user_id) or UserSyncState(user_id=user_id)
+    state.synced_at = datetime.now()
+    state.result = current_app.json.dumps({
+        "managed_games": managed_games,
+        "comparisons": comparisons,
+        "has_jopox": bool(user.jopox_username and user.jopox_password),
+    })
+    state.error = error
+    db.session.add(state)
+    db.session.commit()
+    return state
+
+
+def run_job(job, max_attempts=3, retry_backoff=60):
+    """Run one claimed job; a failed job is retried after `retry_backoff` seconds, doubling per attempt."""
+    started = time.monotonic()
+    try:
+        sync_user(job.user_id)
+    except Exception as e:
+        db.session.rollback()
+        job = db.session.get(SyncJob, job.id)
+        if job.attempts < max_attempts:
+            job.status = JOB_QUEUED
+            job.not_before = datetime.now() + timedelta(seconds=retry_backoff * 2 ** max(job.attempts - 1, 0))
+        else:
+            job.status = JOB_FAILED
+            job.finished_at = datetime.now()
+        job.error = str(e)
+        job.locked_by = None
+        db.session.commit()
+        logger.exception("sync_job_failed id=%s user_id=%s attempts=%s", job.id, job.user_id, job.attempts)
+        return False
+
+    job.status = JOB_DONE
+    job.error = None
+    job.not_before = None
+    job.finished_at = datetime.now()
+    db.session.commit()
+    logger.info("sync_job_done id=%s user_id=%s took=%.1fs", job.id, job.user_id, time.monotonic() - started)
+    return True
+
+
+def run_worker(app, once=False):
+    """Worker loop: queue stale users periodically and run jobs until stopped.
+
+    With `once=True` the queue is drained and the function returns.
+    """
+    config = app.config
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    poll_interval = config.get('SYNC_POLL_INTERVAL', 5)
+    schedule_interval = config.get('SYNC_SCHEDULE_INTERVAL', 60)
+    max_attempts = config.get('SYNC_MAX_ATTEMPTS', 3)
+    retry_backoff = config.get('SYNC_RETRY_BACKOFF', 60)
+    next_schedule = 0.0
+    logger.info("sync_worker_started id=%s", worker_id)
+
+    while True:
+        with app.app_context():
+            try:
+                if time.monotonic() >= next_schedule:
+                    requeue_stuck_jobs(config.get('SYNC_JOB_TIMEOUT', 600), max_attempts)
+                    enqueue_stale_users(config.get('SYNC_STALE_SECONDS', 900))
+                    purge_finished_jobs(config.get('SYNC_JOB_RETENTION_DAYS', 14))
+                    if config.get('REFERENCE_CACHE_BACKEND') == 'sql':
+                        reference_cache.sql.purge_expired()
+                    next_schedule = time.monotonic() + schedule_interval
+
+                job = claim_next_job(worker_id)
+                if job is not None:
+                    run_job(job, max_attempts, retry_backoff)
+            except Exception:
+                db.session.rollback()
+                logger.exception("sync_worker_loop_failed")
+                job = None
+            finally:
+                db.session.remove()
+
+        if job is None:
+            if once:
+                return
+            time.sleep(poll_interval)
+
+
+def load_results(user_id):
+    """Precomputed results of the user, or None if no sync has finished yet."""
+    state = db.session.get(UserSyncState, user_id)
+    if state is None or state.result is None:
+        return None, state
+    return json.loads(state.result), state
@@ -0,0 +1,261 @@
+import os
+import random
+import threading
+import time
+
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from logging_config import logger
+
+# Yliajoon kelpaavat, todennäköisesti ohimenevät vastaukset
+RETRY_STATUSES = (502, 503, 504)
+
+# Tulospalvelun osoite; kuormatesti ohjaa kutsut paikalliseen korvikkeeseen
+TULOSPALVELU_URL = os.getenv('TULOSPALVELU_URL', 'https://tulospalvelu.leijonat.fi').rstrip('/')
+
+
+class UpstreamClient:
+    """Shared HTTP client for tulospalvelu and other upstream calls.
+
+    One requests.Session per worker process keeps a keep-alive connection
+    pool per host, so repeated calls skip the TCP and TLS handshakes. Every
+    call has a (connect, read) timeout; idempotent calls are retried with
+    jittered exponential backoff on connection errors, timeouts and
+    502/503/504. The latency of each call is set on the response as
+    `latency_ms` and aggregated per host in stats().
+    """
+
+    def __init__(self, connect_timeout=3.05, read_timeout=10, retries=2, backoff=0.3, pool_maxsize=16):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.pool_maxsize = pool_maxsize
+        self._session = None
+        self._lock = threading.Lock()
+        self._stats = defaultdict(lambda: {"calls": 0, "errors": 0, "retries": 0, "total_ms": 0.0, "max_ms": 0.0})
+
+    def init_app(self, app):
+        """Read UPSTREAM_* settings; called once from create_app, before any thread uses the pool."""
+        config = app.config
+        self.connect_timeout = config.get('UPSTREAM_CONNECT_TIMEOUT', self.connect_timeout)
+        self.read_timeout = config.get('UPSTREAM_READ_TIMEOUT', self.read_timeout)
+        self.retries = config.get('UPSTREAM_RETRIES', self.retries)
+        self.backoff = config.get('UPSTREAM_RETRY_BACKOFF', self.backoff)
+        self.pool_maxsize = config.get('UPSTREAM_POOL_MAXSIZE', self.pool_maxsize)
+        # Jo luotu pooli on vanhan koon mukainen; seuraava kutsu rakentaa uuden
+        self.close()
+        app.extensions['upstream'] = self
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    # Uusinnat hoidetaan itse, jotta vain idempotentit kutsut toistetaan
+                    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=self.pool_maxsize, max_retries=0)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    self._session = session
+        return self._session
+
+    def request(self, method, url, idempotent=None, timeout=None, deadline=None, **kwargs):
+        """Send a request through the shared pool.
+
+        `timeout` may be a number (read timeout) or a (connect, read) tuple;
+        it applies to every attempt, so with retries a call can take about
+        (1 + UPSTREAM_RETRIES) times as long. `deadline` bounds the whole
+        call including retries and backoff, in seconds. `idempotent` defaults
+        to True for GET/HEAD; pass True for read-only POST endpoints so they
+        are retried as well.
+        """
+        if idempotent is None:
+            idempotent = method.upper() in ('GET', 'HEAD', 'OPTIONS')
+        if timeout is None:
+            timeout = (self.connect_timeout, self.read_timeout)
+        elif not isinstance(timeout, tuple):
+            timeout = (self.connect_timeout, timeout)
+        give_up_at = time.monotonic() + deadline if deadline else None
+
+        host = urlsplit(url).netloc
+        attempts = 1 + (self.retries if idempotent else 0)
+        for attempt in range(attempts):
+            attempt_timeout = timeout
+            if give_up_at is not None:
+                # Viimeinen yritys saa vain jäljellä olevan ajan
+                remaining = max(give_up_at - time.monotonic(), 0.001)
+                attempt_timeout = (min(timeout[0], remaining), min(timeout[1], remaining))
+            started = time.perf_counter()
+            error = None
+            try:
+                response = self.session.request(method, url, timeout=attempt_timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+                self._record(host, started, error=True, retried=attempt > 0)
+                if attempt + 1 >= attempts:
+                    logger.warning("upstream_failed %s %s after %d attempt(s): %s", method, url, attempt + 1, e)
+                    raise
+                logger.info("upstream_retry %s %s attempt=%d error=%s", method, url, attempt + 1, e)
+            else:
+                response.latency_ms = self._record(
+                    host, started, error=response.status_code >= 500, retried=attempt > 0
+                )
+                if response.status_code not in RETRY_STATUSES or attempt + 1 >= attempts:
+                    logger.debug("upstream_call %s %s status=%s took=%.1fms", method, url, response.status_code, response.latency_ms)
+                    return response
+                logger.info("upstream_retry %s %s attempt=%d status=%s", method, url, attempt + 1, response.status_code)
+                response.close()
+
+            # Satunnaistettu eksponentiaalinen odotus, ettei kaikki workerit yritä samaan aikaan
+            delay = self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+            if give_up_at is not None and time.monotonic() + delay >= give_up_at:
+                logger.warning("upstream_deadline %s %s after %d attempt(s)", method, url, attempt + 1)
+                if error is not None:
+                    raise error
+                return response
+            time.sleep(delay)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def _record(self, host, started, error=False, retried=False):
+        took_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            stats = self._stats[host]
+            stats["calls"] += 1
+            stats["errors"] += int(error)
+            stats["retries"] += int(retried)
+            stats["total_ms"] += took_ms
+            stats["max_ms"] = max(stats["max_ms"], took_ms)
+        return took_ms
+
+    def stats(self):
+        with self._lock:
+            return {
+                host: {**stats, "avg_ms": stats["total_ms"] / stats["calls"] if stats["calls"] else 0.0}
+                for host, stats in self._stats.items()
+            }
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+upstream = UpstreamClient()
+
+
+def _self_signed_cert(directory):
+    """Write a localhost certificate and key for the benchmark server; returns (certfile, keyfile)."""
+    import datetime
+    import ipaddress
+
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'localhost')])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=5))
+        .not_valid_after(now + datetime.timedelta(hours=1))
+        .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address('127.0.0.1'))]), critical=False)
+        .sign(key, hashes.SHA256())
+    )
+    certfile = os.path.join(directory, 'cert.pem')
+    keyfile = os.path.join(directory, 'key.pem')
+    with open(certfile, 'wb') as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(keyfile, 'wb') as f:
+        f.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()))
+    return certfile, keyfile
+
+
+def benchmark_upstream(calls=200, tls=True, payload_bytes=2048):
+    """Compare a new connection per call (module-level requests.post) with the pooled client.
+
+    Runs a local stand-in for tulospalvelu (HTTPS with a throwaway
+    certificate unless `tls=False`) and POSTs `calls` times with each
+    approach. Returns average and p95 latency in milliseconds per approach.
+    """
+    import shutil
+    import ssl
+    import tempfile
+
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    body = b'[' + b','.join([b'{"GameID":1}'] * max(payload_bytes // 13, 1)) + b']'
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive
+        disable_nagle_algorithm = True  # Muuten viivästetty ACK lisää ~40 ms jokaiseen keep-alive-kutsuun
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length') or 0))
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    temp_dir = tempfile.mkdtemp(prefix='upstream_bench_')
+    verify = True
+    if tls:
+        certfile, keyfile = _self_signed_cert(temp_dir)
+        context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        context.load_cert_chain(certfile, keyfile)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+        verify = certfile
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    url = f"{'https' if tls else 'http'}://127.0.0.1:{server.server_address[1]}/helpers/getGames.php"
+    payload = {'season': 2026, 'stgid': 1, 'teamid': 1}
+
+    def measure(call):
+        timings = []
+        for _ in range(calls):
+            started = time.perf_counter()
+            call().raise_for_status()
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        return {
+            'avg_ms': sum(timings) / len(timings),
+            'p95_ms': timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        }
+
+    client = UpstreamClient()
+    try:
+        results = {
+            'tls': tls,
+            'calls': calls,
+            'new_connection': measure(lambda: requests.post(url, data=payload, verify=verify, timeout=10)),
+            'pooled': measure(lambda: client.post(url, data=payload, idempotent=True, verify=verify)),
+        }
+    finally:
+        client.close()
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    return results
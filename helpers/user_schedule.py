@@ -0,0 +1,138 @@
+from datetime import datetime
+
+from flask import current_app
+
+from extensions import db
+from helpers.game_fetcher import GameFetcher, fetch_all
+from helpers.schedule_sync import sync_games
+from logging_config import logger
+from models.team import Team
+from models.userteam import UserTeam
+
+
+def user_teams(user_id):
+    """Managed teams first, then followed teams, as dicts used by the schedule views."""
+    teams = []
+    for relationship_type, team_type in (('manage', 'manage'), ('follow', 'follow')):
+        teams.extend(
+            {"team_name": team.team_name, "team_id": team.team_id, "season": team.season, "stat_group_id": team.statgroup, "type": team_type}
+            for team in Team.query.join(UserTeam)
+            .filter(UserTeam.user_id == user_id, UserTeam.relationship_type == relationship_type).all()
+        )
+    return teams
+
+
+def make_fetcher(team):
+    config = current_app.config
+    return GameFetcher(
+        dwl=0,  # Replace with actual value
+        season=team['season'],
+        stat_group_id=team['stat_group_id'],
+        team_id=team['team_id'],
+        distr_id=0,  # Replace with actual value if needed
+        GameDates=3,  # Replace with actual value if needed
+        dog='2024-10-12',  # Replace with actual date logic if needed
+        timeout=config.get('SCHEDULE_FETCH_TIMEOUT'),
+        max_age=config.get('SCHEDULE_FRESHNESS_SECONDS', 0)
+    )
+
+
+def team_games(team, fetcher):
+    """Format the fetched games of one team for display (Date as dd.mm.yyyy, SortableDate kept)."""
+    games = []
+    for record in fetcher.records():
+        game = record.as_dict()
+        game['Team Name'] = team['team_name']
+        game['Type'] = team['type']  # Manage or Follow
+
+        # Add formatted and sortable dates
+        game['SortableDate'] = record.date
+        game['Date'] = record.date.strftime('%d.%m.%Y') if record.date else record.raw_date  # Format for display
+        games.append(game)
+    return games
+
+
+def schedule_sort_key(game):
+    # Virheellinen päivämäärä (None) järjestetään loppuun
+    return (game['SortableDate'] or datetime.max, game['Time'])
+
+
+def store_games(games, changed_team_ids, fetchers):
+    """Store games of changed teams; returns (added_games, updated_games)."""
+    # Teams whose payload hash is unchanged since the last fetch are already in the database
+    games_to_store = [game for game in games if game['Team ID'] in changed_team_ids]
+    logger.debug(f"Storing games for {len(changed_team_ids)} changed teams")
+
+    try:
+        added_games, updated_games = sync_games(games_to_store)
+        db.session.commit()
+        logger.debug("Commit successful.")
+    except Exception as e:
+        logger.error(f"Error storing games: {str(e)}")
+        db.session.rollback()
+        # Make sure the next request retries storing these teams
+        for fetcher in fetchers:
+            if fetcher.team_id in changed_team_ids:
+                fetcher.invalidate()
+        return [], []
+
+    if updated_games and updated_games[0]['changes'] != 'No changes':
+        logger.debug(f"Updated games: {updated_games}")
+    if added_games:
+        logger.debug(f"Added games: {added_games}")
+    return added_games, updated_games
+
+
+def collect_user_schedule(user_id):
+    """Fetch, format and store the games of all teams of the user.
+
+    Returns a dict with `managed_games` (sorted by date and time),
+    `added_games` and `updated_games`.
+    """
+    all_teams = user_teams(user_id)
+    managed_games = []
+
+    # Fetch games for all teams concurrently, then merge results in team order
+    fetchers = [make_fetcher(team) for team in all_teams]
+    errors = fetch_all(fetchers, max_workers=current_app.config.get('SCHEDULE_FETCH_WORKERS', 8))
+    changed_team_ids = set()
+
+    for team, fetcher, error in zip(all_teams, fetchers, errors):
+        logger.debug(f"Processing games for {team['team_name']}")
+        try:
+            if error:
+                logger.error(f"Error fetching games for {team['team_name']}: {error}")
+                continue  # Skip this team if there's an error
+
+            games = team_games(team, fetcher)
+            if fetcher.changed:
+                changed_team_ids.add(team['team_id'])
+            managed_games.extend(games)
+
+        except Exception as e:
+            logger.error(f"Error fetching games for {team['team_name']}: {str(e)}")
+            continue  # Skip to the next team if error occurs during fetch
+
+    # Sort all games by sortable date and time
+    managed_games = sorted(managed_games, key=schedule_sort_key)
+    logger.debug(f"Managed games fetched: {len(managed_games)} games")
+
+    added_games, updated_games = store_games(managed_games, changed_team_ids, fetchers)
+    return {
+        "managed_games": managed_games,
+        "added_games": added_games,
+        "updated_games": updated_games,
+    }
+
+
+def games_for_comparison(managed_games):
+    """Vertailuun uniikit pelit ja niistä hallinnoitavat, kuten selaimessakin"""
+    seen = set()
+    games = []
+    for game in managed_games:
+        if game.get('Game ID') in seen:
+            continue
+        seen.add(game.get('Game ID'))
+        if game.get('Type') == 'manage':
+            games.append(game)
+    return games
@@ -0,0 +1,42 @@
+"""tgames and user_team indexes
+
+Revision ID: 8e2a4c61d0f5
+Revises: 3c8d1f2a9b47
+Create Date: 2026-10-18 11:02:47.530921
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e2a4c61d0f5'
+down_revision = '3c8d1f2a9b47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 1) Poista tuplapelit ennen UNIQUE-indeksiä: säilytetään vanhin rivi per (game_id, team_id)
+    op.execute(sa.text(
+        'DELETE FROM tgames WHERE id NOT IN ('
+        'SELECT MIN(id) FROM tgames GROUP BY game_id, team_id'
+        ')'
+    ))
+
+    # 2) Indeksit otteluhakuun ja käyttäjän joukkueiden hakuun
+    with op.batch_alter_table('tgames', schema=None) as batch_op:
+        batch_op.create_index('ux_tgames_game_id_team_id', ['game_id', 'team_id'], unique=True)
+        batch_op.create_index('ix_tgames_team_id_sortable_date', ['team_id', 'sortable_date'], unique=False)
+
+    with op.batch_alter_table('user_team', schema=None) as batch_op:
+        batch_op.create_index('ix_user_team_user_id_relationship_type_team_id', ['user_id', 'relationship_type', 'team_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('user_team', schema=None) as batch_op:
+        batch_op.drop_index('ix_user_team_user_id_relationship_type_team_id')
+
+    with op.batch_alter_table('tgames', schema=None) as batch_op:
+        batch_op.drop_index('ix_tgames_team_id_sortable_date')
+        batch_op.drop_index('ux_tgames_game_id_team_id')
@@ -0,0 +1,9 @@
+# Shared cache table for upstream reference data (levels, stat groups, teams)
+
+from extensions import db
+
+class CacheEntry(db.Model):
+    __tablename__ = 'cache_entry'
+    key = db.Column(db.String(255), primary_key=True)
+    value = db.Column(db.Text, nullable=False)  # JSON-encoded payload
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
@@ -0,0 +1,12 @@
+# Jopox scraper state (cookies, tokens, ASP.NET validation) per user, one row per field
+
+from datetime import datetime
+
+from extensions import db
+
+class JopoxScraperState(db.Model):
+    __tablename__ = 'jopox_scraper_state'
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', name='fk_jopox_scraper_state_user_id', ondelete='CASCADE'), primary_key=True)
+    field = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.LargeBinary, nullable=False)  # Salattu, zlib-pakattu JSON
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.now, onupdate=datetime.now)
@@ -0,0 +1,33 @@
+# Background sync: job queue and precomputed schedule/comparison results per user
+
+from datetime import datetime
+
+from extensions import db
+
+class SyncJob(db.Model):
+    __tablename__ = 'sync_job'
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', name='fk_sync_job_user_id', ondelete='CASCADE'), nullable=False)
+    reason = db.Column(db.String(20), nullable=False, default='schedule')  # 'schedule' tai 'manual'
+    priority = db.Column(db.Integer, nullable=False, default=10)  # Pienempi ajetaan ensin
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, done, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    locked_by = db.Column(db.String(100), nullable=True)  # Työn ottaneen workerin tunniste
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    not_before = db.Column(db.DateTime, nullable=True)  # Epäonnistunut työ otetaan uudelleen vasta tämän jälkeen
+
+    __table_args__ = (
+        db.Index('ix_sync_job_status_priority_created_at', 'status', 'priority', 'created_at'),
+        db.Index('ix_sync_job_user_id_status', 'user_id', 'status'),
+    )
+
+
+class UserSyncState(db.Model):
+    __tablename__ = 'user_sync_state'
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', name='fk_user_sync_state_user_id', ondelete='CASCADE'), primary_key=True)
+    synced_at = db.Column(db.DateTime, nullable=True)  # Viimeisin onnistunut synkronointi
+    result = db.Column(db.Text, nullable=True)  # JSON: managed_games, comparisons
+    error = db.Column(db.Text, nullable=True)  # Viimeisimmän ajon virhe (esim. Jopox-kirjautuminen)
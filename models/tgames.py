@@ -29,4 +29,9 @@ class TGamesdb(db.Model):
     type = db.Column(db.String(50), nullable=False)
     sortable_date = db.Column(db.DateTime, nullable=False)
 
-    team = db.relationship('Team', back_populates='games')
\ No newline at end of file
+    team = db.relationship('Team', back_populates='games')
+
+    __table_args__ = (
+        db.Index('ux_tgames_game_id_team_id', 'game_id', 'team_id', unique=True),
+        db.Index('ix_tgames_team_id_sortable_date', 'team_id', 'sortable_date'),
+    )
\ No newline at end of file
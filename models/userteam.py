@@ -12,3 +12,7 @@ class UserTeam(db.Model):
     # Relationships to navigate between related items, avoiding overlaps
     user = db.relationship('User', backref=db.backref('user_team_entries', cascade='all, delete-orphan'), overlaps="teams,users")
     team = db.relationship('Team', backref=db.backref('team_user_entries', cascade='all, delete-orphan'), overlaps="users,teams")
+
+    __table_args__ = (
+        db.Index('ix_user_team_user_id_relationship_type_team_id', 'user_id', 'relationship_type', 'team_id'),
+    )
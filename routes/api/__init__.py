@@ -15,6 +15,8 @@ from .compare import *
 from .create_jopox import *
 from .check_level import *
 from .jopox_status import *
+from .sync import *
+from .dashboard_stream import *
 from werkzeug.exceptions import HTTPException
 
 @api_bp.errorhandler(Exception)
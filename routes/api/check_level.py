@@ -22,8 +22,8 @@ def check_level():
 
     if scraper.access_admin():
         try:
-            league = scraper.define_league(level)
-            return league
+            league = scraper.resolve_league(level)
+            return jsonify({"league_id": league})
 
         except Exception as e:
             return jsonify({"error": str(e)}), 500
@@ -1,7 +1,7 @@
 from flask import jsonify, request, current_app as app
 from flask_login import login_required
 
-from helpers.game_comparison import compare_games
+from helpers.comparison_cache import comparison_cache
 from logging_config import logger
 
 from . import api_bp
@@ -19,6 +19,15 @@ def compare_games_endpoint():
         logger.info("compare: request content-type not JSON")
         return json_error("Virheellinen sisältötyyppi: odotettiin JSONia", 400)
 
+    # Sama pyyntö kuin aiemmin → valmis vastaus ilman JSONin lukemista
+    date_window_days = app.config.get('COMPARE_DATE_WINDOW_DAYS', 7)
+    default_mode = app.config.get('COMPARE_MODE', 'greedy')
+    body_key = comparison_cache.body_key(request.get_data(cache=True), date_window_days, default_mode)
+    cached = comparison_cache.get(body_key)
+    if cached is not None:
+        logger.debug('comparison served from cache')
+        return app.response_class(cached, status=200, mimetype='application/json')
+
     # 2) Yritä lukea JSON; jos epäonnistuu → 400
     try:
         data = request.get_json(silent=False)
@@ -39,14 +48,20 @@ def compare_games_endpoint():
             "skipped": "no_jopox_games"
         }), 200
 
-    # 5) Varsinainen vertailu – virheet kiinni ja lokiin stacktrace
+    # 5) Varsinainen vertailu – samat syötteet palautetaan välimuistista, virheet kiinni ja lokiin stacktrace
     try:
-        comparison_results = compare_games(jopox_games, tulospalvelu_games) or {}
+        comparison_results = comparison_cache.compare_json(
+            jopox_games,
+            tulospalvelu_games,
+            date_window_days=date_window_days,
+            mode=data.get('mode') or default_mode,
+            body_key=body_key,
+        )
     except Exception:
         app.logger.exception("compare: compare_games raised")
         return json_error("Vertailu epäonnistui", 502)  # Bad Gateway (ulkoisen/logic layer -tyylinen virhe)
 
-    logger.info('comparison completed')
+    logger.info('comparison completed (cache %s)', comparison_cache.stats())
 
     # 6) Onnistunut vastaus yhtenäisellä muodolla
-    return jsonify(comparison_results), 200
+    return app.response_class(comparison_results, status=200, mimetype='application/json')
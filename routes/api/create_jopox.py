@@ -2,12 +2,12 @@ import logging
 
 from flask import jsonify, request
 from flask_login import login_required, current_user
-from fuzzywuzzy import fuzz
 
 from models import user
 from extensions import db
 from security import cipher_suite
 from helpers.jopox_scraper import JopoxScraper
+from helpers.fuzzy_scoring import backend as fuzzy_backend
 from logging_config import logger
 
 
@@ -46,7 +46,15 @@ def create_jopox():
     if not scraper.access_admin():
         return jsonify({ 'items': [{ 'status': 'error', 'error': 'admin_access_failed' }] }), 500
 
-    items = scraper.define_league(items)
+    # Lomake haetaan kerran: siitä sarjat ja validointitila kaikille peleille
+    form_page = scraper.load_game_form()
+    if form_page is None:
+        return jsonify({ 'items': [{ 'status': 'error', 'error': 'form_load_failed' }] }), 500
+
+    items = scraper.define_league(items, form_page=form_page)
+    if scraper.created_leagues:
+        # Uudet sarjat puuttuvat vanhan lomakkeen validointitiedoista; create_league latasi lomakkeen jo uudelleen
+        form_page = scraper.form_page or form_page
 
 
 
@@ -79,7 +87,7 @@ def create_jopox():
         })
 
     try:
-        results = scraper.add_game(games_to_add)
+        results.extend(scraper.add_game(games_to_add, form_page=form_page))
         created_count = sum(1 for r in results if r.get('status') == 'ok')
         if created_count:
             current_user.created_jopox_entries = (current_user.created_jopox_entries or 0) + created_count
@@ -100,8 +108,8 @@ def define_away_game(items):
         t_away_team = game.get("Away Team", "")
         j_home_team = game.get("Team Name", "")
 
-        home_team_score = fuzz.ratio(t_home_team, j_home_team)
-        away_team_score = fuzz.ratio(t_away_team, j_home_team)
+        home_team_score = fuzzy_backend.ratio(t_home_team, j_home_team)
+        away_team_score = fuzzy_backend.ratio(t_away_team, j_home_team)
     
 
 
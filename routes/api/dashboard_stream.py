@@ -0,0 +1,37 @@
+from flask import Response, request, stream_with_context
+from flask_login import login_required, current_user
+
+from helpers.dashboard_stream import dashboard_events, format_ndjson, format_sse
+from logging_config import logger
+
+from . import api_bp
+
+
+@api_bp.route('/dashboard_stream')
+@login_required
+def dashboard_stream():
+    """Ottelut, Jopox-pelit ja vertailut yhdestä pyynnöstä sitä mukaa kuin ne valmistuvat.
+
+    Oletuksena NDJSON (yksi JSON-tapahtuma per rivi), ?format=sse antaa
+    Server-Sent Events -muodon.
+    """
+    user_id = current_user.id
+    sse = request.args.get('format') == 'sse'
+    formatter = format_sse if sse else format_ndjson
+
+    def generate():
+        try:
+            for event in dashboard_events(user_id):
+                yield formatter(event)
+        except Exception as e:
+            logger.exception("dashboard_stream_failed user_id=%s", user_id)
+            yield formatter({"type": "error", "message": str(e)})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream' if sse else 'application/x-ndjson',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',  # nginx ei puskuroi vastausta
+        },
+    )
@@ -3,10 +3,8 @@ from flask_login import login_required, current_user
 
 from extensions import db
 from models.user import User
-from security import cipher_suite
 from logging_config import logger
-from helpers.jopox_scraper import JopoxScraper
-from helpers.data_fetcher import hae_kalenteri
+from helpers.jopox_games import attach_descriptions, load_descriptions, make_scraper
 
 from . import api_bp
 
@@ -26,26 +24,17 @@ def get_jopox_games():
     if not user.jopox_password:
         return json_error("Jopox‑salasana puuttuu", 400)
 
-    decrypted_password = cipher_suite.decrypt(user.jopox_password).decode('utf-8')
-
     # 3) Kalenterikuvausten haku – epäonnistuessa jatka tyhjällä
-    descriptions = []
-    if user.jopox_calendar_url:
-        try:
-            raw = hae_kalenteri(user.jopox_calendar_url)
-            descriptions = raw or []
-        except Exception:
-            logger.warning("Calendar fetch failed, continuing without descriptions", exc_info=True)
-            descriptions = []
+    descriptions = load_descriptions(user)
 
     logger.debug(f'Found {len(descriptions)} descriptions for games')
     logger.debug(f'UIDs: {[d.get("Uid") for d in descriptions if isinstance(d, dict)]}')
 
     # 4) Jopox‑login
-    scraper = JopoxScraper(user.id, user.jopox_username, decrypted_password)
-    logger.debug('starting scraper with jopox_games, calling ensure_logged_in and access_admin')
+    scraper = make_scraper(user)
+    logger.debug('starting scraper with jopox_games, calling access_admin')
     try:
-        if not scraper.login():
+        if not scraper.access_admin():
             logger.warning('Admin access denied')
             return json_error("Jopox‑kirjautuminen epäonnistui", 403)
     except Exception:
@@ -54,14 +43,7 @@ def get_jopox_games():
 
     # 5) Scrapea ja yhdistä kuvaukset turvallisesti
     try:
-        jopox_games = scraper.scrape_jopox_games()
-        # indeksointi turvallisesti .get:illä ettei KeyError kaada
-        desc_by_uid = { (d or {}).get('Uid'): d for d in descriptions if isinstance(d, dict) and (d or {}).get('Uid') }
-        for g in jopox_games:
-            uid = (g or {}).get('uid')
-            if uid and uid in desc_by_uid:
-                g['Lisätiedot'] = desc_by_uid[uid].get('Lisätiedot')
-
+        jopox_games = attach_descriptions(scraper.scrape_jopox_games(), descriptions)
         return jsonify(jopox_games)
 
     except Exception:
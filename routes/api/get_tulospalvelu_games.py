@@ -1,5 +1,3 @@
-import pandas as pd
-
 from flask import request, jsonify
 
 from helpers.game_fetcher import GameFetcher
@@ -20,7 +18,7 @@ def fetch_games():
     dog = '2024-10-12'
     selected_teams = request.form.getlist('teams')
 
-    managed_games_df = pd.DataFrame()
+    managed_games = []
     if not selected_teams:
         return jsonify({"error": "No teams selected. Please choose at least one team."})
 
@@ -31,16 +29,13 @@ def fetch_games():
         if error:
             return jsonify({"error": error})  # Return the error in JSON format
 
-        games_df = fetcher.display_games()
-        if not games_df.empty:
-            managed_games_df = pd.concat([managed_games_df, games_df], ignore_index=True)
+        managed_games.extend(record.as_dict() for record in fetcher.records())
 
-    if managed_games_df.empty:
+    if not managed_games:
         return jsonify({"error": "No games found for the selected teams."})
 
-    # Convert the games DataFrame to a JSON format
+    # Convert the games to a JSON format
     try:
-        managed_games_data = managed_games_df.to_dict(orient='records')
-        return jsonify(managed_games_data)
+        return jsonify(managed_games)
     except Exception as e:
-        return jsonify({"error": f"Error processing games data: {str(e)}"})
\ No newline at end of file
+        return jsonify({"error": f"Error processing games data: {str(e)}"})
@@ -1,9 +1,10 @@
 import logging
 
-from flask import jsonify, request
-from flask_login import current_user
+from flask import jsonify, request, current_app as app
+from flask_login import login_required, current_user
 
 from security import cipher_suite
+from helpers.game_details import game_details
 from helpers.jopox_scraper import JopoxScraper
 
 from . import api_bp
@@ -13,6 +14,12 @@ def jopox_form_information():
     
     logging.debug('starting jopox_form_information')
     j_game_id = request.args.get('uid')  # Extract the uid from query parameters
+
+    # Vertailun jälkeen esihaettu sivu: ei kirjautumistarkistusta eikä Jopox-pyyntöä
+    entry = game_details.get(current_user.id, j_game_id, wait=app.config.get('JOPOX_PAGE_TIMEOUT', 15))
+    if entry is not None:
+        return entry["details"]
+
     username = current_user.jopox_username
     #decrypt password from database
     encrypted_password = current_user.jopox_password
@@ -28,3 +35,25 @@ def jopox_form_information():
 
         except Exception as e:
             return jsonify({"error": str(e)}), 500
+
+
+@api_bp.route('/jopox_prefetch', methods=['POST'])
+@login_required
+def jopox_prefetch():
+    """Esihakee muokkausdialogin tiedot annetuille Jopox-peleille taustalla"""
+    if not (current_user.jopox_username and current_user.jopox_password):
+        return jsonify({"status": "skipped", "prefetching": 0}), 200
+
+    data = request.get_json(silent=True) or {}
+    uids = [str(uid) for uid in data.get('uids', []) if uid][:app.config.get('JOPOX_PREFETCH_MAX', 20)]
+    if not uids:
+        return jsonify({"status": "ok", "prefetching": 0}), 200
+
+    password = cipher_suite.decrypt(current_user.jopox_password).decode('utf-8')
+    scraper = JopoxScraper(current_user.id, current_user.jopox_username, password)
+    if not scraper.ensure_logged_in():
+        return jsonify({"status": "error", "message": "Jopox login failed"}), 502
+
+    submitted = scraper.prefetch_game_details(uids)
+    logging.debug('jopox_prefetch: %d of %d uids submitted', submitted, len(uids))
+    return jsonify({"status": "ok", "prefetching": submitted}), 202
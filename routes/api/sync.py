@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+
+from flask import jsonify, current_app as app
+from flask_login import login_required, current_user
+
+from helpers.sync_worker import enqueue_sync, load_results, pending_job
+from logging_config import logger
+
+from . import api_bp
+
+
+def job_info(job):
+    if job is None:
+        return None
+    return {"id": job.id, "status": job.status, "reason": job.reason, "created_at": job.created_at.isoformat()}
+
+
+@api_bp.route('/schedule_results')
+@login_required
+def get_schedule_results():
+    """Taustalla esilasketut ottelut ja vertailutulokset"""
+    results, state = load_results(current_user.id)
+    job = pending_job(current_user.id)
+
+    if results is None:
+        # Ei vielä tuloksia: pyydetään synkronointi, selain hakee sillä välin suoraan
+        job = job or enqueue_sync(current_user.id, 'schedule')
+        return jsonify({"status": "empty", "pending": True, "job": job_info(job)}), 200
+
+    stale_after = timedelta(seconds=app.config.get('SYNC_STALE_SECONDS', 900))
+    return jsonify({
+        "status": "ok",
+        "synced_at": state.synced_at.isoformat(),
+        "stale": state.synced_at < datetime.now() - stale_after,
+        "pending": job is not None,
+        "job": job_info(job),
+        "error": state.error,
+        **results,
+    }), 200
+
+
+@api_bp.route('/sync/refresh', methods=['POST'])
+@login_required
+def refresh_sync():
+    """Käsin pyydetty päivitys ("päivitä nyt")"""
+    job = enqueue_sync(current_user.id, 'manual')
+    logger.info("manual sync requested user_id=%s job=%s", current_user.id, job.id)
+    return jsonify({"status": "queued", "job": job_info(job)}), 202
+
+
+@api_bp.route('/sync/status')
+@login_required
+def sync_status():
+    _, state = load_results(current_user.id)
+    job = pending_job(current_user.id)
+    return jsonify({
+        "status": "ok",
+        "pending": job is not None,
+        "job": job_info(job),
+        "synced_at": state.synced_at.isoformat() if state and state.synced_at else None,
+        "error": state.error if state else None,
+    }), 200
@@ -1,6 +1,8 @@
+import base64
+import binascii
 import os
+import threading
 
-from cryptography.fernet import Fernet
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -11,4 +13,39 @@ if not fernet_key:
         "FERNET_KEY puuttuu ympäristöstä. Lisää se .env-tiedostoon tai ympäristömuuttujaksi."
     )
 
-cipher_suite = Fernet(fernet_key)
+try:
+    _key_ok = len(base64.urlsafe_b64decode(fernet_key)) == 32
+except (binascii.Error, ValueError):
+    _key_ok = False
+if not _key_ok:
+    raise RuntimeError("FERNET_KEY ei ole kelvollinen Fernet-avain (32 tavua, url-safe base64).")
+
+
+class LazyFernet:
+    """Fernet with the same encrypt/decrypt API, created on first use.
+
+    cryptography is imported only when something is actually encrypted or
+    decrypted, so CLI commands and app startup do not pay for it.
+    """
+
+    def __init__(self, key):
+        self._key = key
+        self._fernet = None
+        self._lock = threading.Lock()
+
+    def _get(self):
+        if self._fernet is None:
+            with self._lock:
+                if self._fernet is None:
+                    from cryptography.fernet import Fernet
+                    self._fernet = Fernet(self._key)
+        return self._fernet
+
+    def encrypt(self, data):
+        return self._get().encrypt(data)
+
+    def decrypt(self, token, ttl=None):
+        return self._get().decrypt(token, ttl)
+
+
+cipher_suite = LazyFernet(fernet_key)
@@ -42,6 +42,7 @@ const app = Vue.createApp({
               },
             toastTimer: null,
             isBulkCreating: false,
+            isRefreshing: false,
             icons: {
                 check: `<svg width="20" height="20" viewBox="0 0 24 24" fill="none" aria-hidden="true"><path d="M20 6L9 17l-5-5" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/></svg>`,
                 warn:  `<svg width="20" height="20" viewBox="0 0 24 24" fill="none" aria-hidden="true"><path d="M12 9v4m0 3h.01M10.29 3.86L1.82 18a2 2 0 001.71 3h16.94a2 2 0 001.71-3L13.71 3.86a2 2 0 00-3.42 0z" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/></svg>`,
@@ -56,8 +57,108 @@ const app = Vue.createApp({
     methods: {
         fetchGamesAndCompare() {
             this.isLoading = true;
+
+            // Taustatyön esilaskemat tulokset; jos niitä ei ole tai ne ovat vanhoja, haetaan suoraan
+            fetch('/api/schedule_results')
+            .then(r => r.ok ? r.json() : null)
+            .then(results => {
+                if (results && results.status === 'ok' && !results.stale && !results.error) {
+                    console.log('Precomputed results from', results.synced_at);
+                    this.setScheduleGames(results.managed_games || []);
+                    if (this.hasJopox && results.has_jopox) {
+                        this.applyComparison(results.comparisons || []);
+                    } else {
+                        this.filterGames();
+                    }
+                    this.isLoading = false;
+                    return;
+                }
+                return this.streamGamesAndCompare();
+            })
+            .catch(error => {
+                console.error('Error loading precomputed results:', error);
+                return this.streamGamesAndCompare();
+            });
+        },
+
+        streamGamesAndCompare() {
+            // Yksi pyyntö: joukkueiden ottelut näytetään sitä mukaa kuin ne valmistuvat,
+            // vertailu tulee perässä kun Jopox-haku on valmis
+            this.isLoading = true;
+            let teamOrder = [];
+            const gamesByTeam = {};
+            const comparisons = [];
+            let buffer = '';
+            let done = false;
+
+            const handleEvent = (event) => {
+                if (event.type === 'start') {
+                    teamOrder = event.teams.map(team => team.team_id);
+                } else if (event.type === 'team') {
+                    // Joukkueiden järjestys pidetään samana, jotta duplikaateista jää hallinnoitava peli
+                    gamesByTeam[event.team_id] = event.games;
+                    const games = teamOrder.flatMap(teamId => gamesByTeam[teamId] || []);
+                    games.sort((a, b) =>
+                        (Date.parse(a.SortableDate) - Date.parse(b.SortableDate)) || String(a.Time).localeCompare(String(b.Time))
+                    );
+                    this.setScheduleGames(games);
+                    this.filterGames();
+                    this.isLoading = false;
+                } else if (event.type === 'comparison') {
+                    comparisons.push(...event.results);
+                } else if (event.type === 'team_error' || event.type === 'jopox_error') {
+                    console.error('Dashboard stream:', event);
+                } else if (event.type === 'error') {
+                    throw new Error(event.message);
+                } else if (event.type === 'done') {
+                    done = true;
+                    if (this.hasJopox && comparisons.length) {
+                        this.applyComparison(comparisons);
+                    } else {
+                        this.filterGames();
+                    }
+                }
+            };
+
+            return fetch('/api/dashboard_stream')
+            .then(response => {
+                if (!response.ok || !response.body) {
+                    throw new Error(`Dashboard stream failed: ${response.status}`);
+                }
+                const reader = response.body.getReader();
+                const decoder = new TextDecoder();
+
+                const read = () => reader.read().then(({ value, done: finished }) => {
+                    buffer += decoder.decode(value || new Uint8Array(), { stream: !finished });
+                    const lines = buffer.split('\n');
+                    buffer = finished ? '' : lines.pop();
+                    for (const line of lines) {
+                        if (line.trim()) {
+                            handleEvent(JSON.parse(line));
+                        }
+                    }
+                    return finished ? undefined : read();
+                });
+                return read();
+            })
+            .then(() => {
+                if (!done) {
+                    throw new Error('Dashboard stream ended early');
+                }
+            })
+            .catch(error => {
+                console.error('Error during streaming, falling back:', error);
+                return this.fetchLiveGamesAndCompare();
+            })
+            .finally(() => {
+                this.isLoading = false;
+            });
+        },
+
+        fetchLiveGamesAndCompare() {
+            this.isLoading = true;
           
-            Promise.all([
+            return Promise.all([
                 fetch('/api/schedules').then(response => response.json()),
                 this.hasJopox
                 ? fetch('/api/jopox_games').then(r => r.json())
@@ -69,18 +170,7 @@ const app = Vue.createApp({
                     console.log('Tulospalvelu data:', tulospalveluData);
                     console.log('Jopox data:', jopoxGames);
 
-                    const tulospalveluGames = tulospalveluData.managed_games;  // Käytetään oikeaa kenttää
-                    // Filter out duplicate Game IDs
-                    const uniqueGames = [];
-                    const seenGameIDs = new Set();
-                    for (const game of tulospalveluGames) {
-                        if (!seenGameIDs.has(game['Game ID'])) {
-                            seenGameIDs.add(game['Game ID']);
-                            uniqueGames.push(game);
-                        }
-                    }
-                    this.allGames = uniqueGames;
-                    this.managedGames = uniqueGames.filter(game => game.Type === 'manage');
+                    this.setScheduleGames(tulospalveluData.managed_games);  // Käytetään oikeaa kenttää
             
                 } else {
                     console.error('Unexpected Tulospalvelu response:', tulospalveluData);
@@ -98,35 +188,7 @@ const app = Vue.createApp({
                     }),
                 })
                 .then(response => response.json())
-                .then(comparisonResults => {
-                    // Update game cards with comparison results
-                    this.managedGames = this.managedGames.map(game => {
-                        const match = comparisonResults.find(
-                            result => result.game['Game ID'] === game['Game ID']
-                        );
-                        return {
-                            ...game,
-                            match_status: match?.match_status || 'red', // Default to red if no match
-                            reason: match?.reason || 'No match found',
-                            best_match: match?.best_match || null, // Include best_match details if available
-                            uid: match?.best_match?.uid || null, // Include unique UID for later use
-                            warning: match?.warning || null, // Include warning if available
-                        };
-                        
-                    });
-                    this.allGames = this.allGames.map(game => {
-                        const managedGame = this.managedGames.find(
-                            managed => managed['Game ID'] === game['Game ID']
-                        );
-                        if (managedGame) {
-                            // Jos peli löytyy managedGames-listasta, käytä päivitettyjä tietoja
-                            return { ...game, ...managedGame };
-                        }
-                        return game; // Muuten pidä alkuperäinen
-                    });
-
-                    this.filterGames();
-                });
+                .then(comparisonResults => this.applyComparison(comparisonResults));
 
             } else {
             this.filterGames();
@@ -142,6 +204,96 @@ const app = Vue.createApp({
             });
         },
 
+        setScheduleGames(tulospalveluGames) {
+            // Filter out duplicate Game IDs
+            const uniqueGames = [];
+            const seenGameIDs = new Set();
+            for (const game of tulospalveluGames) {
+                if (!seenGameIDs.has(game['Game ID'])) {
+                    seenGameIDs.add(game['Game ID']);
+                    uniqueGames.push(game);
+                }
+            }
+            this.allGames = uniqueGames;
+            this.managedGames = uniqueGames.filter(game => game.Type === 'manage');
+        },
+
+        applyComparison(comparisonResults) {
+            // Update game cards with comparison results
+            this.managedGames = this.managedGames.map(game => {
+                const match = comparisonResults.find(
+                    result => result.game['Game ID'] === game['Game ID']
+                );
+                return {
+                    ...game,
+                    match_status: match?.match_status || 'red', // Default to red if no match
+                    reason: match?.reason || 'No match found',
+                    best_match: match?.best_match || null, // Include best_match details if available
+                    uid: match?.best_match?.uid || null, // Include unique UID for later use
+                    warning: match?.warning || null, // Include warning if available
+                };
+                
+            });
+            this.allGames = this.allGames.map(game => {
+                const managedGame = this.managedGames.find(
+                    managed => managed['Game ID'] === game['Game ID']
+                );
+                if (managedGame) {
+                    // Jos peli löytyy managedGames-listasta, käytä päivitettyjä tietoja
+                    return { ...game, ...managedGame };
+                }
+                return game; // Muuten pidä alkuperäinen
+            });
+
+            this.filterGames();
+            this.prefetchJopoxDetails(comparisonResults);
+        },
+
+        prefetchJopoxDetails(comparisonResults) {
+            // Keltaisten rivien Jopox-lomakkeet haetaan taustalla valmiiksi, jolloin muokkausdialogi aukeaa heti
+            const uids = (comparisonResults || [])
+                .filter(result => result.match_status !== 'green' && result.best_match?.uid)
+                .filter(result => !this.isPastDay(result.game?.SortableDate))
+                .map(result => result.best_match.uid);
+            if (!this.hasJopox || uids.length === 0) {
+                return;
+            }
+            fetch('/api/jopox_prefetch', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ uids })
+            })
+            .catch(error => console.warn('Jopox prefetch failed:', error));
+        },
+
+        refreshNow() {
+            // "Päivitä nyt": pyydetään taustatyöltä uusi synkronointi ja odotetaan sen valmistumista
+            this.isRefreshing = true;
+            fetch('/api/sync/refresh', { method: 'POST' })
+            .then(r => r.json())
+            .then(() => this.waitForSync())
+            .then(() => this.fetchGamesAndCompare())
+            .catch(error => {
+                console.error('Error during manual refresh:', error);
+                this.showToast('Päivitys epäonnistui.', 'error', 5000);
+            })
+            .finally(() => {
+                this.isRefreshing = false;
+            });
+        },
+
+        waitForSync(attempts = 60) {
+            return fetch('/api/sync/status')
+            .then(r => r.json())
+            .then(status => {
+                if (!status.pending || attempts <= 0) {
+                    return status;
+                }
+                return new Promise(resolve => setTimeout(resolve, 3000))
+                    .then(() => this.waitForSync(attempts - 1));
+            });
+        },
+
         fetchTeams() {
             fetch('/api/teams')
                 .then(response => response.json())
@@ -936,6 +1088,9 @@ template:
         <button class="bulk-create-button" :disabled="disableBulkButton" @click="bulkCreateJopox">
             {{ isBulkCreating ? 'Lisätään…' : 'Lisää kaikki Jopoxiin' }}
         </button>
+        <button class="refresh-button" :disabled="isRefreshing" @click="refreshNow">
+            {{ isRefreshing ? 'Päivitetään…' : 'Päivitä nyt' }}
+        </button>
     </div>
 </div>
 
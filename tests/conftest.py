@@ -0,0 +1,8 @@
+import base64
+import os
+
+# security.py vaatii avaimen jo importissa; testeissä kelpaa satunnainen
+os.environ.setdefault('FERNET_KEY', base64.urlsafe_b64encode(os.urandom(32)).decode())
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
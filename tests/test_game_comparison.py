@@ -0,0 +1,201 @@
+import copy
+import itertools
+import json
+import os
+import random
+import time
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from helpers import game_comparison
+from tests.conftest import FIXTURES_DIR
+
+# Recorded with the original all-pairs compare_games; `expected` is its output
+with open(os.path.join(FIXTURES_DIR, 'game_comparison_cases.json'), encoding='utf-8') as f:
+    CASES = json.load(f)
+
+
+@pytest.fixture
+def frozen_now(monkeypatch):
+    """Freeze datetime.now() in game_comparison so the 'already played' cutoff matches the recording."""
+    def freeze(iso):
+        now = datetime.fromisoformat(iso)
+
+        class FrozenDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return cls.combine(now.date(), now.time())
+
+        monkeypatch.setattr(game_comparison, 'datetime', FrozenDatetime)
+    return freeze
+
+
+@pytest.mark.parametrize('case', CASES, ids=[case['name'] for case in CASES])
+def test_compare_games_matches_recorded_baseline(case, frozen_now):
+    frozen_now(case['now'])
+    result = game_comparison.compare_games(
+        copy.deepcopy(case['jopox_games']),
+        copy.deepcopy(case['tulospalvelu_games']),
+        date_window_days=case['date_window_days'],
+    )
+    assert result == case['expected']
+
+
+def test_recorded_baseline_covers_every_verdict():
+    statuses = {entry['match_status'] for case in CASES for entry in case['expected']}
+    assert {'green', 'yellow', 'red'} <= statuses
+
+
+@pytest.mark.parametrize('name, game_id, uid', [
+    ('outside_window_wins', '1', '502'),
+    ('outside_window_wins', '2', '503'),
+    ('window_edges', '11', '601'),
+    ('window_edges', '12', '602'),
+    ('window_edges', '13', '603'),
+])
+def test_games_at_or_beyond_date_window_still_win(name, game_id, uid, frozen_now):
+    case = next(case for case in CASES if case['name'] == name)
+    frozen_now(case['now'])
+    result = game_comparison.compare_games(
+        copy.deepcopy(case['jopox_games']),
+        copy.deepcopy(case['tulospalvelu_games']),
+        date_window_days=case['date_window_days'],
+    )
+    best = {entry['game']['Game ID']: entry['best_match'] for entry in result}
+    assert best[game_id]['uid'] == uid
+
+
+TEAMS = ['S-Kiekko Sininen', 'HIFK Blue', 'Jokerit Juniorit', 'Kiekko-Espoo Musta', 'Blues U12', 'KJT Valkoinen']
+RINKS = ['Espoo Areena 1', 'Matinkylä jäähalli', 'Tapiolan harjoitushalli 3', 'Leppävaara']
+GENERATED_NOW = '2026-01-01T12:00:00'
+
+
+def generate_games(seed, n_t, n_j, days=60):
+    """Random tulospalvelu and Jopox games after GENERATED_NOW; most games have a noisy Jopox copy."""
+    rng = random.Random(seed)
+    base = datetime.fromisoformat(GENERATED_NOW).replace(hour=0)
+    tulospalvelu_games, jopox_games = [], []
+    for i in range(n_t):
+        day = base + timedelta(days=rng.randint(1, days))
+        time = rng.choice(['07:00', '09:15', '12:00', '17:45'])
+        home, away = rng.sample(TEAMS, 2)
+        location = rng.choice(RINKS)
+        tulospalvelu_games.append({
+            'Game ID': str(1000 + i), 'Type': 'manage', 'Time': time, 'Location': location,
+            'SortableDate': day.strftime('%a, %d %b %Y %H:%M:%S') + ' GMT',
+            'Small Area Game': rng.choice(['0', '1']), 'Home Team': home, 'Away Team': away,
+        })
+        if len(jopox_games) < n_j and rng.random() < 0.85:
+            jopox_day = day + timedelta(days=rng.choice([0, 0, 0, 1, -1, 3, 10]))
+            jopox_time = time if rng.random() < 0.6 else rng.choice(['07:00', '08:15', '11:00'])
+            jopox_games.append({
+                'sortable_date': jopox_day.strftime('%Y-%m-%d ') + jopox_time, 'aika': jopox_time,
+                'paikka': location if rng.random() < 0.7 else rng.choice(RINKS),
+                'joukkueet': f"{home} - {away}", 'uid': str(5000 + i), 'Lisätiedot': rng.choice(['', 'pienpeli']),
+            })
+    while len(jopox_games) < n_j:
+        day = base + timedelta(days=rng.randint(1, days))
+        home, away = rng.sample(TEAMS, 2)
+        jopox_games.append({
+            'sortable_date': day.strftime('%Y-%m-%d 18:00'), 'aika': '18:00', 'paikka': rng.choice(RINKS),
+            'joukkueet': f"{home} - {away}", 'uid': str(9000 + len(jopox_games)),
+        })
+    rng.shuffle(jopox_games)
+    return tulospalvelu_games, jopox_games
+
+
+def matches_by_game(result):
+    return {entry['game']['Game ID']: (entry['best_match'] or {}).get('uid') for entry in result}
+
+
+@pytest.mark.parametrize('numpy_only', [False, True], ids=['default', 'numpy'])
+def test_linear_sum_assignment_max_matches_brute_force(numpy_only, monkeypatch):
+    np = pytest.importorskip('numpy')
+    if numpy_only:
+        monkeypatch.setattr(game_comparison, '_scipy_linear_sum_assignment', lambda: None)
+    rng = np.random.default_rng(0)
+    for n_rows in range(1, 6):
+        for _ in range(20):
+            n_cols = int(rng.integers(1, 7))
+            weights = rng.integers(0, 5, (n_rows, n_cols)).astype(float)
+            col_for_row = game_comparison.linear_sum_assignment_max(weights)
+
+            assigned = [col for col in col_for_row if col >= 0]
+            assert len(assigned) == len(set(assigned)) == min(n_rows, n_cols)
+            best = max(
+                sum(weights[row, col] for row, col in zip(rows, cols))
+                for cols in itertools.permutations(range(n_cols), min(n_rows, n_cols))
+                for rows in itertools.combinations(range(n_rows), min(n_rows, n_cols))
+            )
+            assert sum(weights[row, col] for row, col in enumerate(col_for_row) if col >= 0) == best
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_optimal_mode_total_score_matches_brute_force(seed, frozen_now):
+    pytest.importorskip('numpy')
+    frozen_now(GENERATED_NOW)
+    tulospalvelu_games, jopox_games = generate_games(seed, 5, 5, days=3)
+    cutoff = datetime.fromisoformat(GENERATED_NOW) - timedelta(days=1)
+    t_records = [t for _, t in game_comparison.prepare_tulospalvelu_games(tulospalvelu_games, cutoff)]
+    j_records = sorted(
+        (j for bucket in game_comparison.build_date_index(jopox_games, cutoff).values() for j in bucket),
+        key=lambda j: j.position,
+    )
+    scorer = game_comparison.PairScorer(t_records, j_records)
+    scores = [[max(game_comparison.score_pair(t, j, scorer)[0], 0) for j in j_records] for t in t_records]
+
+    # Every pair within the window, so the assignment is the optimum of the whole problem
+    winners = game_comparison.compare_games_optimal(t_records, j_records, 30, scorer)
+
+    positions = [winner[0] for winner in winners if winner]
+    assert len(positions) == len(set(positions))
+    brute_force = max(
+        sum(scores[row][col] for row, col in enumerate(cols))
+        for cols in itertools.permutations(range(len(j_records)), len(t_records))
+    )
+    assert sum(winner[2] for winner in winners if winner) == brute_force
+
+
+def test_optimal_mode_is_stable_under_shuffled_input(frozen_now):
+    pytest.importorskip('numpy')
+    frozen_now(GENERATED_NOW)
+    tulospalvelu_games, jopox_games = generate_games(1, 80, 80)
+    expected = matches_by_game(game_comparison.compare_games(
+        copy.deepcopy(jopox_games), copy.deepcopy(tulospalvelu_games), mode='optimal'))
+
+    rng = random.Random(2)
+    for _ in range(3):
+        rng.shuffle(tulospalvelu_games)
+        rng.shuffle(jopox_games)
+        result = game_comparison.compare_games(
+            copy.deepcopy(jopox_games), copy.deepcopy(tulospalvelu_games), mode='optimal')
+        assert matches_by_game(result) == expected
+
+
+def test_optimal_mode_matches_outside_date_window_like_greedy(frozen_now):
+    pytest.importorskip('numpy')
+    case = next(case for case in CASES if case['name'] == 'outside_window_wins')
+    frozen_now(case['now'])
+    result = game_comparison.compare_games(
+        copy.deepcopy(case['jopox_games']),
+        copy.deepcopy(case['tulospalvelu_games']),
+        date_window_days=case['date_window_days'],
+        mode='optimal',
+    )
+    assert matches_by_game(result) == matches_by_game(case['expected'])
+
+
+def test_optimal_mode_500_by_500_within_time_budget(frozen_now):
+    pytest.importorskip('numpy')
+    frozen_now(GENERATED_NOW)
+    tulospalvelu_games, jopox_games = generate_games(3, 500, 500)
+    game_comparison.compare_games(jopox_games[:5], tulospalvelu_games[:5], mode='optimal')  # Lazy imports
+
+    started = time.perf_counter()
+    result = game_comparison.compare_games(jopox_games, tulospalvelu_games, mode='optimal')
+    elapsed = time.perf_counter() - started
+
+    assert len(result) == 500
+    assert elapsed < 1.0
@@ -0,0 +1,65 @@
+import os
+
+import pytest
+from bs4 import BeautifulSoup
+
+from helpers import jopox_page
+from helpers.jopox_page import HIDDEN_FIELDS, JopoxPage, games_list_strainer, parse_html
+from helpers.jopox_scraper import JopoxScraper
+from tests.conftest import FIXTURES_DIR
+
+JOPOX_DIR = os.path.join(FIXTURES_DIR, 'jopox')
+GAMES_LIST_PAGES = ('games_list_page1.html', 'games_list_page4.html', 'games_list_single.html')
+ALL_PAGES = GAMES_LIST_PAGES + ('game_form.html',)
+PARSERS = ('lxml', 'html.parser')
+
+
+class SavedResponse:
+    def __init__(self, text):
+        self.text = text
+        self.url = 'https://s-kiekko.jopox.fi/Admin/Games/Games.aspx'
+        self.status_code = 200
+
+
+def load(name):
+    with open(os.path.join(JOPOX_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.fixture
+def scraper():
+    # Jäsennysmetodit eivät käytä kirjautumistilaa
+    return JopoxScraper.__new__(JopoxScraper)
+
+
+@pytest.fixture(params=PARSERS)
+def parser(request, monkeypatch):
+    monkeypatch.setattr(jopox_page, 'PARSER', request.param)
+    return request.param
+
+
+@pytest.mark.parametrize('name', GAMES_LIST_PAGES)
+def test_strained_games_list_matches_full_parse(name, parser, scraper):
+    text = load(name)
+    full = BeautifulSoup(text, 'html.parser')
+    strained = parse_html(text, parse_only=games_list_strainer())
+
+    expected_games = scraper.parse_games_page(full)
+    assert expected_games
+    assert scraper.parse_games_page(strained) == expected_games
+    assert scraper.get_last_page_number(strained) == scraper.get_last_page_number(full)
+
+
+@pytest.mark.parametrize('name', ALL_PAGES)
+def test_hidden_fields_match_full_parse(name, parser):
+    text = load(name)
+    full = BeautifulSoup(text, 'html.parser')
+    expected = {field: full.find('input', {'name': field})['value'] for field in HIDDEN_FIELDS}
+
+    assert JopoxPage(SavedResponse(text)).hidden_fields() == expected
+    assert {field: JopoxPage(SavedResponse(text)).soup.find('input', {'name': field})['value'] for field in HIDDEN_FIELDS} == expected
+
+
+def test_last_page_number_of_saved_pages(scraper):
+    assert scraper.get_last_page_number(parse_html(load('games_list_page1.html'), parse_only=games_list_strainer())) == 4
+    assert scraper.get_last_page_number(parse_html(load('games_list_single.html'), parse_only=games_list_strainer())) == 1